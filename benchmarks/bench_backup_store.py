@@ -0,0 +1,85 @@
+"""Benchmark: disk usage of config backups, indented JSON files vs. the backup store.
+
+Backs up a series of full-device-like configs, each with a few changed leaves as
+after an intent push, once as ``json.dumps(indent=4)`` files as ``backup_config``
+used to, and once per backup store variant. Run from the repository root:
+
+    python benchmarks/bench_backup_store.py --interfaces 500 --versions 10
+"""
+
+import argparse
+import copy
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from nornir_srl.tasks.backups import BackupStore, zstandard
+
+
+def _config(n_itfs: int) -> Dict[str, Any]:
+    return {
+        "interface": [
+            {
+                "name": f"ethernet-1/{i}",
+                "admin-state": "enable",
+                "mtu": 9232,
+                "subinterface": [
+                    {
+                        "index": s,
+                        "type": "bridged",
+                        "vlan": {"encap": {"single-tagged": {"vlan-id": s + 1}}},
+                    }
+                    for s in range(8)
+                ],
+            }
+            for i in range(n_itfs)
+        ],
+    }
+
+
+def _size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--interfaces", type=int, default=500)
+    parser.add_argument("--versions", type=int, default=10)
+    args = parser.parse_args()
+
+    configs = [[{"/": _config(args.interfaces)}]]
+    for v in range(1, args.versions):
+        cfg = copy.deepcopy(configs[-1])
+        cfg[0]["/"]["interface"][v % args.interfaces]["mtu"] = 1500 + v
+        configs.append(cfg)
+
+    variants = [("gzip", False), ("gzip", True)]
+    if zstandard is not None:
+        variants += [("zstd", False), ("zstd", True)]
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        for v, cfg in enumerate(configs):
+            (Path(tmp) / f"leaf1.{v:04}.json").write_text(json.dumps(cfg, indent=4))
+        elapsed = time.perf_counter() - start
+        print(
+            f"{'json files':16}: {_size(Path(tmp)) / 1e6:8.2f} MB, "
+            f"{elapsed * 1e3:8.1f} ms"
+        )
+    for compression, deltas in variants:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = BackupStore(tmp, compression=compression, deltas=deltas)
+            start = time.perf_counter()
+            for cfg in configs:
+                store.save(cfg, history_len=args.versions)
+            elapsed = time.perf_counter() - start
+            name = f"{compression}{' + deltas' if deltas else ''}"
+            print(
+                f"{name:16}: {_size(Path(tmp)) / 1e6:8.2f} MB, "
+                f"{elapsed * 1e3:8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark: structural config diff vs. difflib over indented JSON text.
+
+Both diff a full-device-like config against a copy with a few changed leaves,
+as ``set_config`` dry-runs and ``restore_config`` do. Run from the repository
+root:
+
+    python benchmarks/bench_config_diff.py --interfaces 500
+"""
+
+import argparse
+import copy
+import difflib
+import json
+import time
+from typing import Any, Dict
+
+from nornir_srl.connections.helpers import diff_cfg_list
+
+
+def diff_cfg_list_text(before: Any, after: Any) -> str:
+    diff = ""
+    for i in range(len(before)):
+        before_json = json.dumps(before[i], indent=2, sort_keys=True)
+        after_json = json.dumps(after[i], indent=2, sort_keys=True)
+        for line in difflib.unified_diff(
+            before_json.splitlines(keepends=True),
+            after_json.splitlines(keepends=True),
+            fromfile="before",
+            tofile="after",
+            n=5,
+        ):
+            diff += line
+    return diff
+
+
+def _config(n_itfs: int) -> Dict[str, Any]:
+    return {
+        "interface": [
+            {
+                "name": f"ethernet-1/{i}",
+                "admin-state": "enable",
+                "mtu": 9232,
+                "subinterface": [
+                    {
+                        "index": s,
+                        "type": "bridged",
+                        "vlan": {"encap": {"single-tagged": {"vlan-id": s + 1}}},
+                    }
+                    for s in range(8)
+                ],
+            }
+            for i in range(n_itfs)
+        ],
+        "network-instance": [
+            {
+                "name": f"macvrf-{v}",
+                "type": "mac-vrf",
+                "interface": [{"name": f"ethernet-1/{v}.{s}"} for s in range(8)],
+            }
+            for v in range(n_itfs // 4)
+        ],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--interfaces", type=int, default=500)
+    args = parser.parse_args()
+
+    before = [{"/": _config(args.interfaces)}]
+    after = copy.deepcopy(before)
+    for i in range(0, args.interfaces, args.interfaces // 5 or 1):
+        after[0]["/"]["interface"][i]["admin-state"] = "disable"
+
+    for name, fn in (("difflib", diff_cfg_list_text), ("structural", diff_cfg_list)):
+        start = time.perf_counter()
+        diff = fn(before, after)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{args.interfaces} interfaces, {name:10}: {elapsed * 1e3:8.1f} ms, "
+            f"{len(diff.splitlines())} diff lines"
+        )
+
+
+if __name__ == "__main__":
+    main()
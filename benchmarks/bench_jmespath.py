@@ -0,0 +1,122 @@
+"""Benchmark: get_bgp_rib() with a warm vs. cold JMESPath expression registry.
+
+A cold registry reproduces parsing the projection on every call. Run from the
+repository root:
+
+    python benchmarks/bench_jmespath.py --routes 10 --calls 2000
+"""
+
+import argparse
+import time
+from typing import Any, Dict, List, Optional
+
+from jmespath.parser import Parser
+
+from nornir_srl.connections.expressions import EXPRESSIONS
+from nornir_srl.connections.helpers import GetSpec
+from nornir_srl.connections.profile import DeviceProfile
+from nornir_srl.connections.routing import RoutingMixin
+
+
+def _rib(n_routes: int) -> List[Dict[str, Any]]:
+    routes = [
+        {
+            "attr-id": 1,
+            "used-route": True,
+            "valid-route": True,
+            "best-route": True,
+            "neighbor": "192.0.2.2",
+            "route-distinguisher": "192.0.2.2:100",
+            "esi": "00:00:00:00:00:00:00:00:00:00",
+            "mac-address": f"1A:DC:0E:{i >> 16 & 0xFF:02X}:{i >> 8 & 0xFF:02X}:{i & 0xFF:02X}",
+            "ip-address": "0.0.0.0",
+            "next-hop": "192.0.2.2",
+            "label": {"value": 100},
+        }
+        for i in range(n_routes)
+    ]
+    return [
+        {
+            "network-instance": [
+                {
+                    "name": "default",
+                    "bgp-rib": {
+                        "afi-safi": [
+                            {
+                                "evpn": {
+                                    "rib-in-out": {
+                                        "rib-in-post": {"mac-ip-route": routes}
+                                    }
+                                }
+                            }
+                        ]
+                    },
+                }
+            ]
+        }
+    ]
+
+
+class _Device(RoutingMixin):
+    def __init__(self, n_routes: int):
+        self.capabilities = {
+            "supported_models": [{"name": "bgp-rib", "version": "2024-10-31"}]
+        }
+        self._profile = DeviceProfile.from_capabilities(self.capabilities)
+        self._attrs = [
+            {
+                "network-instance": [
+                    {
+                        "name": "default",
+                        "bgp-rib": {
+                            "attr-sets": {"attr-set": [{"index": 1, "origin": "igp"}]}
+                        },
+                    }
+                ]
+            }
+        ]
+        self._n_routes = n_routes
+
+    @property
+    def profile(self) -> DeviceProfile:
+        return self._profile
+
+    def get_batch(
+        self, specs: List[GetSpec], strip_mod: Optional[bool] = True
+    ) -> Dict[GetSpec, List[Dict[str, Any]]]:
+        # responses are rebuilt per call, getters annotate them in place
+        return {
+            spec: self._attrs if "attr-set" in spec[0] else _rib(self._n_routes)
+            for spec in specs
+        }
+
+
+def _bench(device: _Device, calls: int, cold: bool, detail: bool) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        if cold:
+            EXPRESSIONS.clear()
+            Parser.purge()
+        device.get_bgp_rib(route_fam="evpn", route_type="2", detail=detail)
+    return (time.perf_counter() - start) / calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--routes", type=int, default=10)
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    device = _Device(args.routes)
+    for detail in (False, True):
+        cold = _bench(device, args.calls, cold=True, detail=detail)
+        warm = _bench(device, args.calls, cold=False, detail=detail)
+        print(
+            f"evpn type-2, {args.routes} routes, detail={detail}: "
+            f"cold {cold * 1e6:.0f} us/call, warm {warm * 1e6:.0f} us/call "
+            f"({cold / warm:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark: projection of a large EVPN type-2 RIB, JMESPath vs. row builder.
+
+Only the projection step of get_bgp_rib() is timed, on an already decoded and
+augmented response. Run from the repository root:
+
+    python benchmarks/bench_row_builders.py --routes 200000
+"""
+
+import argparse
+import time
+from typing import Any, Callable, Dict
+
+import jmespath
+
+from nornir_srl.connections.row_builders import RowBuilder
+
+EXPRESSION = (
+    '"network-instance"[].{NI:name, Rib:"bgp-rib"."afi-safi"[]."evpn"."rib-in-out".'
+    '"rib-in-post"."mac-ip-route"[].{RD:"route-distinguisher", RT:"_rt", '
+    'peer:neighbor, ESI:esi, "MAC":"mac-address", "IP":"ip-address",vni:vni,'
+    'L1:"_label1",L2:"_label2","next-hop":"next-hop", "0_st":"_r_state", '
+    '"as-path":"as-path".segment[0].member}}'
+)
+
+
+def _rib(n_routes: int) -> Dict[str, Any]:
+    routes = [
+        {
+            "neighbor": "192.0.2.2",
+            "route-distinguisher": "192.0.2.2:100",
+            "esi": "00:00:00:00:00:00:00:00:00:00",
+            "mac-address": f"1A:DC:0E:{i >> 16 & 0xFF:02X}:{i >> 8 & 0xFF:02X}:{i & 0xFF:02X}",
+            "ip-address": "0.0.0.0",
+            "next-hop": "192.0.2.2",
+            "vni": 100,
+            "_rt": "65000:100",
+            "_label1": 100,
+            "_r_state": "u*>",
+            "as-path": {"segment": [{"member": [65002]}]},
+        }
+        for i in range(n_routes)
+    ]
+    return {
+        "network-instance": [
+            {
+                "name": "default",
+                "bgp-rib": {
+                    "afi-safi": [
+                        {
+                            "evpn": {
+                                "rib-in-out": {"rib-in-post": {"mac-ip-route": routes}}
+                            }
+                        }
+                    ]
+                },
+            }
+        ]
+    }
+
+
+def _bench(search: Callable[[Any], Any], data: Any, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        search(data)
+    return (time.perf_counter() - start) / calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--routes", type=int, default=200000)
+    parser.add_argument("--calls", type=int, default=3)
+    args = parser.parse_args()
+
+    data = _rib(args.routes)
+    compiled = jmespath.compile(EXPRESSION)
+    builder = RowBuilder(EXPRESSION)
+    assert builder.search(data) == compiled.search(data)
+
+    interp = _bench(compiled.search, data, args.calls)
+    python = _bench(builder.search, data, args.calls)
+    print(
+        f"evpn type-2, {args.routes} routes: jmespath {interp * 1e3:.0f} ms, "
+        f"row builder {python * 1e3:.0f} ms ({interp / python:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
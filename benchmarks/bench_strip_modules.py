@@ -0,0 +1,95 @@
+"""Benchmark: strip_modules() time and peak memory vs. the recursive implementation.
+
+The recursive implementation rebuilt every dict and list of the response. Both
+are run on a RIB-like response with and without module prefixes. Run from the
+repository root:
+
+    python benchmarks/bench_strip_modules.py --routes 200000
+"""
+
+import argparse
+import copy
+import re
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Tuple
+
+from nornir_srl.connections.helpers import strip_modules
+
+_RE = re.compile(r"srl_nokia-[^:]+:")
+
+
+def strip_modules_recursive(d: Any) -> Any:
+    if isinstance(d, list):
+        return [strip_modules_recursive(x) for x in d]
+    elif isinstance(d, dict):
+        return {
+            strip_modules_recursive(k): strip_modules_recursive(v) for k, v in d.items()
+        }
+    elif isinstance(d, str):
+        if d.startswith("srl_nokia-") and ":" in d:
+            return re.sub(_RE, "", d)
+        return d
+    return d
+
+
+def _rib(n_routes: int, prefixed: bool) -> Dict[str, Any]:
+    mod = "srl_nokia-network-instance:" if prefixed else ""
+    routes = [
+        {
+            "ipv4-prefix": f"10.{i >> 16 & 0xFF}.{i >> 8 & 0xFF}.{i & 0xFF}/32",
+            "route-type": f"{'srl_nokia-common:' if prefixed else ''}bgp-evpn",
+            "route-owner": "bgp_evpn_mgr",
+            "active": True,
+            "metric": 0,
+            "preference": 170,
+            "next-hop-group": 1000 + i % 64,
+        }
+        for i in range(n_routes)
+    ]
+    return {
+        f"{mod}network-instance": [
+            {
+                "name": "ip-vrf1",
+                f"{'srl_nokia-ip-route-tables:' if prefixed else ''}route-table": {
+                    "ipv4-unicast": {"route": routes}
+                },
+            }
+        ]
+    }
+
+
+def _measure(fn: Callable[[Any], Any], data: Any) -> Tuple[float, int]:
+    """run time, then peak memory of a second run under tracemalloc"""
+    copies = [copy.deepcopy(data), copy.deepcopy(data)]
+    start = time.perf_counter()
+    fn(copies[0])
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn(copies[1])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--routes", type=int, default=200000)
+    args = parser.parse_args()
+
+    for prefixed in (False, True):
+        data = _rib(args.routes, prefixed)
+        assert strip_modules_recursive(data) == strip_modules(copy.deepcopy(data))
+        for name, fn in (
+            ("recursive", strip_modules_recursive),
+            ("in-place", strip_modules),
+        ):
+            elapsed, peak = _measure(fn, data)
+            print(
+                f"{args.routes} routes, prefixes={prefixed}, {name:9}: "
+                f"{elapsed * 1e3:7.0f} ms, peak {peak / 2**20:7.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,15 @@ import csv
 import re
 import io
 import json
+import queue
 import sys
 import tempfile
+import textwrap
+import threading
+import time
+from collections import Counter
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Callable
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Callable
 from enum import Enum
 import logging
 import os
@@ -13,6 +18,7 @@ import os
 import typer
 import yaml  # type: ignore
 from rich.console import Console
+from rich.live import Live
 from rich.table import Table
 from rich.box import MINIMAL_DOUBLE_HEAD
 from rich.theme import Theme
@@ -22,8 +28,10 @@ from nornir.core.task import Result, Task, AggregatedResult
 from nornir.core.inventory import Host
 
 from .connections.srlinux import CONNECTION_NAME
+from .connections.aio import AsyncioRunner, DEFAULT_MAX_CONCURRENCY
 from .connections.routing import BGP_RIB_ROUTE_FAM_ALIASES
 from .connections.helpers import clean_structured_key
+from .connections.snapshot import SnapshotStore, record
 from .utils.logging_config import setup_logging
 from . import __version__
 
@@ -56,6 +64,7 @@ logger = logging.getLogger(__name__)
 SRL_DEFAULT_USERNAME = "admin"
 SRL_DEFAULT_PASSWORD = "NokiaSrl1!"
 SRL_DEFAULT_GNMI_PORT = 57400
+DEFAULT_SNAPSHOT_DIR = ".fcli-snapshots"
 
 NORNIR_DEFAULT_CONFIG: Dict[str, Any] = {
     "inventory": {
@@ -394,6 +403,43 @@ def print_report(
         print_structured(col_names, rows, output)
 
 
+def write_rows(
+    col_names: List[str],
+    rows: Iterable[Dict[str, Any]],
+    output_format: OutputFormat,
+) -> int:
+    """Write rows in JSON, YAML or CSV format as they are produced.
+
+    JSON and YAML output is the same as :func:`print_structured` for the same rows,
+    but each row is written as soon as it is available. Returns the number of rows
+    written.
+    """
+    count = 0
+    all_cols = ["Node"] + [clean_structured_key(c) for c in col_names]
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=all_cols, extrasaction="ignore")
+    for row in rows:
+        row = {clean_structured_key(k): v for k, v in row.items()}
+        if output_format == OutputFormat.JSON:
+            item = textwrap.indent(json.dumps(row, indent=2, default=str), "  ")
+            typer.echo(("[\n" if count == 0 else ",\n") + item, nl=False)
+        elif output_format == OutputFormat.YAML:
+            typer.echo(yaml.safe_dump([row], default_flow_style=False), nl=False)
+        elif output_format == OutputFormat.CSV:
+            if count == 0:
+                writer.writeheader()
+            writer.writerow({k: str(v) for k, v in row.items()})
+            typer.echo(buf.getvalue(), nl=False)
+            buf.seek(0)
+            buf.truncate()
+        count += 1
+    if count == 0:
+        typer.echo("No data...")
+    elif output_format == OutputFormat.JSON:
+        typer.echo("\n]")
+    return count
+
+
 # ------------------------- root callback -------------------------
 
 
@@ -447,6 +493,36 @@ def main(
         help="Output format: table, json, yaml, csv",
         case_sensitive=False,
     ),
+    use_async: bool = typer.Option(
+        False,
+        "--async",
+        help="Query all nodes concurrently on a single asyncio event loop",
+    ),
+    max_concurrency: int = typer.Option(
+        DEFAULT_MAX_CONCURRENCY,
+        "--max-concurrency",
+        help="Maximum number of nodes queried at the same time with --async",
+    ),
+    watch: Optional[float] = typer.Option(
+        None,
+        "--watch",
+        "-w",
+        min=0.5,
+        help="Re-run the report every WATCH seconds on open connections and "
+        "highlight changed rows, until interrupted with Ctrl-C",
+    ),
+    from_snapshot: Optional[str] = typer.Option(
+        None,
+        "--from-snapshot",
+        help="Run the report against a snapshot taken with 'fcli snapshot' instead "
+        "of the devices, 'latest' for the most recent one",
+    ),
+    snapshot_dir: Path = typer.Option(
+        Path(DEFAULT_SNAPSHOT_DIR),
+        "--snapshot-dir",
+        envvar="FCLI_SNAPSHOT_DIR",
+        help="Directory of the snapshot store",
+    ),
     version: Optional[bool] = typer.Option(
         None,
         "--version",
@@ -457,7 +533,15 @@ def main(
 ) -> None:
     setup_logging(log_level.value, str(log_file) if log_file else None)
     ctx.ensure_object(dict)
-    if topo_file:
+    ctx.obj["snapshot_dir"] = snapshot_dir
+    if from_snapshot:
+        try:
+            fabric = SnapshotStore(snapshot_dir).nornir(from_snapshot)
+        except (OSError, ValueError) as e:
+            typer.echo(f"Failed to load snapshot: {e}")
+            raise typer.Exit(1)
+        use_async = False  # the snapshot is replayed in-process
+    elif topo_file:
         try:
             with open(topo_file, "r") as f:
                 topo = yaml.safe_load(os.path.expandvars(f.read()))
@@ -558,6 +642,12 @@ def main(
     ctx.obj["i_filter"] = i_filter
     ctx.obj["box_type"] = box_type.upper() if box_type else None
     ctx.obj["output"] = output
+    ctx.obj["async_runner"] = (
+        AsyncioRunner(max_concurrency=max_concurrency) if use_async else None
+    )
+    if ctx.obj["async_runner"]:
+        ctx.call_on_close(ctx.obj["async_runner"].close)
+    ctx.obj["watch"] = watch
 
 
 # ------------------------- command helpers -------------------------
@@ -569,13 +659,20 @@ def run_show(
     task_func: Callable[[Task], Result],
     field_filter: Optional[List[str]],
     title: Optional[str] = None,
+    async_capable: bool = True,
 ) -> None:
     f_filter = (
         {k: v for k, v in (f.split("=") for f in field_filter)} if field_filter else {}
     )
-    result = ctx.obj["target"].run(task=task_func, name=name, raise_on_error=False)
-    logger.debug("Aggregated result for %s: %s", name, result)
+    target = ctx.obj["target"]
+    if async_capable and ctx.obj.get("async_runner"):
+        target = target.with_runner(ctx.obj["async_runner"])
     display_name = title if title else name.replace("_", " ").title()
+    if ctx.obj.get("watch"):
+        watch_report(ctx, target, name, task_func, f_filter, display_name)
+        return
+    result = target.run(task=task_func, name=name, raise_on_error=False)
+    logger.debug("Aggregated result for %s: %s", name, result)
     print_report(
         result=result,
         name=display_name,
@@ -587,6 +684,178 @@ def run_show(
     )
 
 
+def _row_key(row: Dict[str, Any]) -> tuple:
+    return tuple(sorted((str(k), str(v)) for k, v in row.items()))
+
+
+def row_deltas(previous: List[Dict[str, Any]], current: List[Dict[str, Any]]) -> tuple:
+    """Compare two snapshots of report rows.
+
+    Returns (changed, removed): for each row of *current* whether it is new or
+    changed since *previous*, and the rows of *previous* that are gone.
+    """
+    old = Counter(_row_key(r) for r in previous)
+    changed: List[bool] = []
+    for row in current:
+        key = _row_key(row)
+        changed.append(old[key] == 0)
+        if old[key]:
+            old[key] -= 1
+    removed: List[Dict[str, Any]] = []
+    for row in previous:
+        key = _row_key(row)
+        if old[key]:
+            removed.append(row)
+            old[key] -= 1
+    return changed, removed
+
+
+def _watch_table(
+    title: str,
+    col_names: List[str],
+    rows: List[Dict[str, Any]],
+    changed: List[bool],
+    box_type: Optional[str] = None,
+) -> Table:
+    box_t = MINIMAL_DOUBLE_HEAD
+    if box_type:
+        box_t = getattr(__import__("rich.box", fromlist=["box"]), box_type, box_t)
+    table = Table(title=title, highlight=True, box=box_t)
+    for col in ["Node"] + col_names:
+        table.add_column(col, no_wrap=col == "Node")
+    node = None
+    for row, is_changed in zip(rows, changed):
+        if node is not None and row["Node"] != node:
+            table.add_section()
+        table.add_row(
+            row["Node"] if row["Node"] != node else "",
+            *[str(row.get(c, "")) for c in col_names],
+            style="bold yellow" if is_changed else None,
+        )
+        node = row["Node"]
+    return table
+
+
+def watch_report(
+    ctx: typer.Context,
+    target: Nornir,
+    name: str,
+    task_func: Callable[[Task], Result],
+    f_filter: Dict[str, str],
+    title: str,
+) -> None:
+    """Re-run a report every ``--watch`` seconds and show what changed.
+
+    Connections stay open between runs. Table output is redrawn in place with new
+    and changed rows highlighted, structured output only gets the rows that
+    changed, with a ``_change`` field of ``+`` (new or changed) or ``-`` (gone).
+    """
+    interval: float = ctx.obj["watch"]
+    output = ctx.obj["output"]
+    console = Console()
+    previous: Optional[List[Dict[str, Any]]] = None
+    live = Live(console=console, auto_refresh=False, transient=False)
+    try:
+        if output == OutputFormat.TABLE:
+            live.start()
+        while True:
+            started = time.monotonic()
+            result = target.run(task=task_func, name=name, raise_on_error=False)
+            col_names, rows = _extract_data(name, result, f_filter)
+            if previous is None:
+                changed, removed = [False] * len(rows), []
+            else:
+                changed, removed = row_deltas(previous, rows)
+            if output == OutputFormat.TABLE:
+                caption = (
+                    f"every {interval:g}s, {time.strftime('%H:%M:%S')}: "
+                    f"{sum(changed)} changed, {len(removed)} removed"
+                )
+                if result.failed_hosts:
+                    caption += f"\n[red]Failed hosts:{list(result.failed_hosts)}"
+                table = _watch_table(
+                    f"[bold]{title}[/bold]",
+                    col_names,
+                    rows,
+                    changed,
+                    box_type=ctx.obj["box_type"],
+                )
+                table.caption = caption
+                live.update(table, refresh=True)
+            elif previous is None:
+                write_rows(col_names, rows, output)
+            else:
+                delta = [{**r, "_change": "+"} for r, c in zip(rows, changed) if c] + [
+                    {**r, "_change": "-"} for r in removed
+                ]
+                if delta:
+                    write_rows(col_names + ["_change"], delta, output)
+            previous = rows
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        live.stop()
+        target.close_connections()
+
+
+STREAM_QUEUE_SIZE = 1000
+
+
+def stream_report(
+    ctx: typer.Context,
+    name: str,
+    row_func: Callable[[Any], Iterator[Dict[str, Any]]],
+    col_names: List[str],
+    field_filter: Optional[List[str]],
+) -> None:
+    """Write the rows of all hosts as they are streamed by *row_func*.
+
+    One thread per host pulls rows from its device into a bounded queue, the
+    writer drains it. A slow writer blocks the producers, which in turn stop
+    reading from their devices, so memory stays bounded by the queue size.
+    """
+    f_filter = (
+        {k: v for k, v in (f.split("=") for f in field_filter)} if field_filter else {}
+    )
+    target = ctx.obj["target"]
+    hosts = list(target.inventory.hosts.values())
+    rows: "queue.Queue[Any]" = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+    done = object()
+
+    def _produce(host: Host) -> None:
+        try:
+            device = host.get_connection(CONNECTION_NAME, target.config)
+            node_name = host.hostname if host.hostname else host.name
+            for row in row_func(device):
+                rows.put({"Node": node_name, **row})
+        except Exception as e:
+            rows.put((host.name, e))
+        finally:
+            rows.put(done)
+
+    def _consume() -> Iterator[Dict[str, Any]]:
+        remaining = len(hosts)
+        while remaining:
+            item = rows.get()
+            if item is done:
+                remaining -= 1
+            elif isinstance(item, tuple):
+                typer.echo(
+                    f"Failed to get {name} for {item[0]}. Exception: {item[1]}",
+                    err=True,
+                )
+            elif _pass_filter(item, f_filter):
+                yield item
+
+    for host in hosts:
+        threading.Thread(target=_produce, args=(host,), daemon=True).start()
+    try:
+        write_rows(col_names, _consume(), ctx.obj["output"])
+    finally:
+        target.close_connections()
+
+
 # ------------------------- commands -------------------------
 
 
@@ -652,8 +921,9 @@ def ipv4_rib(
     address: Optional[str] = typer.Option(
         None,
         "--address",
+        "--lpm",
         "-a",
-        help="Look up specified address in the IPv4 RIB using LPM",
+        help="Look up specified address(es), comma-separated, in the IPv4 RIB using LPM",
     ),
     field_filter: Optional[List[str]] = typer.Option(None, "--field-filter", "-f"),
 ) -> None:
@@ -675,8 +945,9 @@ def ipv6_rib(
     address: Optional[str] = typer.Option(
         None,
         "--address",
+        "--lpm",
         "-a",
-        help="Look up specified address in the IPv6 RIB using LPM",
+        help="Look up specified address(es), comma-separated, in the IPv6 RIB using LPM",
     ),
     field_filter: Optional[List[str]] = typer.Option(None, "--field-filter", "-f"),
 ) -> None:
@@ -741,6 +1012,19 @@ def bgp_rib(
         help="Include all path attributes (communities, SoO, D-PATH, tunnel-encap, "
         "status). Automatically enabled for non-table output (json/yaml/csv).",
     ),
+    network_instance: str = typer.Option(
+        "*", "--ni", help="Only routes of this network-instance"
+    ),
+    prefix: Optional[str] = typer.Option(
+        None,
+        "--prefix",
+        "-p",
+        help="Only routes for this exact prefix, e.g. 10.0.0.0/24 (ipv4, ipv6, "
+        "l3vpn and EVPN route type 5)",
+    ),
+    neighbor: Optional[str] = typer.Option(
+        None, "--neighbor", "-n", help="Only routes received from this peer address"
+    ),
     field_filter: Optional[List[str]] = typer.Option(None, "--field-filter", "-f"),
 ) -> None:
     """Displays BGP RIB"""
@@ -749,7 +1033,13 @@ def bgp_rib(
 
     def _bgp_rib(task: Task) -> Result:
         device = task.host.get_connection(CONNECTION_NAME, task.nornir.config)
-        kwargs: Dict[str, Any] = {"route_fam": route_fam, "detail": want_detail}
+        kwargs: Dict[str, Any] = {
+            "route_fam": route_fam,
+            "detail": want_detail,
+            "network_instance": network_instance,
+            "prefix": prefix,
+            "neighbor": neighbor,
+        }
         if route_type is not None:
             kwargs["route_type"] = route_type
         return Result(host=task.host, result=device.get_bgp_rib(**kwargs))
@@ -763,6 +1053,11 @@ def bgp_rib(
 @app.command()
 def mac(
     ctx: typer.Context,
+    stream: bool = typer.Option(
+        False,
+        "--stream",
+        help="Write rows as they are received (json, yaml and csv output only)",
+    ),
     field_filter: Optional[List[str]] = typer.Option(None, "--field-filter", "-f"),
 ) -> None:
     """Displays MAC Table"""
@@ -771,6 +1066,15 @@ def mac(
         device = task.host.get_connection(CONNECTION_NAME, task.nornir.config)
         return Result(host=task.host, result=device.get_mac_table())
 
+    if stream and ctx.obj["output"] != OutputFormat.TABLE:
+        stream_report(
+            ctx,
+            "mac_table",
+            lambda device: device.iter_mac_table(),
+            ["NI", "Address", "Dest", "Type"],
+            field_filter,
+        )
+        return
     run_show(ctx, "mac_table", _mac, field_filter)
 
 
@@ -876,21 +1180,41 @@ def arp(
 def ifstats(
     ctx: typer.Context,
     interval: int = typer.Option(5, "--interval", "-s", help="Seconds between samples"),
+    stream: bool = typer.Option(
+        False, "--stream", help="Use a gNMI SAMPLE subscription instead of two Gets"
+    ),
+    windows: Optional[str] = typer.Option(
+        None,
+        "--windows",
+        help="Comma-separated windows in seconds, e.g. 5,60,300: bps/pps/error "
+        "rates per window from a SAMPLE subscription (implies --stream)",
+    ),
     field_filter: Optional[List[str]] = typer.Option(None, "--field-filter", "-f"),
 ) -> None:
     """Displays per-interface in/out bps from two consecutive samples"""
 
+    win = [int(w) for w in windows.split(",") if w.strip()] if windows else None
+    stream = stream or bool(win)
+
     def _ifstats(task: Task) -> Result:
         device = task.host.get_connection(CONNECTION_NAME, task.nornir.config)
-        return Result(host=task.host, result=device.get_ifstats(interval=interval))
-
-    run_show(
-        ctx,
-        "ifstats",
-        _ifstats,
-        field_filter,
-        title=f"Interface Stats ({interval}s interval)",
-    )
+        return Result(
+            host=task.host,
+            result=device.get_ifstats(interval=interval, stream=stream, windows=win),
+        )
+
+    try:
+        run_show(
+            ctx,
+            "ifstats",
+            _ifstats,
+            field_filter,
+            title=f"Interface Stats ({interval}s interval)",
+            async_capable=False,  # samples are taken by the getter itself
+        )
+    finally:
+        if stream:  # subscriptions keep the gRPC channels busy
+            ctx.obj["target"].close_connections()
 
 
 @app.command()
@@ -958,5 +1282,52 @@ def nd(
     run_show(ctx, "nd", _nd, field_filter)
 
 
+@app.command()
+def snapshot(
+    ctx: typer.Context,
+    name: Optional[str] = typer.Option(
+        None,
+        "--name",
+        "-n",
+        help="Snapshot name, defaults to the current date and time",
+    ),
+    list_snapshots: bool = typer.Option(
+        False, "--list", help="List the snapshots in the store and exit"
+    ),
+) -> None:
+    """Records the state behind all reports, for use with --from-snapshot"""
+
+    store = SnapshotStore(ctx.obj["snapshot_dir"])
+    if list_snapshots:
+        snapshots = store.list()
+        if not snapshots:
+            typer.echo("No data...")
+        for s in snapshots:
+            typer.echo(f"{s['name']}\t{s['created']}\t{s['nodes']} nodes")
+        return
+
+    def _snapshot(task: Task) -> Result:
+        device = task.host.get_connection(CONNECTION_NAME, task.nornir.config)
+        return Result(host=task.host, result=record(device))
+
+    target: Nornir = ctx.obj["target"]
+    result = target.run(task=_snapshot, name="snapshot", raise_on_error=False)
+    for host in result.failed_hosts:
+        typer.echo(
+            f"Failed to snapshot {host}. Exception: {result[host][0].exception}",
+            err=True,
+        )
+    nodes = {h: r[0].result for h, r in result.items() if not r.failed}
+    if not nodes:
+        raise typer.Exit(1)
+    name = name or time.strftime("%Y%m%d-%H%M%S")
+    try:
+        path = store.save(name, nodes, inventory=dict(target.inventory.hosts))
+    except ValueError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(1)
+    typer.echo(f"Snapshot '{name}' of {len(nodes)} nodes written to {path}")
+
+
 if __name__ == "__main__":
     app()
@@ -0,0 +1,621 @@
+"""asyncio gNMI connection to SR Linux and a Nornir runner built on it.
+
+:class:`AsyncSrLinux` talks gNMI over a ``grpc.aio`` channel, so thousands of
+devices can be queried concurrently from one event loop instead of one OS thread
+per device. :class:`AsyncioRunner` is a Nornir runner plugin that reuses the
+existing (synchronous) report getters unchanged: each task runs against a
+:class:`ReplayDevice` that serves Get responses prefetched over the async
+channel. When a getter asks for a path that has not been fetched yet, the
+replay device records it and answers with an empty response, so that one run of
+the task collects all paths it needs that do not depend on the responses to
+others. The runner then fetches them in one batch and runs the task again, until
+a run asks for nothing new. Connections are kept open between runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import pickle
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import grpc
+from cryptography import x509
+from cryptography.hazmat.backends import default_backend
+from nornir.core.inventory import Host
+from nornir.core.task import AggregatedResult, MultiResult, Result, Task
+from pygnmi.client import construct_update_message
+from pygnmi.create_gnmi_path import gnmi_path_degenerator, gnmi_path_generator
+from pygnmi.spec.v080.gnmi_pb2 import (
+    CapabilityRequest,
+    Encoding,
+    GetRequest,
+    SetRequest,
+)
+from pygnmi.spec.v080.gnmi_pb2_grpc import gNMIStub
+
+from .config_diff import (
+    AfterStateUnknown,
+    apply_transaction,
+    diff_config_list,
+    render_changes,
+    set_arguments,
+)
+from .helpers import (
+    GetSpec,
+    group_specs,
+    normalize_gnmi_resp,
+    strip_modules,
+)
+from .pool import DEFAULT_IDLE_TIMEOUT
+from .profile import FEATURES_PATH, SW_VERSION_PATH, DeviceProfile
+from .srlinux import CONNECTION_NAME, SrLinux
+from .streaming import typed_value
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 1000
+
+
+def _get_response_to_dict(resp: Any) -> Dict[str, Any]:
+    """convert a GetResponse into the dict format returned by pygnmi's ``get``"""
+    notifications = []
+    for notification in resp.notification:
+        notif: Dict[str, Any] = {"timestamp": notification.timestamp}
+        if notification.update:
+            notif["update"] = [
+                {
+                    "path": gnmi_path_degenerator(u.path),
+                    "val": typed_value(u.val),
+                }
+                for u in notification.update
+            ]
+        notifications.append(notif)
+    return {"notification": notifications}
+
+
+def _capabilities_to_dict(resp: Any) -> Dict[str, Any]:
+    return {
+        "supported_models": [
+            {"name": m.name, "organization": m.organization, "version": m.version}
+            for m in resp.supported_models
+        ],
+        "supported_encodings": [
+            Encoding.Name(e).lower() for e in resp.supported_encodings
+        ],
+        "gnmi_version": resp.gNMI_version,
+    }
+
+
+def _cert_name_override(pem: bytes) -> str:
+    """name to validate the (self-signed) device certificate against"""
+    cert = x509.load_pem_x509_certificate(pem, default_backend())
+    cn = cert.subject.get_attributes_for_oid(x509.oid.NameOID.COMMON_NAME)
+    if cn:
+        return str(cn[0].value)
+    try:
+        sans = cert.extensions.get_extension_for_oid(
+            x509.oid.ExtensionOID.SUBJECT_ALTERNATIVE_NAME
+        ).value
+    except x509.ExtensionNotFound:
+        return ""
+    for san_type in (x509.DNSName, x509.IPAddress):
+        names = sans.get_values_for_type(san_type)  # type: ignore
+        if names:
+            return str(names[0])
+    return ""
+
+
+class AsyncSrLinux:
+    """
+    gNMI connection to an SR Linux device on an asyncio gRPC channel
+
+    Offers the same ``get``, ``get_batch`` and ``set_config`` interface as
+    :class:`SrLinux`, as coroutines.
+    """
+
+    def __init__(self) -> None:
+        self.hostname: Optional[str] = None
+        self.capabilities: Optional[Dict[str, Any]] = None
+        self.profile: Optional[DeviceProfile] = None
+        self._channel: Optional[grpc.aio.Channel] = None
+        self._stub: Optional[gNMIStub] = None
+        self._metadata: List[tuple] = []
+        self._timeout: Optional[float] = None
+
+    async def open(
+        self,
+        hostname: Optional[str],
+        username: Optional[str],
+        password: Optional[str],
+        port: Optional[int],
+        platform: Optional[str] = None,
+        extras: Optional[Dict[str, Any]] = None,
+        configuration: Any = None,
+    ) -> None:
+        """
+        Open a gNMI connection to a device and build its :class:`DeviceProfile`
+        """
+        extras = dict(extras) if extras else {}
+        grpc_options = list(extras.get("grpc_options", []))
+        grpc_options.append(("grpc.max_receive_message_length", -1))
+        target = f"{hostname}:{port}"
+        self._timeout = extras.get("gnmi_timeout", 5)
+        if extras.get("insecure"):
+            self._channel = grpc.aio.insecure_channel(target, options=grpc_options)
+        else:
+            if extras.get("path_cert"):
+                with open(extras["path_cert"], "rb") as f:
+                    ssl_cert = f.read()
+            else:
+                loop = asyncio.get_running_loop()
+                ssl_cert = (
+                    await loop.run_in_executor(
+                        None,
+                        ssl.get_server_certificate,
+                        (str(hostname), int(port or 0)),
+                    )
+                ).encode("utf-8")
+            grpc_options.append(
+                ("grpc.ssl_target_name_override", _cert_name_override(ssl_cert))
+            )
+            self._channel = grpc.aio.secure_channel(
+                target, grpc.ssl_channel_credentials(ssl_cert), options=grpc_options
+            )
+        await asyncio.wait_for(self._channel.channel_ready(), self._timeout)
+        self._stub = gNMIStub(self._channel)
+        self._metadata = [("username", username or ""), ("password", password or "")]
+        self.hostname = hostname
+        self.capabilities = _capabilities_to_dict(
+            await self._stub.Capabilities(
+                CapabilityRequest(), metadata=self._metadata, timeout=self._timeout
+            )
+        )
+        await self.refresh_profile()
+
+    async def refresh_profile(self) -> DeviceProfile:
+        features_spec: GetSpec = (FEATURES_PATH, "state")
+        version_spec: GetSpec = (SW_VERSION_PATH, "state")
+        batch = await self.get_batch([features_spec, version_spec])
+        self.profile = DeviceProfile.from_responses(
+            self.capabilities,
+            batch[features_spec][0],
+            batch[version_spec][0],
+        )
+        return self.profile
+
+    async def close(self) -> None:
+        if self._channel is not None:
+            await self._channel.close()
+            self._channel = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__} on {self.hostname}"
+
+    async def gnmi_get(self, paths: List[str], datatype: str = "all") -> Dict:
+        if self._stub is None:
+            raise Exception("no active connection")
+        request = GetRequest(
+            path=[gnmi_path_generator(p) for p in paths],
+            type=GetRequest.DataType.Value(datatype.upper()),
+            encoding=Encoding.Value("JSON_IETF"),
+        )
+        resp = await self._stub.Get(
+            request, metadata=self._metadata, timeout=self._timeout
+        )
+        return _get_response_to_dict(resp)
+
+    async def gnmi_set(
+        self,
+        delete: Optional[List[str]] = None,
+        replace: Optional[List[tuple]] = None,
+        update: Optional[List[tuple]] = None,
+    ) -> Any:
+        if self._stub is None:
+            raise Exception("no active connection")
+        request = SetRequest(
+            delete=[gnmi_path_generator(p) for p in delete or []],
+            replace=construct_update_message(replace or [], "json_ietf"),
+            update=construct_update_message(update or [], "json_ietf"),
+        )
+        return await self._stub.Set(
+            request, metadata=self._metadata, timeout=self._timeout
+        )
+
+    async def get(
+        self,
+        paths: List[str],
+        datatype: Optional[str] = "config",
+        strip_mod: Optional[bool] = True,
+    ) -> List[Dict[str, Any]]:
+        resp = normalize_gnmi_resp(await self.gnmi_get(paths, str(datatype)))
+        if strip_mod:
+            return [strip_modules(d) for d in resp]
+        return resp
+
+    async def get_batch(
+        self,
+        specs: List[GetSpec],
+        strip_mod: Optional[bool] = True,
+    ) -> Dict[GetSpec, List[Dict[str, Any]]]:
+        """
+        Async counterpart of :meth:`SrLinux.get_batch`, datatype groups are fetched concurrently
+        """
+        groups = group_specs(specs)
+
+        async def _fetch(
+            datatype: str, paths: List[str]
+        ) -> Dict[GetSpec, List[Dict[str, Any]]]:
+            resp = await self.get(paths=paths, datatype=datatype, strip_mod=strip_mod)
+            if len(resp) == len(paths):
+                return {(p, datatype): [r] for p, r in zip(paths, resp)}
+            # cannot demultiplex, fall back to a Get per path
+            single = await asyncio.gather(
+                *(self.get([p], datatype=datatype, strip_mod=strip_mod) for p in paths)
+            )
+            return {(p, datatype): r for p, r in zip(paths, single)}
+
+        result: Dict[GetSpec, List[Dict[str, Any]]] = {}
+        for part in await asyncio.gather(
+            *(_fetch(dt, paths) for dt, paths in groups.items())
+        ):
+            result.update(part)
+        return result
+
+    async def set_config(
+        self,
+        input: List[Dict[str, Any]],
+        op: Optional[str] = "update",
+        dry_run: Optional[bool] = False,
+        strip_mod: Optional[bool] = True,
+        structured: Optional[bool] = False,
+        verify: Optional[bool] = False,
+    ) -> Union[str, List[Dict[str, Any]]]:
+        """Async counterpart of :meth:`SrLinux.set_config`"""
+        if op == "update":
+            return await self.commit_config(
+                update=input, dry_run=dry_run, structured=structured, verify=verify
+            )
+        if op == "replace":
+            return await self.commit_config(
+                replace=input, dry_run=dry_run, structured=structured, verify=verify
+            )
+        if op == "delete":
+            return await self.commit_config(
+                delete=[list(d.keys())[0] for d in input],
+                dry_run=dry_run,
+                structured=structured,
+                verify=verify,
+            )
+        raise ValueError(f"invalid value for parameter 'op': {op}")
+
+    async def commit_config(
+        self,
+        update: Optional[List[Dict[str, Any]]] = None,
+        replace: Optional[List[Dict[str, Any]]] = None,
+        delete: Optional[List[str]] = None,
+        dry_run: Optional[bool] = False,
+        structured: Optional[bool] = False,
+        verify: Optional[bool] = False,
+    ) -> Union[str, List[Dict[str, Any]]]:
+        """Async counterpart of :meth:`SrLinux.commit_config`"""
+        paths, sets = set_arguments(update, replace, delete)
+        if not paths:
+            return [] if structured else ""
+        before = (await self.get(paths=paths, datatype="config"))[: len(paths)]
+        if not dry_run:
+            await self.gnmi_set(**sets)
+        if verify and not dry_run:
+            after = await self.get(paths=paths, datatype="config")
+        else:
+            try:
+                after = apply_transaction(
+                    before,
+                    paths,
+                    delete or [],
+                    replace or [],
+                    update or [],
+                    strict=not dry_run,
+                )
+            except AfterStateUnknown:  # e.g. merged by the device in a way unknown here
+                after = await self.get(paths=paths, datatype="config")
+        changes = diff_config_list(before, after)
+        if structured:
+            return [c._asdict() for c in changes]
+        return render_changes(changes)
+
+
+class MissingResponse(Exception):
+    """Raised by :class:`ReplayDevice` for Get specs that have not been fetched yet"""
+
+    def __init__(self, specs: List[GetSpec], strip_mod: Optional[bool] = True):
+        super().__init__(f"no response for {specs}")
+        self.specs = specs
+        self.strip_mod = strip_mod
+
+
+class ReplayDevice(SrLinux):
+    """
+    :class:`SrLinux` serving Get responses from a per-spec store
+
+    The store maps ``(path, datatype)`` to the response for that single path, or
+    to the exception the device returned for it. Getters run unchanged on top.
+    Getters may modify the responses they get, so every Get returns a copy and
+    the stored responses stay as the device sent them.
+
+    A spec that is not in the store raises :class:`MissingResponse`, unless
+    :attr:`missing` is a dict: the spec is then added to it, by *strip_mod*, and
+    answered with an empty response.
+    """
+
+    def __init__(
+        self,
+        hostname: Optional[str],
+        capabilities: Optional[Dict[str, Any]],
+        profile: Optional[DeviceProfile],
+    ):
+        self.hostname = hostname
+        self.capabilities = capabilities
+        self._profile = profile
+        self.connection = self
+        self.responses: Dict[tuple, Union[List[Dict[str, Any]], BaseException]] = {}
+        self.missing: Optional[Dict[bool, List[GetSpec]]] = None
+
+    def _lookup(
+        self, specs: List[GetSpec], strip_mod: Optional[bool]
+    ) -> Dict[GetSpec, List[Dict[str, Any]]]:
+        missing = [s for s in specs if (*s, bool(strip_mod)) not in self.responses]
+        if missing:
+            if self.missing is None:
+                raise MissingResponse(missing, strip_mod)
+            pending = self.missing.setdefault(bool(strip_mod), [])
+            pending.extend(s for s in missing if s not in pending)
+        result: Dict[GetSpec, List[Dict[str, Any]]] = {}
+        for spec in specs:
+            resp = self.responses.get((*spec, bool(strip_mod)), [{}])
+            if isinstance(resp, BaseException):
+                raise resp
+            # a pickle round trip copies plain JSON data faster than deepcopy
+            result[spec] = pickle.loads(pickle.dumps(resp, pickle.HIGHEST_PROTOCOL))
+        return result
+
+    def store(
+        self,
+        specs: List[GetSpec],
+        strip_mod: Optional[bool],
+        responses: Union[Dict[GetSpec, List[Dict[str, Any]]], BaseException],
+    ) -> None:
+        for spec in specs:
+            self.responses[(*spec, bool(strip_mod))] = (
+                responses if isinstance(responses, BaseException) else responses[spec]
+            )
+
+    def get(
+        self,
+        paths: List[str],
+        datatype: Optional[str] = "config",
+        strip_mod: Optional[bool] = True,
+    ) -> List[Dict[str, Any]]:
+        specs = [(p, str(datatype)) for p in paths]
+        batch = self._lookup(specs, strip_mod)
+        return [r for spec in specs for r in batch[spec]]
+
+    def get_batch(
+        self,
+        specs: List[GetSpec],
+        strip_mod: Optional[bool] = True,
+    ) -> Dict[GetSpec, List[Dict[str, Any]]]:
+        return self._lookup(specs, strip_mod)
+
+    def gnmi_get(self, **kw):
+        raise NotImplementedError("gNMI Get is not available on a replayed device")
+
+    def gnmi_set(self, **kw):
+        raise NotImplementedError("gNMI Set is not available on a replayed device")
+
+    def subscribe(self, subscribe: Dict[str, Any]) -> Any:
+        raise NotImplementedError(
+            "subscriptions are not available on a replayed device"
+        )
+
+    def close(self) -> None:
+        pass
+
+
+class _Connection(NamedTuple):
+    device: AsyncSrLinux
+    params: tuple  # connection parameters the device was opened with
+    last_used: float
+
+
+def _connection_lost(e: BaseException) -> bool:
+    return isinstance(e, grpc.aio.AioRpcError) and e.code() in (
+        grpc.StatusCode.UNAVAILABLE,
+        grpc.StatusCode.DEADLINE_EXCEEDED,
+    )
+
+
+class AsyncioRunner:
+    """
+    Nornir runner that runs tasks for all hosts on a single asyncio event loop
+
+    Only tasks that use the ``srlinux`` connection to read state are supported:
+    gNMI Gets are done on an :class:`AsyncSrLinux` connection per host, all other
+    work of the task runs in the event loop thread.
+
+    The event loop runs in a background thread and keeps the connections open
+    between runs, so that repeated runs, e.g. with ``--watch`` or in the MCP
+    server, do not reconnect. Connections not used for *idle_timeout* seconds are
+    closed at the start of the next run, :meth:`close` closes all of them.
+
+    Arguments:
+        max_concurrency: maximum number of hosts queried at the same time
+        idle_timeout: seconds after which an unused connection is closed
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.idle_timeout = idle_timeout
+        self._connections: Dict[str, _Connection] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def run(self, task: Task, hosts: List[Host]) -> AggregatedResult:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="nornir-srl-aio", daemon=True
+                )
+                self._thread.start()
+            loop = self._loop
+        return asyncio.run_coroutine_threadsafe(
+            self.run_async(task, hosts), loop
+        ).result()
+
+    def close(self) -> None:
+        """close all connections and stop the event loop"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or thread is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._disconnect(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    async def run_async(self, task: Task, hosts: List[Host]) -> AggregatedResult:
+        """
+        Run *task* for *hosts*, on the event loop of the runner if connections
+        are to be reused, see :meth:`run`
+        """
+        now = time.monotonic()
+        await self._disconnect(
+            [
+                name
+                for name, c in self._connections.items()
+                if now - c.last_used > self.idle_timeout
+            ]
+        )
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(
+            *(self._run_host(task.copy(), host, semaphore) for host in hosts)
+        )
+        result = AggregatedResult(task.name)
+        for host, r in zip(hosts, results):
+            result[host.name] = r
+        return result
+
+    async def _run_host(
+        self, task: Task, host: Host, semaphore: asyncio.Semaphore
+    ) -> MultiResult:
+        async with semaphore:
+            lost = False
+            try:
+                device = await self._connect(host)
+                replay = ReplayDevice(
+                    device.hostname, device.capabilities, device.profile
+                )
+                outcome, lost = await self._probe(task, host, device, replay)
+            except Exception as e:
+                outcome, lost = e, True
+            if lost:
+                await self._disconnect([host.name])
+        task.task = _replay_outcome(outcome)
+        task.params = {}
+        return task.start(host)
+
+    async def _connect(self, host: Host) -> AsyncSrLinux:
+        """the open connection to *host*, opened if there is none"""
+        p = host.get_connection_parameters(CONNECTION_NAME)
+        params = (p.hostname, p.username, p.password, p.port, p.platform, p.extras)
+        conn = self._connections.pop(host.name, None)
+        if conn is not None and conn.params != params:
+            await conn.device.close()
+            conn = None
+        if conn is None:
+            device = AsyncSrLinux()
+            try:
+                await device.open(
+                    hostname=p.hostname,
+                    username=p.username,
+                    password=p.password,
+                    port=p.port,
+                    platform=p.platform,
+                    extras=p.extras,
+                )
+            except BaseException:
+                await device.close()
+                raise
+            conn = _Connection(device, params, 0.0)
+        self._connections[host.name] = conn._replace(last_used=time.monotonic())
+        return conn.device
+
+    async def _disconnect(self, names: Optional[List[str]] = None) -> None:
+        """close the connections to the hosts *names*, to all hosts by default"""
+        for name in list(self._connections) if names is None else names:
+            conn = self._connections.pop(name, None)
+            if conn is not None:
+                try:
+                    await conn.device.close()
+                except Exception as e:
+                    logger.debug("closing connection to %s failed: %s", name, e)
+
+    @staticmethod
+    async def _probe(
+        task: Task, host: Host, device: AsyncSrLinux, replay: ReplayDevice
+    ) -> Tuple[Any, bool]:
+        """
+        run the task until it no longer asks for unfetched paths
+
+        Returns:
+            tuple: outcome of the task and whether the connection was lost
+        """
+        lost = False
+        while True:
+            replay.missing = {}
+            saved = host.connections.get(CONNECTION_NAME)
+            host.connections[CONNECTION_NAME] = replay  # type: ignore
+            task.host = host
+            try:
+                outcome = task.task(task, **task.params)
+            except Exception as e:
+                outcome = e
+            finally:
+                if saved is None:
+                    host.connections.pop(CONNECTION_NAME, None)
+                else:
+                    host.connections[CONNECTION_NAME] = saved
+            if not replay.missing:  # the task got nothing but fetched responses
+                return outcome, lost
+            fetches = [
+                device.get_batch(specs, strip_mod)
+                for strip_mod, specs in replay.missing.items()
+            ]
+            for (strip_mod, specs), batch in zip(
+                replay.missing.items(),
+                await asyncio.gather(*fetches, return_exceptions=True),
+            ):
+                replay.store(specs, strip_mod, batch)
+                lost = lost or (
+                    isinstance(batch, BaseException) and _connection_lost(batch)
+                )
+
+
+def _replay_outcome(outcome: Any) -> Callable[..., Any]:
+    def _task(task: Task, **kwargs: Any) -> Any:
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    return _task
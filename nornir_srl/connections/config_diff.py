@@ -0,0 +1,628 @@
+"""Structural diff of configuration trees.
+
+Configs are compared as decoded JSON trees instead of as indented JSON text: dicts
+are walked key by key and entries of YANG lists are matched on their list keys
+(see :data:`LIST_KEYS`), so the cost is linear in the size of the configs. The result is a list of
+:class:`Change` addressed by gNMI path, e.g.
+``/interface[name=ethernet-1/1]/admin-state``. A unified-diff-like text is only
+rendered on demand by :func:`render_changes`, for the changed subtrees only.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# YANG keys of the config lists, by list name. Lists of the same name with other
+# keys elsewhere in the tree have alternatives, the first one whose fields are
+# in every entry is used. Lists that are not in here, or whose entries lack a key
+# field, are compared and changed as a whole, never by a guessed key.
+LIST_KEYS: Dict[str, Tuple[Tuple[str, ...], ...]] = {
+    "acl-filter": (("name", "type"),),
+    "address": (("ip-prefix",),),
+    "afi-safi": (("afi-safi-name",),),
+    "area": (("area-id",),),
+    "as-path-set": (("name",),),
+    "bgp-instance": (("id",),),
+    "community-set": (("name",),),
+    "entry": (("sequence-id",),),
+    "ethernet-segment": (("name",),),
+    "group": (("group-name",), ("name",)),
+    "instance": (("name",),),
+    "interface": (("name",), ("interface-name",)),
+    "ipv4-filter": (("name",),),
+    "ipv6-filter": (("name",),),
+    "level": (("level-number",),),
+    "mac-filter": (("name",),),
+    "neighbor": (("peer-address",), ("ipv4-address",), ("ipv6-address",)),
+    "network-instance": (("name",),),
+    "nexthop": (("index",),),
+    "policy": (("name",),),
+    "prefix": (("ip-prefix", "mask-length-range"),),
+    "prefix-set": (("name",),),
+    "route": (("prefix",),),
+    "server": (("address",),),
+    "server-group": (("name",),),
+    "statement": (("name",), ("sequence-id",)),
+    "subinterface": (("index",),),
+    "tag-set": (("name",),),
+    "tunnel-interface": (("name",),),
+    "user": (("username",),),
+    "vxlan-interface": (("index",),),
+}
+
+ADD = "add"
+DELETE = "delete"
+MODIFY = "modify"
+
+
+class AfterStateUnknown(Exception):
+    """Raised when the config after a Set cannot be derived from the config before"""
+
+
+class UnknownListKey(AfterStateUnknown):
+    """Raised when entries of a list with unknown keys are to be merged exactly"""
+
+
+class OverlappingPaths(AfterStateUnknown):
+    """Raised when a path of a Set is nested in another path of the same Set"""
+
+
+class Change(NamedTuple):
+    """A difference between two configs: *op* of :data:`ADD`, :data:`DELETE` or :data:`MODIFY`"""
+
+    op: str
+    path: str
+    before: Any
+    after: Any
+
+
+def list_name(path: str) -> str:
+    """name of the node at gNMI *path*, e.g. ``subinterface`` for
+    ``/interface[name=ethernet-1/1]/subinterface``"""
+    depth = 0
+    start = 0
+    for i, c in enumerate(path):
+        if c == "[":
+            depth += 1
+        elif c == "]":
+            depth -= 1
+        elif c == "/" and depth == 0:
+            start = i + 1
+    return path[start:].split("[", 1)[0].split(":")[-1]
+
+
+def list_keys(path: str, *entries: Sequence[Any]) -> Optional[Tuple[str, ...]]:
+    """
+    YANG key fields of the list at gNMI *path* with *entries*, if known
+
+    The keys come from :data:`LIST_KEYS`. They qualify if every entry has a
+    scalar value for each key field and the keys are unique within each list.
+
+    Returns:
+        tuple: the key fields, None if the list is to be handled as a whole
+    """
+    items = [e for lst in entries for e in lst]
+    if not items or not all(isinstance(e, dict) for e in items):
+        return None
+    for keys in LIST_KEYS.get(list_name(path), ()):
+        if not all(
+            isinstance(e.get(k), (str, int, float)) for e in items for k in keys
+        ):
+            continue
+        if all(len({_entry_key(e, keys) for e in lst}) == len(lst) for lst in entries):
+            return keys
+    return None
+
+
+def _entry_key(entry: Dict[str, Any], keys: Tuple[str, ...]) -> Tuple[Any, ...]:
+    return tuple(entry[k] for k in keys)
+
+
+def entry_path(path: str, entry: Dict[str, Any], keys: Tuple[str, ...]) -> str:
+    """gNMI path of list *entry*, with all its *keys*"""
+    return path + "".join(f"[{k}={entry[k]}]" for k in keys)
+
+
+def _is_keyed_list(v: Any) -> bool:
+    return isinstance(v, list) and bool(v) and all(isinstance(e, dict) for e in v)
+
+
+def diff_config(before: Any, after: Any, path: str = "") -> List[Change]:
+    """
+    changes that turn config *before* into config *after*
+
+    Args:
+        before: decoded config tree
+        after: decoded config tree
+        path: gNMI path of both trees, prepended to the path of every change
+
+    Returns:
+        list: :class:`Change` per added, deleted or modified leaf, container or
+            list entry, in tree order
+    """
+    changes: List[Change] = []
+    _diff(before, after, path, changes)
+    return changes
+
+
+def _diff(a: Any, b: Any, path: str, out: List[Change]) -> None:
+    if isinstance(a, dict) and isinstance(b, dict):
+        for k, va in a.items():
+            p = f"{path}/{k}"
+            if k not in b:
+                if _is_keyed_list(va):
+                    _diff_list(va, [], p, out)
+                else:
+                    out.append(Change(DELETE, p, va, None))
+            else:
+                _diff(va, b[k], p, out)
+        for k, vb in b.items():
+            if k not in a:
+                p = f"{path}/{k}"
+                if _is_keyed_list(vb):
+                    _diff_list([], vb, p, out)
+                else:
+                    out.append(Change(ADD, p, None, vb))
+        return
+    if (
+        isinstance(a, list)
+        and isinstance(b, list)
+        and (_is_keyed_list(a) or _is_keyed_list(b))
+    ):
+        _diff_list(a, b, path, out)
+        return
+    if a != b:
+        out.append(Change(MODIFY, path, a, b))
+
+
+def _diff_list(a: List[Any], b: List[Any], path: str, out: List[Change]) -> None:
+    keys = list_keys(path, a, b)
+    if keys is None:  # key not known, compared as a whole
+        if a != b:
+            op = ADD if not a else DELETE if not b else MODIFY
+            out.append(Change(op, path, a or None, b or None))
+        return
+    by_key: Dict[Any, Any] = {_entry_key(e, keys): e for e in b}
+    seen = set()
+    for ea in a:
+        ka = _entry_key(ea, keys)
+        p = entry_path(path, ea, keys)
+        eb = by_key.get(ka)
+        if eb is None:
+            out.append(Change(DELETE, p, ea, None))
+        else:
+            seen.add(ka)
+            if ea != eb:  # most entries are unchanged, compared at C speed
+                _diff(ea, eb, p, out)
+    for eb in b:
+        if _entry_key(eb, keys) not in seen:
+            out.append(Change(ADD, entry_path(path, eb, keys), None, eb))
+
+
+def _top_key(d: Any) -> Optional[str]:
+    if isinstance(d, dict) and len(d) == 1:
+        return "/" + str(next(iter(d))).strip("/")
+    return None
+
+
+def diff_config_list(before: List[Any], after: List[Any]) -> List[Change]:
+    """
+    changes between per-path configs as returned by a Get and as given to a Set
+
+    Entries are ``{path: config}`` dicts compared pairwise, an empty dict is a path
+    without config. Paths that only differ in a leading ``/`` are the same, changes
+    are addressed from that path.
+    """
+    changes: List[Change] = []
+    for b, a in zip(before, after):
+        pb, pa = _top_key(b), _top_key(a)
+        path = pb or pa
+        if path is None or (pb != pa and b and a):
+            _diff(b, a, "", changes)
+        elif not b:
+            changes.append(Change(ADD, path, None, next(iter(a.values()))))
+        elif not a:
+            changes.append(Change(DELETE, path, next(iter(b.values())), None))
+        else:
+            _diff(
+                next(iter(b.values())),
+                next(iter(a.values())),
+                path.rstrip("/"),
+                changes,
+            )
+    return changes
+
+
+def merge_config(base: Any, update: Any, path: str = "", strict: bool = False) -> Any:
+    """
+    *base* config with *update* merged in, as a gNMI Set update does
+
+    Containers are merged recursively, entries of lists with known keys (see
+    :func:`list_keys`) are merged on their key and new entries appended, leaves
+    and leaf-lists are replaced. Neither argument is modified.
+
+    How the device merges entries of lists with unknown keys cannot be told. With
+    *strict* that raises :class:`UnknownListKey`, otherwise the entries of
+    *update* that are not in *base* are appended, an approximation.
+
+    Args:
+        path: gNMI path of both configs, to find the keys of the lists in them
+        strict: raise instead of approximating nested paths and merges of lists
+    """
+    if isinstance(base, dict) and isinstance(update, dict):
+        merged = dict(base)
+        for k, v in update.items():
+            merged[k] = (
+                merge_config(base[k], v, f"{path}/{k}", strict) if k in base else v
+            )
+        return merged
+    if _is_keyed_list(base) and _is_keyed_list(update):
+        keys = list_keys(path, base, update)
+        if keys is None:
+            if strict:
+                raise UnknownListKey(path)
+            return list(base) + [e for e in update if e not in base]
+        entries = list(base)
+        index = {_entry_key(e, keys): i for i, e in enumerate(entries)}
+        for e in update:
+            k = _entry_key(e, keys)
+            i = index.get(k)
+            if i is None:
+                index[k] = len(entries)
+                entries.append(e)
+            else:
+                entries[i] = merge_config(
+                    entries[i], e, entry_path(path, e, keys), strict
+                )
+        return entries
+    return update
+
+
+def apply_set(
+    before: List[Dict[str, Any]], input: List[Dict[str, Any]], op: str
+) -> List[Dict[str, Any]]:
+    """
+    config at the paths of a Set after it succeeded, computed from the config before
+
+    Args:
+        before: per-path config before the Set, in the order of the paths in *input*
+        input: list of ``{path: config}`` dicts given to the Set
+        op: ``update``, ``replace`` or ``delete``
+
+    Returns:
+        list: per-path config after the Set, an empty dict for a deleted path
+    """
+    paths = [p for d in input for p in d]
+    if op == "update":
+        return apply_transaction(before, paths, update=input)
+    if op == "replace":
+        return apply_transaction(before, paths, replace=input)
+    if op == "delete":
+        return apply_transaction(before, paths, delete=paths)
+    raise ValueError(f"invalid value for parameter 'op': {op}")
+
+
+def apply_transaction(
+    before: List[Dict[str, Any]],
+    paths: List[str],
+    delete: Sequence[str] = (),
+    replace: Sequence[Dict[str, Any]] = (),
+    update: Sequence[Dict[str, Any]] = (),
+    strict: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    config at *paths* after a Set with deletes, replaces and updates succeeded
+
+    As specified by gNMI, deletes are applied first, then replaces, then updates.
+    The config of each path is tracked on its own, so with *strict*
+    :class:`OverlappingPaths` is raised if a path is nested in another one, e.g. a
+    deleted child of an updated parent, and :class:`UnknownListKey` if the result
+    depends on how the device merges a list with unknown keys, see
+    :func:`merge_config`. Without *strict*, the result is approximate in both cases.
+
+    Args:
+        before: per-path config before the Set, in the order of *paths*
+        paths: all paths of the Set
+        delete: paths to delete
+        replace: list of ``{path: config}`` dicts to replace
+        update: list of ``{path: config}`` dicts to merge
+        strict: raise instead of approximating nested paths and merges of lists
+
+    Returns:
+        list: per-path config after the Set, an empty dict for a deleted path
+    """
+    if strict:
+        nested = _nested_path(paths)
+        if nested:
+            raise OverlappingPaths(nested)
+    state: Dict[str, Any] = {
+        p: next(iter(b.values())) if b else None for p, b in zip(paths, before)
+    }
+    for p in delete:
+        state[p] = None
+    for d in replace:
+        state.update(d)
+    for d in update:
+        for p, v in d.items():
+            state[p] = (
+                v if state.get(p) is None else merge_config(state[p], v, p, strict)
+            )
+    return [{p: state[p]} if state.get(p) is not None else {} for p in paths]
+
+
+def _nested_path(paths: Sequence[str]) -> Optional[str]:
+    """a path of *paths* within another one, a list without keys covering its entries"""
+    names: Dict[str, List[List[str]]] = {}
+    for p in set(paths):
+        elements = split_path(p)
+        if elements:
+            names.setdefault(elements[0].split("[", 1)[0], []).append(elements)
+    for group in names.values():
+        for outer in group:
+            for inner in group:
+                if len(inner) > len(outer) and all(
+                    o == i or ("[" not in o and i.split("[", 1)[0] == o)
+                    for o, i in zip(outer, inner)
+                ):
+                    return "/" + "/".join(inner)
+    return None
+
+
+def set_arguments(
+    update: Optional[List[Dict[str, Any]]],
+    replace: Optional[List[Dict[str, Any]]],
+    delete: Optional[List[str]],
+) -> Tuple[List[str], Dict[str, Any]]:
+    """
+    all paths of a Set without duplicates, and the delete, replace and update
+    arguments of the Set in the form of pygnmi's ``set``, without empty ones
+    """
+    sets: Dict[str, Any] = {
+        "delete": list(delete or []),
+        "replace": [(p, v) for d in replace or [] for p, v in d.items()],
+        "update": [(p, v) for d in update or [] for p, v in d.items()],
+    }
+    paths = [*sets["delete"], *(p for p, _ in sets["replace"] + sets["update"])]
+    return list(dict.fromkeys(paths)), {k: v for k, v in sets.items() if v}
+
+
+def split_path(path: str) -> List[str]:
+    """elements of gNMI *path*, ``/`` in list keys such as interface names included"""
+    elements: List[str] = []
+    depth = 0
+    current = ""
+    for c in path:
+        if c == "/" and depth == 0:
+            if current:
+                elements.append(current)
+            current = ""
+            continue
+        if c == "[":
+            depth += 1
+        elif c == "]":
+            depth -= 1
+        current += c
+    if current:
+        elements.append(current)
+    return elements
+
+
+RE_PATH_KEY = re.compile(r"\[([^=\]]+)=([^\]]*)\]")
+
+
+def config_at(config: Any, path: str) -> Any:
+    """subtree of *config* at gNMI *path*, None if there is none"""
+    node = config
+    for element in split_path(path):
+        name = element.split("[", 1)[0]
+        if not isinstance(node, dict) or name not in node:
+            return None
+        node = node[name]
+        keys = RE_PATH_KEY.findall(element)
+        if keys:
+            if not isinstance(node, list):
+                return None
+            node = next(
+                (
+                    e
+                    for e in node
+                    if isinstance(e, dict) and all(str(e.get(k)) == v for k, v in keys)
+                ),
+                None,
+            )
+            if node is None:
+                return None
+    return node
+
+
+def change_sets(changes: List[Change], after: Any = None) -> Dict[str, Any]:
+    """
+    Set arguments that apply *changes* to the config they were computed on
+
+    Added subtrees are updated, modified ones replaced and deleted ones deleted,
+    each at the path of its change, so only the changed subtrees are sent.
+    Change paths address list entries by all their keys, see :data:`LIST_KEYS`.
+    A list with unknown keys changes as a whole: given config *after*, the
+    container or entry holding such a list is replaced instead, so that no
+    path points at a whole list.
+
+    Returns:
+        dict: ``update``, ``replace`` and ``delete`` arguments of
+            :meth:`SrLinux.commit_config`
+    """
+    parents: Dict[str, Any] = {}
+    if after is not None:
+        for c in changes:
+            if c.op != DELETE and _is_keyed_list(c.after):
+                parent = "/" + "/".join(split_path(c.path)[:-1])
+                value = config_at(after, parent)
+                if parent != "/" and value is not None:
+                    parents[parent] = value
+    for p in sorted(parents):  # an enclosing parent replaces nested ones
+        if any(p.startswith(q + "/") for q in parents if q != p):
+            del parents[p]
+
+    def _covered(path: str) -> bool:
+        return any(path == p or path.startswith(p + "/") for p in parents)
+
+    changes = [c for c in changes if not _covered(c.path)]
+    return {
+        "update": [{c.path: c.after} for c in changes if c.op == ADD],
+        "replace": [{c.path: c.after} for c in changes if c.op == MODIFY]
+        + [{p: v} for p, v in parents.items()],
+        "delete": [c.path for c in changes if c.op == DELETE],
+    }
+
+
+def _delta_key(*entries: Sequence[Any]) -> Optional[str]:
+    """
+    a field identifying the entries of lists of dicts in a delta, if any
+
+    Any scalar field whose values are unique within each list will do, as a delta
+    is only ever applied locally, by :func:`apply_delta`: it is exact whichever
+    field is used. Key fields of :data:`LIST_KEYS` are preferred, they are
+    stable across versions.
+    """
+    items = [e for lst in entries for e in lst]
+    preferred = [k for alts in LIST_KEYS.values() for keys in alts for k in keys]
+    common = [
+        k
+        for k, v in items[0].items()
+        if isinstance(v, (str, int, float))
+        and all(isinstance(e.get(k), (str, int, float)) for e in items)
+    ]
+    common.sort(key=lambda k: preferred.index(k) if k in preferred else len(preferred))
+    for k in common:
+        if all(len({e[k] for e in lst}) == len(lst) for lst in entries):
+            return k
+    return None
+
+
+def config_delta(before: Any, after: Any) -> Dict[str, Any]:
+    """
+    compact delta that turns config *before* into config *after*, see :func:`apply_delta`
+
+    Dicts are compared key by key and entries of keyed lists on their list key, so
+    the delta only holds the changed leaves and entries. It is one of:
+
+    - ``{"=": value}``: *after* as a whole
+    - ``{"dict": {"set": {...}, "del": [...], "sub": {...}}}``: new or replaced
+      keys, deleted keys and deltas of changed keys
+    - ``{"list": {"key": ..., "set": [...], "del": [...], "sub": [...], "order":
+      [...]}}``: new entries, keys of deleted entries and ``[key, delta]`` of
+      changed entries of a keyed list, ``order`` only if entries moved
+    - ``{"seq": [[index, delta], ...]}``: changed items of other lists of the same
+      length
+    """
+    if isinstance(before, dict) and isinstance(after, dict):
+        d: Dict[str, Any] = {
+            "set": {k: v for k, v in after.items() if k not in before},
+            "del": [k for k in before if k not in after],
+            "sub": {
+                k: config_delta(before[k], v)
+                for k, v in after.items()
+                if k in before and before[k] != v
+            },
+        }
+        return {"dict": {k: v for k, v in d.items() if v}}
+    if isinstance(before, list) and isinstance(after, list) and before and after:
+        key = (
+            _delta_key(before, after)
+            if _is_keyed_list(before) and _is_keyed_list(after)
+            else None
+        )
+        if key is not None:
+            by_key = {e[key]: e for e in before}
+            after_keys = {e[key] for e in after}
+            new = [e for e in after if e[key] not in by_key]
+            ld: Dict[str, Any] = {
+                "key": key,
+                "set": new,
+                "del": [e[key] for e in before if e[key] not in after_keys],
+                "sub": [
+                    [e[key], config_delta(by_key[e[key]], e)]
+                    for e in after
+                    if e[key] in by_key and by_key[e[key]] != e
+                ],
+            }
+            order = [e[key] for e in after]
+            if order != [e[key] for e in before if e[key] in after_keys] + [
+                e[key] for e in new
+            ]:
+                ld["order"] = order
+            return {"list": {k: v for k, v in ld.items() if v or k == "key"}}
+        if len(before) == len(after):
+            return {
+                "seq": [
+                    [i, config_delta(b, a)]
+                    for i, (b, a) in enumerate(zip(before, after))
+                    if b != a
+                ]
+            }
+    return {"=": after}
+
+
+def apply_delta(before: Any, delta: Dict[str, Any]) -> Any:
+    """
+    config *before* with *delta* of :func:`config_delta` applied
+
+    *before* is not modified, unchanged subtrees are shared with the result.
+    """
+    if "=" in delta:
+        return delta["="]
+    if "dict" in delta:
+        d = delta["dict"]
+        deleted = set(d.get("del", ()))
+        out = {k: v for k, v in before.items() if k not in deleted}
+        for k, sub in d.get("sub", {}).items():
+            out[k] = apply_delta(before[k], sub)
+        out.update(d.get("set", {}))
+        return out
+    if "list" in delta:
+        ld = delta["list"]
+        key = ld["key"]
+        deleted = set(ld.get("del", ()))
+        subs = {k: sub for k, sub in ld.get("sub", ())}
+        entries = [
+            apply_delta(e, subs[e[key]]) if e[key] in subs else e
+            for e in before
+            if e[key] not in deleted
+        ] + list(ld.get("set", ()))
+        if "order" in ld:
+            pos = {k: i for i, k in enumerate(ld["order"])}
+            entries.sort(key=lambda e: pos[e[key]])
+        return entries
+    if "seq" in delta:
+        items = list(before)
+        for i, sub in delta["seq"]:
+            items[i] = apply_delta(items[i], sub)
+        return items
+    raise ValueError(f"invalid config delta: {list(delta)}")
+
+
+def _lines(prefix: str, value: Any) -> List[str]:
+    text = json.dumps(value, indent=2, sort_keys=True, default=str)
+    return [f"{prefix}{line}\n" for line in text.splitlines()]
+
+
+def render_changes(
+    changes: List[Change], fromfile: str = "before", tofile: str = "after"
+) -> str:
+    """
+    unified-diff-like text of *changes*: a hunk per change, headed by its path
+
+    Returns:
+        str: the rendered changes, empty if there are none
+    """
+    if not changes:
+        return ""
+    lines = [f"--- {fromfile}\n", f"+++ {tofile}\n"]
+    for c in changes:
+        lines.append(f"@@ {c.path or '/'} @@\n")
+        if c.op != ADD:
+            lines += _lines("-", c.before)
+        if c.op != DELETE:
+            lines += _lines("+", c.after)
+    return "".join(lines)
@@ -0,0 +1,106 @@
+"""Registry of compiled JMESPath expressions used by the getters."""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Hashable, Iterable, Tuple, Union
+
+import jmespath
+from jmespath.parser import ParsedResult
+
+from .row_builders import RowBuilder, compile_row_builder
+
+ExpressionKey = Tuple[Hashable, ...]
+Compiled = Union[ParsedResult, RowBuilder]
+
+ENGINES = ("jmespath", "python")
+# reports projected by row builders by default, the ones that produce large tables
+ROW_BUILDER_REPORTS = ("bgp_rib", "mac_table", "ip_rib")
+
+
+class ExpressionRegistry:
+    """
+    Compiles each JMESPath expression once and keeps it for the process lifetime
+
+    Expressions are keyed by what determines them, e.g. ``("bgp_rib", route_fam,
+    route_type, path_version, detail)``, rather than by their text, so a hit is a
+    dict lookup on a short tuple. Unlike jmespath's own parser cache, entries are
+    never evicted, the set of keys is bounded by the getters' parameters.
+
+    The projection engine is selected per report, i.e. by the first element of
+    the key: ``jmespath`` evaluates the parsed expression with jmespath's
+    interpreter, ``python`` compiles it into a :class:`RowBuilder` with identical
+    output. Expressions a row builder cannot handle fall back to jmespath.
+    """
+
+    def __init__(self, python_reports: Iterable[str] = ROW_BUILDER_REPORTS) -> None:
+        self._compiled: Dict[ExpressionKey, Compiled] = {}
+        self._engines: Dict[Hashable, str] = {
+            report: "python" for report in python_reports
+        }
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._compiled)
+
+    def __contains__(self, key: ExpressionKey) -> bool:
+        return key in self._compiled
+
+    def engine(self, report: Hashable) -> str:
+        """projection engine of *report*"""
+        return self._engines.get(report, "jmespath")
+
+    def set_engine(self, report: Hashable, engine: str) -> None:
+        """
+        select the projection engine of *report*
+
+        Args:
+            report: first element of the expression keys of the report, e.g. ``bgp_rib``
+            engine: ``jmespath`` or ``python``
+        """
+        if engine not in ENGINES:
+            raise ValueError(
+                f"Unknown projection engine {engine}, use one of {ENGINES}"
+            )
+        with self._lock:
+            self._engines[report] = engine
+            for key in [k for k in self._compiled if k[:1] == (report,)]:
+                del self._compiled[key]
+
+    def get(self, key: ExpressionKey, expression: str) -> Compiled:
+        """
+        compiled expression for *key*, compiling *expression* on first use
+
+        Args:
+            key: tuple identifying the expression
+            expression: expression text
+        """
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            if key and self.engine(key[0]) == "python":
+                compiled = compile_row_builder(expression) or jmespath.compile(
+                    expression
+                )
+            else:
+                compiled = jmespath.compile(expression)
+            with self._lock:
+                compiled = self._compiled.setdefault(key, compiled)
+        return compiled
+
+    def search(
+        self,
+        key: ExpressionKey,
+        expression: str,
+        data: Any,
+    ) -> Any:
+        return self.get(key, expression).search(data)
+
+    def items(self) -> Dict[ExpressionKey, Compiled]:
+        return dict(self._compiled)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._compiled.clear()
+
+
+EXPRESSIONS = ExpressionRegistry()
@@ -1,8 +1,11 @@
 from typing import Any, Dict, List, Tuple, Optional, Union
-import json
-import difflib
 import re
-import ipaddress
+
+from .config_diff import diff_config, diff_config_list, render_changes
+from .prefix_index import PrefixIndex
+
+# A single Get request spec: (gNMI path, datatype)
+GetSpec = Tuple[str, str]
 
 
 def normalize_gnmi_resp(resp: Dict) -> List[Dict[str, Any]]:
@@ -37,28 +40,57 @@ def normalize_gnmi_resp(resp: Dict) -> List[Dict[str, Any]]:
     return r
 
 
+def group_specs(specs: List[GetSpec]) -> Dict[str, List[str]]:
+    """
+    group Get specs per datatype, preserving order and dropping duplicates
+
+    Args:
+        specs: list of (path, datatype) tuples
+
+    Returns:
+        dict: datatype -> list of paths
+    """
+    groups: Dict[str, List[str]] = {}
+    for path, datatype in specs:
+        paths = groups.setdefault(datatype, [])
+        if path not in paths:
+            paths.append(path)
+    return groups
+
+
+def diff_cfg_list(before: List[Dict], after: List[Dict]) -> str:
+    """
+    diff of the before and after state of a set of config paths
+
+    Args:
+        before: list of per-path config before the change
+        after: list of per-path config after the change, same order as before
+
+    Returns:
+        str: a hunk per changed leaf or subtree, see :func:`render_changes`, empty
+            if nothing changed
+    """
+    return render_changes(diff_config_list(before, after))
+
+
 def lpm(ip_address: str, prefix_list: List[str]) -> str:
     """
     longest prefix match
 
+    Builds a :class:`PrefixIndex` for a single lookup, use that class directly to
+    look up many addresses in the same prefix list.
+
     Args:
         ip_address: ip address to match (v6 or v4)
         prefix_list: list of prefixes to match against
 
     Returns:
-        str: longest prefix matched
-    """
-    ip_addr = ipaddress.ip_address(ip_address)
-    longest_pfx_str: str = ""
+        str: longest prefix matched, normalized as by ``ipaddress.ip_network()``
 
-    max_pfx_len = -1
-    for prefix in prefix_list:
-        ip_pfx = ipaddress.ip_network(prefix)
-        if ip_addr in ip_pfx:
-            if ip_pfx.prefixlen > max_pfx_len:
-                max_pfx_len = ip_pfx.prefixlen
-                longest_pfx_str = str(ip_pfx)
-    return longest_pfx_str
+    Raises:
+        ValueError: a prefix is invalid or has host bits set
+    """
+    return PrefixIndex.from_prefixes(prefix_list, strict=True).lookup(ip_address) or ""
 
 
 def diff_obj(a: Dict, a_name: str, b: Dict, b_name: str) -> Tuple[bool, str]:
@@ -77,21 +109,8 @@ def diff_obj(a: Dict, a_name: str, b: Dict, b_name: str) -> Tuple[bool, str]:
             diff-string: string showing diffs beteen a and b
     """
 
-    a_json = json.dumps(a, indent=2, sort_keys=True)
-    b_json = json.dumps(b, indent=2, sort_keys=True)
-
-    diff = ""
-    for line in difflib.unified_diff(
-        a_json.splitlines(keepends=True),
-        b_json.splitlines(keepends=True),
-        fromfile=a_name,
-        tofile=b_name,
-    ):
-        diff += line
-    if not diff == "":
-        return (True, diff)
-    else:
-        return (False, "")
+    diff = render_changes(diff_config(a, b), fromfile=a_name, tofile=b_name)
+    return (len(diff) > 0, diff)
 
 
 _ORDER_PREFIX_RE = re.compile(r"^\d+_")
@@ -117,20 +136,87 @@ def filter_fields(d: Dict, *fields: str) -> Dict:
     return {k: v for k, v in d.items() if k in [f.replace("_", "-") for f in fields]}
 
 
-def strip_modules(d: Dict) -> Any:
-    p = re.compile(r"srl_nokia-[^:]+:")
+MODULE_PREFIX = "srl_nokia-"
+RE_MODULE_PREFIX = re.compile(r"srl_nokia-[^:]+:")
 
-    if isinstance(d, list):
-        return [strip_modules(x) for x in d]
-    elif isinstance(d, dict):
-        return {strip_modules(k): strip_modules(v) for k, v in d.items()}
-    elif isinstance(d, str):
-        if d.startswith("srl_nokia-") and ":" in d:
-            #            return d[(d.index(":") + 1):]
-            return re.sub(p, "", d)
-        return d
-    else:
+
+def _strip_str(s: str) -> str:
+    if s.startswith(MODULE_PREFIX) and ":" in s:
+        return RE_MODULE_PREFIX.sub("", s)
+    return s
+
+
+def has_modules(d: Any) -> bool:
+    """
+    True if any key or string value in *d* carries a module prefix
+
+    Walks the structure with an explicit stack and stops at the first prefix found,
+    without allocating anything per node.
+    """
+    stack = [d]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, dict):
+            for k, v in obj.items():
+                if isinstance(k, str) and k.startswith(MODULE_PREFIX) and ":" in k:
+                    return True
+                if isinstance(v, (dict, list)):
+                    stack.append(v)
+                elif isinstance(v, str) and v.startswith(MODULE_PREFIX) and ":" in v:
+                    return True
+        elif isinstance(obj, list):
+            for v in obj:
+                if isinstance(v, (dict, list)):
+                    stack.append(v)
+                elif isinstance(v, str) and v.startswith(MODULE_PREFIX) and ":" in v:
+                    return True
+        elif isinstance(obj, str):
+            return obj.startswith(MODULE_PREFIX) and ":" in obj
+    return False
+
+
+def strip_modules(d: Any) -> Any:
+    """
+    remove module prefixes, e.g. ``srl_nokia-interfaces:``, from keys and string values
+
+    Dicts and lists are modified in place and returned, so responses without any
+    module prefix are returned untouched and no copy of the response is made.
+    Keys keep their order; if stripping makes two keys equal, the last value wins.
+
+    Args:
+        d: decoded JSON response, a dict, list or scalar
+
+    Returns:
+        *d* with prefixes removed, a new string if *d* is a string
+    """
+    if isinstance(d, str):
+        return _strip_str(d)
+    if not has_modules(d):
         return d
+    stack = [d]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, dict):
+            rekey = False
+            for k, v in obj.items():
+                if isinstance(k, str) and k.startswith(MODULE_PREFIX):
+                    rekey = True
+                if isinstance(v, (dict, list)):
+                    stack.append(v)
+                elif isinstance(v, str) and v.startswith(MODULE_PREFIX):
+                    obj[k] = _strip_str(v)
+            if rekey:
+                items = list(obj.items())
+                obj.clear()
+                for k, v in items:
+                    obj[_strip_str(k) if isinstance(k, str) else k] = v
+        elif isinstance(obj, list):
+            for i, v in enumerate(obj):
+                if isinstance(v, (dict, list)):
+                    stack.append(v)
+                elif isinstance(v, str) and v.startswith(MODULE_PREFIX):
+                    obj[i] = _strip_str(v)
+    return d
 
 
 # def strip_modules(d: Dict) -> Dict:
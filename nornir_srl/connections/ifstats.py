@@ -2,8 +2,193 @@
 
 from __future__ import annotations
 
+import re
+import threading
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .rates import RateEngine, counter_delta
+
+# statistics leaf -> counter name used in the report rows
+IFSTATS_COUNTERS = {
+    "in-packets": "in-packets",
+    "out-packets": "out-packets",
+    "in-octets": "in-octets",
+    "out-octets": "out-octets",
+    "in-error-packets": "in-errors",
+    "out-error-packets": "out-errors",
+    "in-discarded-packets": "in-discards",
+    "out-discarded-packets": "out-discards",
+}
+
+RE_ITF_KEY = re.compile(r"interface\[name=([^\]]+)\]")
+
+
+def _ifstats_row(
+    name: str, deltas: Dict[str, int], c2: Dict[str, int], dt: float
+) -> Dict[str, Any]:
+    """build a report row from the counter increases over *dt* seconds up to *c2*"""
+
+    def _delta(counter: str) -> int:
+        return deltas.get(counter, 0)
+
+    in_bps = round(_delta("in-octets") * 8 / dt) if dt > 0 else 0
+    out_bps = round(_delta("out-octets") * 8 / dt) if dt > 0 else 0
+    # Cumulative counters are always reported (even for idle interfaces)
+    # so tests and agents can read raw packet/octet totals.
+    return {
+        "interface": name,
+        "in-Kbps": round(in_bps / 1000, 1),
+        "out-Kbps": round(out_bps / 1000, 1),
+        "in-err": _delta("in-errors"),
+        "out-err": _delta("out-errors"),
+        "in-disc": _delta("in-discards"),
+        "out-disc": _delta("out-discards"),
+        "in-pkts": c2.get("in-packets", 0),
+        "out-pkts": c2.get("out-packets", 0),
+        "in-octets": c2.get("in-octets", 0),
+        "out-octets": c2.get("out-octets", 0),
+    }
+
+
+def _window_row(
+    name: str, window: Optional[float], r: Dict[str, float]
+) -> Dict[str, Any]:
+    """build a report row from the counter rates of one window"""
+    return {
+        "interface": name,
+        "window": f"{window:g}s" if window else "last",
+        "in-Kbps": round(r["in-octets"] * 8 / 1000, 1),
+        "out-Kbps": round(r["out-octets"] * 8 / 1000, 1),
+        "in-pps": round(r["in-packets"], 1),
+        "out-pps": round(r["out-packets"], 1),
+        "in-err/s": round(r["in-errors"], 2),
+        "out-err/s": round(r["out-errors"], 2),
+        "in-disc/s": round(r["in-discards"], 2),
+        "out-disc/s": round(r["out-discards"], 2),
+    }
+
+
+class IfStatsStream:
+    """
+    Rolling window of interface counters fed by a gNMI SAMPLE subscription
+
+    A background thread consumes the subscription and keeps, per interface, the
+    counter samples of the last *history* seconds, timestamped by the device, in
+    a :class:`~.rates.RateEngine`. Rates are computed from the samples in the
+    requested window, so they are available at any time without polling the
+    device.
+    """
+
+    def __init__(self, subscriber: Any, interval: int, history: int = 300):
+        self.interval = interval
+        self.error: Optional[BaseException] = None
+        self._subscriber = subscriber
+        self._engine = RateEngine(
+            list(IFSTATS_COUNTERS.values()),
+            capacity=max(history, 2 * interval) // max(interval, 1) + 2,
+        )
+        self._ready = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._consume, name="ifstats-stream", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def alive(self) -> bool:
+        return self._thread.is_alive() and self.error is None
+
+    def _consume(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                msg = self._subscriber.get_update(timeout=1)
+            except TimeoutError:
+                if getattr(self._subscriber, "error", None) is not None:
+                    self.error = self._subscriber.error
+                    break
+                continue
+            except Exception as e:
+                if not self._stopped.is_set():
+                    self.error = e
+                break
+            self.process(msg)
+        self._ready.set()  # release waiters, they check `error`
+
+    def process(self, msg: Dict[str, Any]) -> None:
+        """merge one (parsed) SubscribeResponse into the per-interface samples"""
+        notif = msg.get("update")
+        if not isinstance(notif, dict):
+            return
+        ts = notif.get("timestamp") or time.time_ns()
+        # pygnmi coalesces the initial sync into one message with the prefix of
+        # the last notification only, so prefixes cannot be trusted there
+        prefix = "" if "sync_response" in msg else notif.get("prefix") or ""
+        updates: Dict[str, Dict[str, int]] = {}
+        for u in notif.get("update", []):
+            path = "/".join(p for p in (prefix, u.get("path") or "") if p)
+            m = RE_ITF_KEY.search(path)
+            if not m:
+                continue
+            leaf = path[m.end() :].rsplit("/", 1)[-1].split(":")[-1]
+            val = u.get("val")
+            if isinstance(val, dict):
+                items = [(k.split(":")[-1], v) for k, v in val.items()]
+            else:
+                items = [(leaf, val)]
+            counters = updates.setdefault(m.group(1), {})
+            for k, v in items:
+                if k in IFSTATS_COUNTERS:
+                    counters[IFSTATS_COUNTERS[k]] = int(v)
+        if not updates:
+            return
+        for name, counters in updates.items():
+            self._engine.add(name, ts, counters)
+        if all(self._engine.samples(k) > 1 for k in self._engine.keys()):
+            self._ready.set()
+
+    def wait_ready(self, timeout: float) -> bool:
+        """wait until every interface has at least two samples"""
+        return self._ready.wait(timeout) and self.error is None
+
+    def rows(self, window: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        rates per interface over the last *window* seconds
+
+        Args:
+            window: seconds to compute rates over, defaults to the last sample interval
+
+        Returns:
+            list: report rows, same format as :meth:`InterfaceStatsMixin.get_ifstats`
+        """
+        rows: List[Dict[str, Any]] = []
+        rates = self._engine.rates([window or None])
+        for name in sorted(rates, key=str):
+            r = rates[name][window or None]
+            deltas = {k: round(v * r["seconds"]) for k, v in r.items()}
+            rows.append(
+                _ifstats_row(str(name), deltas, self._engine.latest(name), r["seconds"])
+            )
+        return rows
+
+    def window_rows(self, windows: Sequence[Optional[float]]) -> List[Dict[str, Any]]:
+        """rates per interface and window, computed in one pass over all interfaces"""
+        rates = self._engine.rates(windows)
+        return [
+            _window_row(str(name), w, rates[name][w])
+            for name in sorted(rates, key=str)
+            for w in windows
+        ]
+
+    def percentiles(
+        self, window: Optional[float] = None, q: Sequence[float] = (50, 90, 99)
+    ) -> Dict[str, Dict[float, float]]:
+        """percentiles of the per-second counter rates across all interfaces"""
+        return self._engine.percentiles(window, q)
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._subscriber.close()
 
 
 class InterfaceStatsMixin:
@@ -18,15 +203,45 @@ class InterfaceStatsMixin:
         """Placeholder method implemented in :class:`SrLinux`."""
         raise NotImplementedError
 
-    def get_ifstats(self, interface: str = "*", interval: int = 5) -> Dict[str, Any]:
+    def subscribe(self, subscribe: Dict[str, Any]) -> Any:
+        """Placeholder method implemented in :class:`SrLinux`."""
+        raise NotImplementedError
+
+    def get_ifstats(
+        self,
+        interface: str = "*",
+        interval: int = 5,
+        stream: bool = False,
+        window: Optional[int] = None,
+        windows: Optional[Sequence[int]] = None,
+    ) -> Dict[str, Any]:
         """Return per-interface in/out bps computed from two samples *interval* seconds apart.
 
+        Counter wraps and resets between samples are accounted for.
+
         Args:
             interface: Interface name filter (default ``*`` = all interfaces).
             interval: Seconds between the two gNMI samples (default 5).
+            stream: Use a SAMPLE subscription that is kept open on the connection
+                instead of two Gets. Subsequent calls return immediately.
+            window: Seconds to compute streamed rates over (default: one interval).
+            windows: With *stream*, return bps/pps/error rates per interface for each
+                of these windows in seconds (e.g. 5, 60, 300) instead.
         """
         path = f"/interface[name={interface}]/statistics"
 
+        if stream:
+            ifstream = self.ifstats_stream(interface, interval)
+            if not ifstream.wait_ready(timeout=2 * interval + 10):
+                raise Exception(
+                    f"No interface statistics streamed for {path}: {ifstream.error}"
+                )
+            if windows:
+                return {"ifstats": ifstream.window_rows(windows)}
+            return {"ifstats": ifstream.rows(window=window)}
+        if windows:
+            raise ValueError("rates over several windows require stream=True")
+
         def _sample() -> tuple:
             resp = self.get(paths=[path], datatype="state")
             ts = time.monotonic()
@@ -45,14 +260,8 @@ class InterfaceStatsMixin:
                 name = itf.get("name", "")
                 stats = itf.get("statistics", {})
                 result[name] = {
-                    "in-packets": int(stats.get("in-packets", 0)),
-                    "out-packets": int(stats.get("out-packets", 0)),
-                    "in-octets": int(stats.get("in-octets", 0)),
-                    "out-octets": int(stats.get("out-octets", 0)),
-                    "in-errors": int(stats.get("in-error-packets", 0)),
-                    "out-errors": int(stats.get("out-error-packets", 0)),
-                    "in-discards": int(stats.get("in-discarded-packets", 0)),
-                    "out-discards": int(stats.get("out-discarded-packets", 0)),
+                    counter: int(stats.get(leaf, 0))
+                    for leaf, counter in IFSTATS_COUNTERS.items()
                 }
             return result
 
@@ -63,30 +272,44 @@ class InterfaceStatsMixin:
         for name in sorted(s2.keys()):
             if name not in s1:
                 continue
-            d_in = s2[name]["in-octets"] - s1[name]["in-octets"]
-            d_out = s2[name]["out-octets"] - s1[name]["out-octets"]
-            in_bps = round(d_in * 8 / dt)
-            out_bps = round(d_out * 8 / dt)
-            in_err = s2[name]["in-errors"] - s1[name]["in-errors"]
-            out_err = s2[name]["out-errors"] - s1[name]["out-errors"]
-            in_disc = s2[name]["in-discards"] - s1[name]["in-discards"]
-            out_disc = s2[name]["out-discards"] - s1[name]["out-discards"]
-            # Cumulative counters are always reported (even for idle interfaces)
-            # so tests and agents can read raw packet/octet totals.
-            rows.append(
+            deltas = {
+                k: counter_delta(s1[name].get(k, 0), v) for k, v in s2[name].items()
+            }
+            rows.append(_ifstats_row(name, deltas, s2[name], dt))
+
+        return {"ifstats": rows}
+
+    def ifstats_stream(self, interface: str = "*", interval: int = 5) -> IfStatsStream:
+        """
+        Return the SAMPLE subscription for *interface*, opening it on first use
+
+        One subscription per interface filter and sample interval is kept on the
+        connection until :meth:`close_ifstats_streams` is called.
+        """
+        streams: Dict[Tuple[str, int], IfStatsStream] = self.__dict__.setdefault(
+            "_ifstats_streams", {}
+        )
+        ifstream = streams.get((interface, interval))
+        if ifstream is None or not ifstream.alive:
+            if ifstream is not None:
+                ifstream.close()
+            subscriber = self.subscribe(
                 {
-                    "interface": name,
-                    "in-Kbps": round(in_bps / 1000, 1),
-                    "out-Kbps": round(out_bps / 1000, 1),
-                    "in-err": in_err,
-                    "out-err": out_err,
-                    "in-disc": in_disc,
-                    "out-disc": out_disc,
-                    "in-pkts": s2[name]["in-packets"],
-                    "out-pkts": s2[name]["out-packets"],
-                    "in-octets": s2[name]["in-octets"],
-                    "out-octets": s2[name]["out-octets"],
+                    "subscription": [
+                        {
+                            "path": f"/interface[name={interface}]/statistics",
+                            "mode": "sample",
+                            "sample_interval": interval * 1_000_000_000,
+                        }
+                    ],
+                    "mode": "stream",
+                    "encoding": "json_ietf",
                 }
             )
+            ifstream = IfStatsStream(subscriber, interval)
+            streams[(interface, interval)] = ifstream
+        return ifstream
 
-        return {"ifstats": rows}
+    def close_ifstats_streams(self) -> None:
+        for ifstream in self.__dict__.pop("_ifstats_streams", {}).values():
+            ifstream.close()
@@ -2,7 +2,8 @@
 from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
-import jmespath
+from .expressions import EXPRESSIONS
+from .helpers import GetSpec
 
 
 class NetworkInstanceMixin:
@@ -17,6 +18,14 @@ class NetworkInstanceMixin:
         """Placeholder method implemented in :class:`SrLinux`."""
         raise NotImplementedError
 
+    def get_batch(
+        self,
+        specs: List[GetSpec],
+        strip_mod: Optional[bool] = True,
+    ) -> Dict[GetSpec, List[Dict[str, Any]]]:
+        """Placeholder method implemented in :class:`SrLinux`."""
+        raise NotImplementedError
+
     def get_nwi_itf(self, nw_instance: str = "*") -> Dict[str, Any]:
         SUBITF_PATH = "/interface[name=*]/subinterface"
         path_spec = {
@@ -28,9 +37,11 @@ class NetworkInstanceMixin:
                         vlan:vlan.encap."single-tagged"."vlan-id", "mtu":"_mtu"}}',
             "datatype": "all",
         }
+        subitf_spec: GetSpec = (SUBITF_PATH, "all")
+        ni_spec: GetSpec = (path_spec["path"], path_spec["datatype"])
+        batch = self.get_batch([subitf_spec, ni_spec])
         subitf: Dict[str, Any] = {}
-        resp = self.get(paths=[SUBITF_PATH], datatype="all")
-        for itf in resp[0].get("interface", []):
+        for itf in batch[subitf_spec][0].get("interface", []):
             for si in itf.get("subinterface", []):
                 subif_name = itf["name"] + "." + str(si.pop("index"))
                 subitf[subif_name] = si
@@ -38,9 +49,7 @@ class NetworkInstanceMixin:
                     si.get("l2-mtu") if "l2-mtu" in si else si.get("ip-mtu", "")
                 )
 
-        resp = self.get(
-            paths=[path_spec.get("path", "")], datatype=path_spec["datatype"]
-        )
+        resp = batch[ni_spec]
         ni_list = resp[0].get("network-instance", [])
         for ni in ni_list:
             bgp_vpn = ni.get("protocols", {}).get("bgp-vpn", {})
@@ -94,7 +103,7 @@ class NetworkInstanceMixin:
                         and vrf["name"] != ni["name"]
                     )
 
-        res = jmespath.search(path_spec["jmespath"], resp[0])
+        res = EXPRESSIONS.search(("nwi_itfs",), path_spec["jmespath"], resp[0])
         return {"nwi_itfs": res}
 
     def get_lag(self, lag_id: str = "*") -> Dict[str, Any]:
@@ -111,7 +120,7 @@ class NetworkInstanceMixin:
         for itf in resp[0].get("interface", []):
             for member in itf.get("lag", {}).get("member", []):
                 member["name"] = str(member.get("name", "")).replace("ethernet", "et")
-        res = jmespath.search(path_spec["jmespath"], resp[0])
+        res = EXPRESSIONS.search(("lag",), path_spec["jmespath"], resp[0])
         return {"lag": res}
 
     def get_sum_subitf(self, interface: str = "*") -> Dict[str, Any]:
@@ -158,7 +167,9 @@ class NetworkInstanceMixin:
                     "admin": si.get("admin-state"),
                     "oper": si.get("oper-state"),
                     "ip-mtu": si.get("ip-mtu"),
-                    "vlan": jmespath.search('vlan.encap."single-tagged"."vlan-id"', si),
+                    "vlan": EXPRESSIONS.search(
+                        ("subitf_vlan",), 'vlan.encap."single-tagged"."vlan-id"', si
+                    ),
                 }
 
                 # IPv4 details
@@ -1,7 +1,19 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
-import jmespath
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from .expressions import EXPRESSIONS
+from .helpers import GetSpec
+from .profile import DeviceProfile
+from .streaming import PathElems
+
+
+def _mac_row(ni: Optional[str], address: Any, attrs: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "NI": ni,
+        "Address": address,
+        "Dest": attrs.get("destination"),
+        "Type": attrs.get("type"),
+    }
 
 
 class Layer2Mixin:
@@ -16,6 +28,25 @@ class Layer2Mixin:
         """Placeholder method implemented in :class:`SrLinux`."""
         raise NotImplementedError
 
+    def get_batch(
+        self,
+        specs: List[GetSpec],
+        strip_mod: Optional[bool] = True,
+    ) -> Dict[GetSpec, List[Dict[str, Any]]]:
+        """Placeholder method implemented in :class:`SrLinux`."""
+        raise NotImplementedError
+
+    def iter_get(
+        self, paths: List[str], strip_mod: Optional[bool] = True
+    ) -> Iterator[Tuple[PathElems, Any]]:
+        """Placeholder method implemented in :class:`SrLinux`."""
+        raise NotImplementedError
+
+    @property
+    def profile(self) -> DeviceProfile:
+        """Placeholder property implemented in :class:`SrLinux`."""
+        raise NotImplementedError
+
     def get_lldp_sum(self, interface: Optional[str] = "*") -> Dict[str, Any]:
         path_spec = {
             "path": f"/system/lldp/interface[name={interface}]/neighbor",
@@ -25,7 +56,7 @@ class Layer2Mixin:
         resp = self.get(
             paths=[path_spec.get("path", "")], datatype=path_spec["datatype"]
         )
-        res = jmespath.search(path_spec["jmespath"], resp[0])
+        res = EXPRESSIONS.search(("lldp_nbrs",), path_spec["jmespath"], resp[0])
         return {"lldp_nbrs": res}
 
     def get_mac_table(self, network_instance: Optional[str] = "*") -> Dict[str, Any]:
@@ -34,19 +65,59 @@ class Layer2Mixin:
             "jmespath": '"network-instance"[].{"NI":name, Fib:"bridge-table"."mac-table".mac[].{Address:address, Dest:destination, Type:type}}',
             "datatype": "state",
         }
-        if (
-            "bridged"
-            not in self.get(paths=["/system/features"], datatype="state")[0][
-                "system/features"
-            ]
-        ):
+        if not self.profile.has_feature("bridged"):
             return {"mac_table": []}
         resp = self.get(
             paths=[path_spec.get("path", "")], datatype=path_spec["datatype"]
         )
-        res = jmespath.search(path_spec["jmespath"], resp[0])
+        res = EXPRESSIONS.search(("mac_table",), path_spec["jmespath"], resp[0])
         return {"mac_table": res}
 
+    def iter_mac_table(
+        self, network_instance: Optional[str] = "*"
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the MAC table as flat rows, one per MAC address
+
+        Rows are built from the updates of a ONCE subscription as they arrive, so
+        the first rows are available before the whole table is received. Rows have
+        the keys of :meth:`get_mac_table` entries plus ``NI``.
+        """
+        if not self.profile.has_feature("bridged"):
+            return
+        path = f"/network-instance[name={network_instance}]/bridge-table/mac-table/mac"
+        row: Optional[Dict[str, Any]] = None
+        for elems, val in self.iter_get(paths=[path]):
+            names = [name for name, _ in elems]
+            ni = next(
+                (k.get("name") for n, k in elems if n == "network-instance"), None
+            )
+            if "mac" not in names:  # entries as a list in a parent container
+                if row is not None:
+                    yield row
+                    row = None
+                for mac in val.get("mac", []) if isinstance(val, dict) else []:
+                    yield _mac_row(ni, mac.get("address"), mac)
+                continue
+            idx = names.index("mac")
+            address = elems[idx][1].get("address")
+            leafs = names[idx + 1 :]
+            if not leafs and isinstance(val, dict):
+                attrs = val
+            elif len(leafs) == 1:
+                attrs = {leafs[0]: val}
+            else:
+                attrs = {}
+            # an entry comes as one update or as consecutive per-leaf updates
+            if row is not None and (row["NI"], row["Address"]) == (ni, address):
+                row.update({k: v for k, v in _mac_row(ni, address, attrs).items() if v})
+            else:
+                if row is not None:
+                    yield row
+                row = _mac_row(ni, address, attrs)
+        if row is not None:
+            yield row
+
     def get_es(self) -> Dict[str, Any]:
         path_spec = {
             "path": f"/system/network-instance/protocols/evpn/ethernet-segments",
@@ -92,18 +163,13 @@ class Layer2Mixin:
                         )
                         vrf["_ni_peers"] = f"{vrf['name']}:[{vrf['_peers']}]"
 
-        if (
-            "evpn"
-            not in self.get(paths=["/system/features"], datatype="state")[0][
-                "system/features"
-            ]
-        ):
+        if not self.profile.has_feature("evpn"):
             return {"es": []}
         resp = self.get(
             paths=[path_spec.get("path", "")], datatype=path_spec["datatype"]
         )
         set_es_fields(resp)
-        res = jmespath.search(path_spec["jmespath"], resp[0])
+        res = EXPRESSIONS.search(("es",), path_spec["jmespath"], resp[0])
         return {"es": res}
 
     def get_es_dest(self) -> Dict[str, Any]:
@@ -124,18 +190,13 @@ class Layer2Mixin:
                             v.get("address", "") for v in vteps
                         )
 
-        if (
-            "bridged"
-            not in self.get(paths=["/system/features"], datatype="state")[0][
-                "system/features"
-            ]
-        ):
+        if not self.profile.has_feature("bridged"):
             return {"es_dest": []}
         resp = self.get(
             paths=[path_spec.get("path", "")], datatype=path_spec["datatype"]
         )
         set_vtep_fields(resp)
-        res = jmespath.search(path_spec["jmespath"], resp[0])
+        res = EXPRESSIONS.search(("es_dest",), path_spec["jmespath"], resp[0])
         return {"es_dest": res}
 
     def get_vxlan(self) -> Dict[str, Any]:
@@ -170,26 +231,21 @@ class Layer2Mixin:
                         }
                     )
 
-        if (
-            "bridged"
-            not in self.get(paths=["/system/features"], datatype="state")[0][
-                "system/features"
-            ]
-        ):
+        if not self.profile.has_feature("bridged"):
             return {"vxlan": []}
 
-        # build vxlan-interface to network-instance map
-        ni_resp = self.get(paths=["/network-instance[name=*]"], datatype="config")
+        # vxlan-interface to NI map is fetched along with the vxlan-interfaces
+        ni_spec: GetSpec = ("/network-instance[name=*]/vxlan-interface", "state")
+        vxlan_spec: GetSpec = (path_spec.get("path", ""), path_spec["datatype"])
+        batch = self.get_batch([ni_spec, vxlan_spec])
         ni_map: Dict[str, str] = {}
-        for ni in ni_resp[0].get("network-instance", []):
+        for ni in batch[ni_spec][0].get("network-instance", []):
             for vxlan_itf in ni.get("vxlan-interface", []):
                 ni_map[vxlan_itf["name"]] = ni["name"]
 
-        resp = self.get(
-            paths=[path_spec.get("path", "")], datatype=path_spec["datatype"]
-        )
+        resp = batch[vxlan_spec]
         set_vxlan_fields(resp, ni_map)
-        res = jmespath.search(path_spec["jmespath"], resp[0])
+        res = EXPRESSIONS.search(("vxlan",), path_spec["jmespath"], resp[0])
         return {"vxlan": res}
 
     def get_irb(self) -> Dict[str, Any]:
@@ -210,18 +266,21 @@ class Layer2Mixin:
             "datatype": "all",
         }
 
-        # build NI-to-interface map
-        ni_itfs = self.get(paths=["/network-instance[name=*]"], datatype="config")
+        # NI-to-interface map is fetched along with the IRB subinterfaces
+        ni_spec: GetSpec = (
+            "/network-instance[name=*]/interface",
+            path_spec["datatype"],
+        )
+        irb_spec: GetSpec = (path_spec["path"], path_spec["datatype"])
+        batch = self.get_batch([ni_spec, irb_spec])
         ni_itf_map: Dict[str, List[str]] = {}
-        for ni in ni_itfs[0].get("network-instance", []):
+        for ni in batch[ni_spec][0].get("network-instance", []):
             for ni_itf in ni.get("interface", []):
                 if ni_itf["name"] not in ni_itf_map:
                     ni_itf_map[ni_itf["name"]] = []
                 ni_itf_map[ni_itf["name"]].append(ni["name"])
 
-        resp = self.get(
-            paths=[path_spec.get("path", "")], datatype=path_spec["datatype"]
-        )
+        resp = batch[irb_spec]
 
         def _format_addrs(addrs: List[Dict[str, Any]]) -> str:
             parts = []
@@ -301,5 +360,5 @@ class Layer2Mixin:
                 has_ilr = any("interface-less-routing" in a for a in arp_advs + nd_advs)
                 subitf["_ilr"] = "Y" if has_ilr else "N"
 
-        res = jmespath.search(path_spec["jmespath"], resp[0])
+        res = EXPRESSIONS.search(("irb",), path_spec["jmespath"], resp[0])
         return {"irb": res}
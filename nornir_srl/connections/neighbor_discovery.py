@@ -2,7 +2,8 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
 import datetime
-import jmespath
+from .expressions import EXPRESSIONS
+from .helpers import GetSpec
 
 
 class NeighborDiscoveryMixin:
@@ -17,22 +18,33 @@ class NeighborDiscoveryMixin:
         """Placeholder method implemented in :class:`SrLinux`."""
         raise NotImplementedError
 
+    def get_batch(
+        self,
+        specs: List[GetSpec],
+        strip_mod: Optional[bool] = True,
+    ) -> Dict[GetSpec, List[Dict[str, Any]]]:
+        """Placeholder method implemented in :class:`SrLinux`."""
+        raise NotImplementedError
+
     def get_arp(self) -> Dict[str, Any]:
         path_spec = {
             "path": "/interface[name=*]/subinterface[index=*]/ipv4/arp/neighbor",
             "jmespath": '"interface"[*].subinterface[].{interface:"_subitf", NI:"_ni"|to_string(@), entries:ipv4.arp.neighbor[].{IPv4:"ipv4-address",MAC:"link-layer-address",Type:origin,expiry:"_rel_expiry" }}',
             "datatype": "all",
         }
-        ni_itfs = self.get(paths=["/network-instance[name=*]"], datatype="config")
+        ni_spec: GetSpec = (
+            "/network-instance[name=*]/interface",
+            path_spec["datatype"],
+        )
+        arp_spec: GetSpec = (path_spec["path"], path_spec["datatype"])
+        batch = self.get_batch([ni_spec, arp_spec])
         ni_itf_map: Dict[str, List[str]] = {}
-        for ni in ni_itfs[0].get("network-instance", []):
+        for ni in batch[ni_spec][0].get("network-instance", []):
             for ni_itf in ni.get("interface", []):
                 if ni_itf["name"] not in ni_itf_map:
                     ni_itf_map[ni_itf["name"]] = []
                 ni_itf_map[ni_itf["name"]].append(ni["name"])
-        resp = self.get(
-            paths=[path_spec.get("path", "")], datatype=path_spec["datatype"]
-        )
+        resp = batch[arp_spec]
         for itf in resp[0].get("interface", []):
             for subitf in itf.get("subinterface", []):
                 subitf["_subitf"] = f"{itf['name']}.{subitf['index']}"
@@ -49,7 +61,7 @@ class NeighborDiscoveryMixin:
                         )
                     except Exception:
                         arp_entry["_rel_expiry"] = "-"
-        res = jmespath.search(path_spec["jmespath"], resp[0])
+        res = EXPRESSIONS.search(("arp",), path_spec["jmespath"], resp[0])
         return {"arp": res}
 
     def get_nd(self) -> Dict[str, Any]:
@@ -78,5 +90,5 @@ class NeighborDiscoveryMixin:
                         )
                     except Exception:
                         nd_entry["_rel_expiry"] = "-"
-        res = jmespath.search(path_spec["jmespath"], resp[0])
+        res = EXPRESSIONS.search(("nd",), path_spec["jmespath"], resp[0])
         return {"nd": res}
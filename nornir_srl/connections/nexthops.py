@@ -0,0 +1,151 @@
+"""Next-hop and next-hop-group resolution shared by the RIB and tunnel-table reports."""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .helpers import GetSpec
+
+
+def nexthop_specs(network_instance: str) -> Tuple[GetSpec, GetSpec]:
+    """Get specs of the next-hop and next-hop-group tables of *network_instance*"""
+    rt = f"/network-instance[name={network_instance}]/route-table"
+    return (f"{rt}/next-hop[index=*]", "state"), (
+        f"{rt}/next-hop-group[index=*]",
+        "state",
+    )
+
+
+def _parse_nh(nh: Dict[str, Any]) -> Dict[str, Any]:
+    indirect = nh.get("indirect", {})
+    resolving_tunnel = indirect.get("resolving-tunnel", nh.get("resolving-tunnel"))
+    resolving_route = indirect.get("resolving-route", nh.get("resolving-route"))
+    entry = {
+        "ip-address": nh.get("ip-address"),
+        "type": nh.get("type"),
+        "subinterface": nh.get("subinterface"),
+        "labels": nh.get("mpls-encapsulation", {}).get("pushed-mpls-label-stack")
+        or nh.get("mpls", {}).get("pushed-mpls-label-stack"),
+    }
+    if resolving_tunnel:
+        entry["tunnel"] = (
+            resolving_tunnel.get("tunnel-type")
+            + ":"
+            + resolving_tunnel.get("ip-prefix")
+        )
+    if resolving_route:
+        entry["resolving-route"] = resolving_route.get("ip-prefix")
+    return entry
+
+
+class ResolvedNextHopGroup:
+    """Resolved view of a next-hop-group, computed once and shared by all its routes"""
+
+    __slots__ = (
+        "next_hops",
+        "rib_next_hops",
+        "ip_addresses",
+        "subinterfaces",
+        "itf",
+        "labels",
+    )
+
+    def __init__(self, next_hops: List[Dict[str, Any]]):
+        self.next_hops = next_hops
+        # next-hop column of the RIB report, indirect next-hops show their resolving route
+        self.rib_next_hops: List[Any] = [
+            (
+                f"{nh['resolving-route']} (indirect)"
+                if nh.get("type") == "indirect" and nh.get("resolving-route")
+                else nh.get("ip-address")
+            )
+            for nh in next_hops
+        ]
+        self.ip_addresses: List[str] = [
+            nh["ip-address"] for nh in next_hops if nh.get("ip-address")
+        ]
+        self.subinterfaces: List[str] = [
+            nh["subinterface"] for nh in next_hops if nh.get("subinterface")
+        ]
+        # egress of a route: subinterfaces, else tunnels, else resolving routes
+        self.itf: List[str] = self.subinterfaces
+        for fallback in ("tunnel", "resolving-route"):
+            if self.itf:
+                break
+            self.itf = [nh[fallback] for nh in next_hops if nh.get(fallback)]
+        self.labels: List[str] = [
+            str(lbl) for nh in next_hops for lbl in (nh.get("labels") or [])
+        ]
+
+
+class NextHopIndex:
+    """
+    Next-hops and resolved next-hop-groups of one or more network-instances
+
+    Built from the ``next-hop`` and ``next-hop-group`` route-table state. Groups are
+    resolved lazily on first access and cached, so the thousands of routes that
+    typically share a group reuse one :class:`ResolvedNextHopGroup`.
+    """
+
+    def __init__(
+        self,
+        nh_resp: Dict[str, Any],
+        nhg_resp: Dict[str, Any],
+    ):
+        self.created = time.monotonic()
+        self.next_hops: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+        for ni in nh_resp.get("network-instance", []):
+            self.next_hops[ni["name"]] = {
+                nh["index"]: _parse_nh(nh)
+                for nh in ni.get("route-table", {}).get("next-hop", [])
+            }
+        self._nhgroups: Dict[str, Dict[Any, List[Any]]] = {}
+        for ni in nhg_resp.get("network-instance", []):
+            self._nhgroups[ni["name"]] = {
+                nhg["index"]: [nh.get("next-hop") for nh in nhg.get("next-hop", [])]
+                for nhg in ni.get("route-table", {}).get("next-hop-group", [])
+            }
+        self._resolved: Dict[Tuple[str, Any], ResolvedNextHopGroup] = {}
+
+    def expired(self, ttl: float) -> bool:
+        return time.monotonic() - self.created > ttl
+
+    def has_group(self, network_instance: str, index: Any) -> bool:
+        return index in self._nhgroups.get(network_instance, {})
+
+    def group(self, network_instance: str, index: Any) -> ResolvedNextHopGroup:
+        """resolved next-hop-group *index* of *network_instance*, empty if unknown"""
+        key = (network_instance, index)
+        resolved = self._resolved.get(key)
+        if resolved is None:
+            nhs = self.next_hops.get(network_instance, {})
+            resolved = ResolvedNextHopGroup(
+                [
+                    nhs.get(nh, {})
+                    for nh in self._nhgroups.get(network_instance, {}).get(index, [])
+                ]
+            )
+            self._resolved[key] = resolved
+        return resolved
+
+
+class NextHopIndexCache:
+    """Per-connection cache of :class:`NextHopIndex`, keyed by network-instance filter"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._indexes: Dict[str, NextHopIndex] = {}
+
+    def get(self, network_instance: str) -> Optional[NextHopIndex]:
+        index = self._indexes.get(network_instance)
+        if index is not None and index.expired(self.ttl):
+            del self._indexes[network_instance]
+            return None
+        return index
+
+    def put(self, network_instance: str, index: NextHopIndex) -> None:
+        self._indexes[network_instance] = index
+
+    def clear(self) -> None:
+        self._indexes.clear()
@@ -0,0 +1,237 @@
+"""Pool of long-lived gNMI sessions for long-running processes such as fcli-mcp."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from nornir.core import Nornir
+from nornir.core.configuration import Config
+from nornir.core.inventory import Host
+
+from .srlinux import CONNECTION_NAME, SrLinux
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROBE_INTERVAL = 30.0
+DEFAULT_IDLE_TIMEOUT = 900.0
+DEFAULT_PROBE_TIMEOUT = 2.0
+
+
+class _Session:
+    __slots__ = ("host", "config", "last_used", "last_probe", "alive", "in_use")
+
+    def __init__(self, host: Host, config: Config):
+        self.host = host
+        self.config = config
+        self.last_used = time.monotonic()
+        self.last_probe = 0.0
+        self.alive = True
+        self.in_use = 0
+
+
+class SessionPool:
+    """
+    Keeps the ``srlinux`` connections of Nornir hosts warm between task runs
+
+    Connections stay in Nornir's per-host connection cache, the pool only manages
+    their lifetime. A background thread probes every idle session with a
+    Capabilities RPC each *probe_interval* seconds, replaces dead sessions with a
+    new connection before the next run needs them, and closes sessions that have
+    not been used for *idle_timeout* seconds. Sessions are never touched while a
+    run is using them, see :meth:`session`.
+    """
+
+    def __init__(
+        self,
+        probe_interval: float = DEFAULT_PROBE_INTERVAL,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        probe_timeout: float = DEFAULT_PROBE_TIMEOUT,
+        max_workers: int = 20,
+    ):
+        self.probe_interval = probe_interval
+        self.idle_timeout = idle_timeout
+        self.probe_timeout = probe_timeout
+        self._sessions: Dict[str, _Session] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="gnmi-pool"
+        )
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SessionPool":
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._maintain, name="gnmi-pool-keepalive", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """stop the keep-alive thread and close all pooled sessions"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.probe_timeout + 1)
+        self.clear()
+
+    def clear(self) -> None:
+        """close and forget all sessions, e.g. when another fabric is loaded"""
+        with self._lock:
+            conns = [self._detach(s.host) for s in self._sessions.values()]
+            self._sessions.clear()
+        for conn in conns:
+            if conn is not None:
+                self._close_conn(conn)
+
+    def warm(self, nornir: Nornir) -> None:
+        """open the sessions of all hosts of *nornir* in the background"""
+        with self._lock:
+            for host in nornir.inventory.hosts.values():
+                self._track(host, nornir.config)
+        self._wakeup.set()
+
+    @contextmanager
+    def session(self, nornir: Nornir) -> Iterator[None]:
+        """
+        mark the hosts of *nornir* in use for the duration of a run
+
+        Sessions known to be dead and not yet replaced are closed, so that the run
+        opens a new connection instead of failing on the dead one.
+        """
+        hosts = list(nornir.inventory.hosts.values())
+        with self._lock:
+            sessions = [self._track(h, nornir.config) for h in hosts]
+            dead = [s for s in sessions if not s.alive and not s.in_use]
+            for s in sessions:
+                s.in_use += 1
+                s.last_used = time.monotonic()
+        for s in dead:
+            self._close(s.host)
+            s.alive = True
+        try:
+            yield
+        finally:
+            with self._lock:
+                for s in sessions:
+                    s.in_use -= 1
+                    s.last_used = time.monotonic()
+
+    def report_failed(self, hosts: List[str]) -> None:
+        """probe the sessions of *hosts* now, e.g. after a run failed on them"""
+        with self._lock:
+            for name in hosts:
+                if name in self._sessions:
+                    self._sessions[name].last_probe = 0.0
+        self._wakeup.set()
+
+    def status(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            sessions = list(self._sessions.items())
+        return [
+            {
+                "Node": name,
+                "connected": CONNECTION_NAME in s.host.connections,
+                "alive": s.alive,
+                "idle-s": round(now - s.last_used, 1),
+                "probed-s-ago": round(now - s.last_probe, 1) if s.last_probe else None,
+            }
+            for name, s in sorted(sessions)
+        ]
+
+    def _track(self, host: Host, config: Config) -> _Session:
+        s = self._sessions.get(host.name)
+        if s is None or s.host is not host:
+            s = self._sessions[host.name] = _Session(host, config)
+        return s
+
+    def _maintain(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(timeout=self.probe_interval)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                self.maintain()
+            except Exception:  # keep the keep-alive thread running
+                logger.exception("session pool maintenance failed")
+
+    def maintain(self) -> None:
+        """evict idle sessions, probe the others and replace dead ones"""
+        now = time.monotonic()
+        due: List[_Session] = []
+        idle: List[Any] = []
+        with self._lock:
+            for name, s in list(self._sessions.items()):
+                if s.in_use:
+                    continue
+                if now - s.last_used > self.idle_timeout:
+                    del self._sessions[name]
+                    # detached while no run can start: a later run opens a new one
+                    conn = self._detach(s.host)
+                    if conn is not None:
+                        idle.append(conn)
+                elif now - s.last_probe >= self.probe_interval:
+                    due.append(s)
+        for conn in idle:
+            self._executor.submit(self._close_conn, conn)
+        for _ in self._executor.map(self._check, due):
+            pass
+
+    def _check(self, s: _Session) -> None:
+        conn: Any = s.host.connections.get(CONNECTION_NAME)
+        alive = conn is not None and conn.is_alive(timeout=self.probe_timeout)
+        s.last_probe = time.monotonic()
+        if alive:
+            s.alive = True
+            return
+        try:
+            new = SrLinux()
+            params = s.host.get_connection_parameters(CONNECTION_NAME)
+            new.open(
+                hostname=params.hostname,
+                username=params.username,
+                password=params.password,
+                port=params.port,
+                platform=params.platform,
+                extras=params.extras,
+                configuration=s.config,
+            )
+        except Exception as e:
+            logger.info("reconnect to %s failed: %s", s.host.name, e)
+            s.alive = conn is None  # nothing to replace, a run opens its own
+            return
+        with self._lock:
+            if s.in_use:  # a run started meanwhile, leave its connection alone
+                new.close()
+                return
+            old = s.host.connections.get(CONNECTION_NAME)
+            s.host.connections[CONNECTION_NAME] = new
+            s.alive = True
+        if old is not None:
+            self._close_conn(old)
+        logger.debug("session to %s (re)opened", s.host.name)
+
+    def _close(self, host: Host) -> None:
+        conn = self._detach(host)
+        if conn is not None:
+            self._close_conn(conn)
+
+    @staticmethod
+    def _detach(host: Host) -> Any:
+        return host.connections.pop(CONNECTION_NAME, None)
+
+    @staticmethod
+    def _close_conn(conn: Any) -> None:
+        try:
+            conn.close()
+        except Exception as e:
+            logger.debug("closing %s failed: %s", conn, e)
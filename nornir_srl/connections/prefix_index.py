@@ -0,0 +1,115 @@
+"""Longest-prefix-match index over IPv4 and IPv6 prefixes."""
+
+from __future__ import annotations
+
+import ipaddress
+import socket
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+_FAMILIES = {4: (socket.AF_INET, 32), 6: (socket.AF_INET6, 128)}
+
+
+def _parse_prefix(prefix: str, strict: bool = False) -> Tuple[int, int, int]:
+    """
+    encode a prefix as (ip version, prefix length, network bits)
+
+    The network bits are the address shifted right by the host bits, so all
+    addresses within the prefix share the same key at that prefix length. With
+    *strict*, a prefix with host bits set is invalid, as for ``ip_network()``.
+    """
+    addr, _, plen_str = prefix.partition("/")
+    version = 6 if ":" in addr else 4
+    af, bits = _FAMILIES[version]
+    try:
+        addr_int = int.from_bytes(socket.inet_pton(af, addr), "big")
+    except OSError:
+        raise ValueError(f"invalid prefix {prefix}")
+    plen = int(plen_str) if plen_str else bits
+    if not 0 <= plen <= bits:
+        raise ValueError(f"invalid prefix length in {prefix}")
+    if strict and addr_int & ((1 << (bits - plen)) - 1):
+        raise ValueError(f"{prefix} has host bits set")
+    return version, plen, addr_int >> (bits - plen)
+
+
+def _network(version: int, plen: int, key: int) -> str:
+    """normalized prefix string of an encoded prefix"""
+    bits = _FAMILIES[version][1]
+    cls = ipaddress.IPv4Network if version == 4 else ipaddress.IPv6Network
+    return str(cls((key << (bits - plen), plen)))
+
+
+class PrefixIndex:
+    """
+    Longest-prefix-match table, built once per RIB and queried many times
+
+    Prefixes are integer-encoded and stored in one hash table per prefix length
+    and address family. A lookup probes the populated prefix lengths from longest
+    to shortest, i.e. at most 33 (IPv4) or 129 (IPv6) dict lookups regardless of
+    the number of routes, without parsing any prefix again.
+    """
+
+    def __init__(self) -> None:
+        self._tables: Dict[int, Dict[int, Dict[int, Any]]] = {4: {}, 6: {}}
+        self._lengths: Dict[int, List[int]] = {4: [], 6: []}
+        self._size = 0
+
+    @classmethod
+    def from_prefixes(
+        cls, prefixes: Iterable[Union[str, Tuple[str, Any]]], strict: bool = False
+    ) -> "PrefixIndex":
+        """
+        build an index from prefixes or (prefix, value) tuples, see :meth:`insert`
+        """
+        index = cls()
+        for p in prefixes:
+            if isinstance(p, tuple):
+                index.insert(*p, strict=strict)
+            else:
+                index.insert(p, strict=strict)
+        return index
+
+    def __len__(self) -> int:
+        return self._size
+
+    def insert(self, prefix: str, value: Any = None, strict: bool = False) -> None:
+        """
+        add *prefix* with *value*, by default its normalized string, e.g.
+        ``2001:db8::/32`` for ``2001:DB8::/32``
+
+        The first value inserted for a prefix is kept. With *strict*, prefixes with
+        host bits set raise :class:`ValueError`, otherwise the host bits are
+        ignored.
+        """
+        version, plen, key = _parse_prefix(prefix, strict)
+        table = self._tables[version].get(plen)
+        if table is None:
+            table = self._tables[version][plen] = {}
+            self._lengths[version] = sorted(self._tables[version], reverse=True)
+        if key not in table:
+            self._size += 1
+            table[key] = _network(version, plen, key) if value is None else value
+
+    def lookup(self, address: str) -> Optional[Any]:
+        """
+        longest prefix match
+
+        Args:
+            address: IPv4 or IPv6 address to look up
+
+        Returns:
+            value of the longest matching prefix, None if no prefix matches
+        """
+        addr = ipaddress.ip_address(address)
+        addr_int = int(addr)
+        bits = _FAMILIES[addr.version][1]
+        tables = self._tables[addr.version]
+        for plen in self._lengths[addr.version]:
+            value = tables[plen].get(addr_int >> (bits - plen))
+            if value is not None:
+                return value
+        return None
+
+    def lookup_many(self, addresses: Iterable[str]) -> Dict[str, Optional[Any]]:
+        """batched :meth:`lookup`, returns address -> value of the longest match"""
+        return {address: self.lookup(address) for address in addresses}
@@ -0,0 +1,137 @@
+"""Per-connection device profile: enabled features, software and YANG model versions."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+
+FEATURES_PATH = "/system/features"
+SW_VERSION_PATH = "/system/information/version"
+
+BGP_RIB_MODELS = ("bgp-rib", "urn:nokia.com:srlinux:bgp:rib-bgp")  # substring match
+BGP_MODELS = (
+    "urn:srl_nokia/bgp:srl_nokia-bgp",
+    "urn:nokia.com:srlinux:bgp:bgp:srl_nokia-bgp",
+)  # exact match
+
+# model version prefixes -> path/schema version used by the getters
+BGP_EVPN_VERSION_MAP: Dict[int, Tuple[str, ...]] = {
+    1: ("2021-", "2022-", "2023-", "2024-03", "2024-07"),
+    2: ("20",),
+}
+BGP_EVPN_ROUTE_TYPE_MAP: Dict[int, Tuple[str, ...]] = {
+    1: ("2021-", "2022-", "2023-", "2024-03", "2024-07"),
+    2: ("20",),
+}
+BGP_IP_VERSION_MAP: Dict[int, Tuple[str, ...]] = {
+    1: ("2021-", "2022-"),
+    2: ("2023-03",),
+    3: ("20",),
+}
+BGP_VERSION_MAP: Dict[int, Tuple[str, ...]] = {
+    1: ("2021-", "2022-"),
+    2: ("2023-3", "20"),
+}
+
+
+def resolve_version(version_map: Dict[int, Tuple[str, ...]], mod_version: str) -> int:
+    """
+    map a YANG model version to the lowest matching schema version
+
+    Args:
+        version_map: schema version -> model version prefixes
+        mod_version: model version as advertised in gNMI capabilities
+
+    Returns:
+        int: schema version
+    """
+    return [
+        k
+        for k, v in sorted(version_map.items(), key=lambda item: item[0])
+        if len([ver for ver in v if mod_version.startswith(ver)]) > 0
+    ][0]
+
+
+def _model_version(
+    capabilities: Dict[str, Any], names: Iterable[str], exact: bool
+) -> Optional[str]:
+    for m in capabilities.get("supported_models", []):
+        name = m.get("name", "")
+        if any((n == name) if exact else (n in name) for n in names):
+            return m.get("version")
+    return None
+
+
+class DeviceProfile:
+    """
+    Static properties of a device that getters need on every call
+
+    Built once when the connection is opened, from the gNMI capabilities and a
+    single Get of the enabled features and software version. Invalidate it via
+    :meth:`SrLinux.invalidate_profile` when the device is upgraded or re-licensed.
+    """
+
+    def __init__(
+        self,
+        features: Iterable[str] = (),
+        software_version: Optional[str] = None,
+        bgp_rib_version: Optional[str] = None,
+        bgp_version: Optional[str] = None,
+    ):
+        self.features: FrozenSet[str] = frozenset(features)
+        self.software_version = software_version
+        self.bgp_rib_version = bgp_rib_version
+        self.bgp_version = bgp_version
+        self.evpn_path_version: Optional[int] = None
+        self.evpn_route_type_version: Optional[int] = None
+        self.ip_path_version: Optional[int] = None
+        self.bgp_path_version: Optional[int] = None
+        if bgp_rib_version:
+            self.evpn_path_version = resolve_version(
+                BGP_EVPN_VERSION_MAP, bgp_rib_version
+            )
+            self.evpn_route_type_version = resolve_version(
+                BGP_EVPN_ROUTE_TYPE_MAP, bgp_rib_version
+            )
+            self.ip_path_version = resolve_version(BGP_IP_VERSION_MAP, bgp_rib_version)
+        if bgp_version:
+            self.bgp_path_version = resolve_version(BGP_VERSION_MAP, bgp_version)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(software_version={self.software_version!r}, "
+            f"features={sorted(self.features)!r})"
+        )
+
+    @classmethod
+    def from_capabilities(
+        cls,
+        capabilities: Optional[Dict[str, Any]],
+        features: Iterable[str] = (),
+        software_version: Optional[str] = None,
+    ) -> "DeviceProfile":
+        caps = capabilities or {}
+        return cls(
+            features=features,
+            software_version=software_version,
+            bgp_rib_version=_model_version(caps, BGP_RIB_MODELS, exact=False),
+            bgp_version=_model_version(caps, BGP_MODELS, exact=True),
+        )
+
+    @classmethod
+    def from_responses(
+        cls,
+        capabilities: Optional[Dict[str, Any]],
+        features_resp: Dict[str, Any],
+        version_resp: Dict[str, Any],
+    ) -> "DeviceProfile":
+        """build a profile from the (stripped) Get responses of FEATURES_PATH and SW_VERSION_PATH"""
+        features = features_resp.get(FEATURES_PATH.strip("/"), [])
+        if isinstance(features, str):
+            features = [features]
+        version = version_resp.get(SW_VERSION_PATH.strip("/"))
+        if isinstance(version, str):
+            version = version.split("-")[0].lstrip("v")
+        return cls.from_capabilities(capabilities, features, version)
+
+    def has_feature(self, feature: str) -> bool:
+        return feature in self.features
@@ -0,0 +1,311 @@
+"""Counter rate engine: ring buffers of counter samples and multi-window rates.
+
+Rates of all series (e.g. the interfaces of a node) are computed in one pass.
+With NumPy installed (``pip install nornir-srl[numpy]``) that pass is vectorized
+over all series, windows and counters; without it an equivalent pure Python
+implementation is used.
+
+Counters are treated as unsigned 64-bit values. A counter going backwards from
+the top quarter of its range is taken as a wrap, otherwise as a reset of the
+counter (e.g. a reboot or ``clear statistics``), in which case the new value is
+the increase since the reset.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Hashable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+COUNTER_MAX = 2**64
+# a counter going backwards from above this value wrapped, below it was reset
+WRAP_FLOOR = COUNTER_MAX - 2**62
+
+# window -> counter -> rate per second, plus "seconds": the time span covered;
+# window None is the last sample interval
+Rates = Dict[Optional[float], Dict[str, float]]
+
+
+def counter_delta(v1: int, v2: int) -> int:
+    """increase of a 64-bit counter from *v1* to *v2*, across a wrap or reset"""
+    if v2 >= v1:
+        return v2 - v1
+    if v1 >= WRAP_FLOOR:
+        return v2 + COUNTER_MAX - v1
+    return v2
+
+
+class RateEngine:
+    """
+    Ring buffer of the last *capacity* counter samples per series
+
+    Args:
+        counters: names of the counters of every sample
+        capacity: samples kept per series
+        use_numpy: force or disable the NumPy backend, default: use it if installed
+    """
+
+    def __init__(
+        self,
+        counters: Sequence[str],
+        capacity: int = 128,
+        use_numpy: Optional[bool] = None,
+    ):
+        if capacity < 2:
+            raise ValueError("capacity must be at least 2")
+        if use_numpy and np is None:
+            raise ImportError("the numpy backend requires numpy")
+        self.counters = list(counters)
+        self.capacity = capacity
+        self.use_numpy = np is not None if use_numpy is None else use_numpy
+        self._index: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+        if self.use_numpy:
+            n = len(self.counters)
+            self._ts = np.zeros((0, capacity), dtype=np.int64)
+            self._vals = np.zeros((0, capacity, n), dtype=np.uint64)
+            self._count = np.zeros(0, dtype=np.int64)
+            self._head = np.zeros(0, dtype=np.int64)  # next slot to write
+        else:
+            self._series: List[Deque[Tuple[int, Tuple[int, ...]]]] = []
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def keys(self) -> List[Hashable]:
+        return list(self._index)
+
+    def add(self, key: Hashable, ts: int, values: Dict[str, int]) -> None:
+        """
+        add a sample of *key* taken at *ts* (ns)
+
+        Counters missing from *values* keep their previous value. A sample with the
+        timestamp of the last sample of the series is merged into it.
+        """
+        with self._lock:
+            i = self._index.get(key)
+            if i is None:
+                i = self._new_series(key)
+            if self.use_numpy:
+                self._add_numpy(i, ts, values)
+            else:
+                self._add_python(i, ts, values)
+
+    def _new_series(self, key: Hashable) -> int:
+        i = self._index[key] = len(self._index)
+        if not self.use_numpy:
+            self._series.append(deque(maxlen=self.capacity))
+        elif i == len(self._count):  # grow the arrays geometrically
+            grow = max(8, len(self._count))
+            self._ts = np.concatenate(
+                [self._ts, np.zeros((grow, self.capacity), dtype=np.int64)]
+            )
+            self._vals = np.concatenate(
+                [
+                    self._vals,
+                    np.zeros((grow, self.capacity, len(self.counters)), np.uint64),
+                ]
+            )
+            self._count = np.concatenate([self._count, np.zeros(grow, np.int64)])
+            self._head = np.concatenate([self._head, np.zeros(grow, np.int64)])
+        return i
+
+    def _add_numpy(self, i: int, ts: int, values: Dict[str, int]) -> None:
+        last = (self._head[i] - 1) % self.capacity
+        if self._count[i] and self._ts[i, last] == ts:
+            slot = last
+        else:
+            slot = self._head[i]
+            if self._count[i]:
+                self._vals[i, slot] = self._vals[i, last]
+            self._ts[i, slot] = ts
+            self._head[i] = (slot + 1) % self.capacity
+            self._count[i] = min(self._count[i] + 1, self.capacity)
+        for c, name in enumerate(self.counters):
+            if name in values:
+                self._vals[i, slot, c] = int(values[name]) % COUNTER_MAX
+
+    def _add_python(self, i: int, ts: int, values: Dict[str, int]) -> None:
+        samples = self._series[i]
+        prev = samples[-1][1] if samples else (0,) * len(self.counters)
+        new = tuple(
+            int(values[name]) % COUNTER_MAX if name in values else prev[c]
+            for c, name in enumerate(self.counters)
+        )
+        if samples and samples[-1][0] == ts:
+            samples[-1] = (ts, new)
+        else:
+            samples.append((ts, new))
+
+    def latest(self, key: Hashable) -> Dict[str, int]:
+        """last counter values of *key*"""
+        with self._lock:
+            i = self._index[key]
+            if self.use_numpy:
+                if not self._count[i]:
+                    return {}
+                last = (self._head[i] - 1) % self.capacity
+                return dict(zip(self.counters, self._vals[i, last].tolist()))
+            samples = self._series[i]
+            return dict(zip(self.counters, samples[-1][1])) if samples else {}
+
+    def samples(self, key: Hashable) -> int:
+        with self._lock:
+            i = self._index[key]
+            if self.use_numpy:
+                return int(self._count[i])
+            return len(self._series[i])
+
+    def rates(
+        self, windows: Sequence[Optional[float]] = (None,)
+    ) -> Dict[Hashable, Rates]:
+        """
+        per-second rates of every series with at least two samples
+
+        Args:
+            windows: seconds to compute rates over. A rate covers the samples in the
+                window, and at least the last sample interval. None is the last
+                sample interval.
+
+        Returns:
+            dict: key -> window -> counter -> rate per second, and "seconds"
+        """
+        with self._lock:
+            if self.use_numpy:
+                return self._rates_numpy(windows)
+            return self._rates_python(windows)
+
+    def _rates_python(
+        self, windows: Sequence[Optional[float]]
+    ) -> Dict[Hashable, Rates]:
+        result: Dict[Hashable, Rates] = {}
+        for key, i in self._index.items():
+            samples = list(self._series[i])
+            if len(samples) < 2:
+                continue
+            # cumulative increase of every counter up to each sample
+            cum = [[0] * len(self.counters)]
+            for (_, v1), (_, v2) in zip(samples, samples[1:]):
+                cum.append(
+                    [s + counter_delta(a, b) for s, a, b in zip(cum[-1], v1, v2)]
+                )
+            last = len(samples) - 1
+            t_last = samples[last][0]
+            per_window: Rates = {}
+            for w in windows:
+                first = last - 1
+                if w is not None:
+                    start = t_last - w * 1e9
+                    first = min(
+                        next(k for k, (t, _) in enumerate(samples) if t >= start),
+                        first,
+                    )
+                dt = (t_last - samples[first][0]) / 1e9
+                per_window[w] = {
+                    name: (cum[last][c] - cum[first][c]) / dt if dt > 0 else 0.0
+                    for c, name in enumerate(self.counters)
+                }
+                per_window[w]["seconds"] = dt
+            result[key] = per_window
+        return result
+
+    def _rates_numpy(self, windows: Sequence[Optional[float]]) -> Dict[Hashable, Rates]:
+        n = len(self._index)
+        count = self._count[:n]
+        keys = [k for k, i in sorted(self._index.items(), key=lambda x: x[1])]
+        # chronological order: sample k of series i is in slot (start + k) % capacity
+        start = (self._head[:n] - count) % self.capacity
+        order = (start[:, None] + np.arange(self.capacity)[None, :]) % self.capacity
+        ts = np.take_along_axis(self._ts[:n], order, axis=1)
+        vals = np.take_along_axis(self._vals[:n], order[:, :, None], axis=1)
+
+        prev, cur = vals[:, :-1], vals[:, 1:]
+        back = cur < prev
+        # uint64 subtraction wraps modulo 2**64, which is the delta across a wrap
+        steps = np.where(back & (prev < WRAP_FLOOR), cur, cur - prev)
+        steps[np.arange(self.capacity - 1)[None, :] >= (count - 1)[:, None]] = 0
+        cum = np.zeros(vals.shape, dtype=np.float64)
+        np.cumsum(steps, axis=1, dtype=np.float64, out=cum[:, 1:])
+
+        rows = np.arange(n)
+        last = np.maximum(count - 1, 0)
+        t_last = ts[rows, last]
+        valid = np.arange(self.capacity)[None, :] < count[:, None]
+        per_window = {}
+        spans = {}
+        for w in windows:
+            first = last - 1
+            if w is not None:
+                in_window = valid & (ts >= (t_last - w * 1e9)[:, None])
+                first = np.minimum(np.argmax(in_window, axis=1), first)
+            first = np.maximum(first, 0)
+            dt = (t_last - ts[rows, first]) / 1e9
+            delta = cum[rows, last] - cum[rows, first]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rate = np.where(dt[:, None] > 0, delta / dt[:, None], 0.0)
+            per_window[w] = rate.tolist()
+            spans[w] = dt.tolist()
+
+        result: Dict[Hashable, Rates] = {}
+        for i in np.flatnonzero(count >= 2).tolist():
+            result[keys[i]] = {
+                w: {
+                    **dict(zip(self.counters, per_window[w][i])),
+                    "seconds": spans[w][i],
+                }
+                for w in windows
+            }
+        return result
+
+    def percentiles(
+        self,
+        window: Optional[float] = None,
+        q: Sequence[float] = (50, 90, 99),
+    ) -> Dict[str, Dict[float, float]]:
+        """
+        percentiles of the rates of all series over *window*
+
+        Returns:
+            dict: counter -> percentile -> rate per second, empty without rates
+        """
+        rates = [r[window] for r in self.rates([window]).values()]
+        return rate_percentiles(rates, self.counters, q, self.use_numpy)
+
+
+def rate_percentiles(
+    rates: Sequence[Dict[str, Any]],
+    fields: Sequence[str],
+    q: Sequence[float] = (50, 90, 99),
+    use_numpy: Optional[bool] = None,
+) -> Dict[str, Dict[float, float]]:
+    """
+    percentiles (linear interpolation) of *fields* over a list of rate rows
+
+    Rows may come from several engines, e.g. one per node of a fabric.
+    """
+    if not rates:
+        return {}
+    if np is not None and use_numpy is not False:
+        table = np.array(
+            [[float(r.get(f) or 0) for f in fields] for r in rates], dtype=np.float64
+        )
+        pct = np.percentile(table, list(q), axis=0)
+        return {
+            f: {p: float(pct[j, c]) for j, p in enumerate(q)}
+            for c, f in enumerate(fields)
+        }
+    result: Dict[str, Dict[float, float]] = {}
+    for f in fields:
+        values = sorted(float(r.get(f) or 0) for r in rates)
+        result[f] = {}
+        for p in q:
+            pos = (len(values) - 1) * p / 100
+            lo = int(pos)
+            hi = min(lo + 1, len(values) - 1)
+            result[f][p] = values[lo] + (values[hi] - values[lo]) * (pos - lo)
+    return result
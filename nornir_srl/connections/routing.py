@@ -5,11 +5,23 @@ import copy
 import logging
 import threading
 from contextlib import contextmanager
-from typing import Any, Dict, Iterator, List, Optional, Tuple
-
-import jmespath
-
-from .helpers import lpm
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .expressions import EXPRESSIONS
+from .helpers import GetSpec
+from .nexthops import NextHopIndex, NextHopIndexCache, nexthop_specs
+from .prefix_index import PrefixIndex
+from .profile import DeviceProfile
 
 # CLI / API aliases (e.g. ``-r l3vpn-v4``) → YANG ``afi-safi-name`` used in paths.
 BGP_RIB_ROUTE_FAM_ALIASES: Dict[str, str] = {
@@ -21,6 +33,34 @@ BGP_RIB_ROUTE_FAM_ALIASES: Dict[str, str] = {
     "l3vpn-ipv6-unicast": "l3vpn-ipv6-unicast",
 }
 
+# above this number of attr-sets, filtered RIB queries fetch all attr-sets
+MAX_ATTR_SET_PATHS = 64
+
+
+def _attr_set_specs(resp: Dict[str, Any]) -> List[GetSpec]:
+    """Get specs of the attr-sets the routes in a BGP RIB response refer to"""
+    specs: Dict[GetSpec, None] = {}
+
+    def _walk(ni: str, obj: Any) -> None:
+        if isinstance(obj, dict):
+            if "attr-id" in obj:
+                path = (
+                    f"/network-instance[name={ni}]/bgp-rib/attr-sets/"
+                    f"attr-set[index={obj['attr-id']}]"
+                )
+                specs[(path, "state")] = None
+            else:
+                for v in obj.values():
+                    _walk(ni, v)
+        elif isinstance(obj, list):
+            for item in obj:
+                _walk(ni, item)
+
+    for ni in resp.get("network-instance", []):
+        _walk(ni["name"], ni)
+    return list(specs)
+
+
 _pygnmi_suppress_lock = threading.Lock()
 _pygnmi_suppress_depth = 0
 _pygnmi_suppress_saved: Tuple[List[logging.Handler], int, bool] | None = None
@@ -115,6 +155,8 @@ class RoutingMixin:
     """Mixin providing routing and BGP related getters."""
 
     capabilities: Optional[Dict[str, Any]]
+    # seconds a next-hop index is reused by subsequent RIB/tunnel-table reports
+    nh_index_ttl: float = 5.0
 
     def get(
         self,
@@ -125,39 +167,85 @@ class RoutingMixin:
         """Placeholder method implemented in :class:`SrLinux`."""
         raise NotImplementedError
 
+    def get_batch(
+        self,
+        specs: List[GetSpec],
+        strip_mod: Optional[bool] = True,
+    ) -> Dict[GetSpec, List[Dict[str, Any]]]:
+        """Placeholder method implemented in :class:`SrLinux`."""
+        raise NotImplementedError
+
+    @property
+    def profile(self) -> DeviceProfile:
+        """Placeholder property implemented in :class:`SrLinux`."""
+        raise NotImplementedError
+
+    def get_nexthop_index(
+        self,
+        network_instance: str,
+        specs: List[GetSpec],
+        groups: Optional[
+            Callable[[Dict[GetSpec, List[Dict[str, Any]]]], Iterable[Tuple[str, Any]]]
+        ] = None,
+    ) -> Tuple[NextHopIndex, Dict[GetSpec, List[Dict[str, Any]]]]:
+        """
+        Return the next-hop index of *network_instance* along with a Get of *specs*
+
+        The index is cached on the connection for :attr:`nh_index_ttl` seconds. When
+        it needs to be (re)built, the next-hop tables are fetched in the same Get.
+        *groups* returns the ``(network-instance, next-hop-group)`` pairs used by
+        the Get of *specs*: a cached index that lacks one of them is stale and is
+        rebuilt with a second Get of the next-hop tables.
+        """
+        cache: NextHopIndexCache = self.__dict__.setdefault(
+            "_nh_index_cache", NextHopIndexCache(self.nh_index_ttl)
+        )
+        nh_spec, nhg_spec = nexthop_specs(network_instance)
+        index = cache.get(network_instance)
+        if index is not None:
+            batch = self.get_batch(specs)
+            if groups is None or all(
+                index.has_group(ni, nhg) for ni, nhg in groups(batch)
+            ):
+                return index, batch
+            tables = self.get_batch([nhg_spec, nh_spec])
+            index = NextHopIndex(tables[nh_spec][0], tables[nhg_spec][0])
+        else:
+            batch = self.get_batch([nhg_spec, nh_spec] + specs)
+            index = NextHopIndex(batch[nh_spec][0], batch[nhg_spec][0])
+        cache.put(network_instance, index)
+        return index, batch
+
     def get_bgp_rib(
         self,
         route_fam: str,
         route_type: Optional[str] = "2",
         network_instance: str = "*",
         detail: bool = False,
+        prefix: Optional[str] = None,
+        neighbor: Optional[str] = None,
     ) -> Dict[str, Any]:
-        BGP_RIB_MOD = "bgp-rib"
-        BGP_RIB_MOD2 = "urn:nokia.com:srlinux:bgp:rib-bgp"
-        if self.capabilities is not None:
-            mod_version = [
-                m
-                for m in self.capabilities.get("supported_models", [])
-                if BGP_RIB_MOD in m.get("name") or BGP_RIB_MOD2 in m.get("name")
-            ][0].get("version")
-        else:
+        """
+        BGP RIB of *route_fam*, optionally limited to one prefix and/or neighbor
+
+        *network_instance*, *neighbor* and, for the ipv4/ipv6 families and EVPN
+        route type 5, *prefix* are keys of the RIB lists and are sent to the device
+        as path keys, so that only the matching routes and the path attributes they
+        use are transferred. For the l3vpn families *prefix* is matched locally.
+        """
+        profile = self.profile
+        evpn_path_version = profile.evpn_path_version
+        evpn_route_type_version = profile.evpn_route_type_version
+        ip_path_version = profile.ip_path_version
+        if (
+            evpn_path_version is None
+            or evpn_route_type_version is None
+            or ip_path_version is None
+        ):
             raise Exception("Cannot get gNMI capabilities")
 
         route_fam = BGP_RIB_ROUTE_FAM_ALIASES.get(route_fam.lower(), route_fam)
 
-        BGP_EVPN_VERSION_MAP = {
-            1: ("2021-", "2022-", "2023-", "2024-03", "2024-07"),
-            2: ("20"),
-        }
-        BGP_EVPN_ROUTE_TYPE_MAP = {
-            1: ("2021-", "2022-", "2023-", "2024-03", "2024-07"),
-            2: ("20"),
-        }
-        BGP_IP_VERSION_MAP = {
-            1: ("2021-", "2022-"),
-            2: ("2023-03",),
-            3: ("20"),
-        }
         ROUTE_FAMILY = {
             "evpn": "evpn",
             "ipv4": "ipv4-unicast",
@@ -278,24 +366,6 @@ class RoutingMixin:
             else:
                 return d
 
-        evpn_path_version = [
-            k
-            for k, v in sorted(BGP_EVPN_VERSION_MAP.items(), key=lambda item: item[0])
-            if len([ver for ver in v if mod_version.startswith(ver)]) > 0
-        ][0]
-        evpn_route_type_version = [
-            k
-            for k, v in sorted(
-                BGP_EVPN_ROUTE_TYPE_MAP.items(), key=lambda item: item[0]
-            )
-            if len([ver for ver in v if mod_version.startswith(ver)]) > 0
-        ][0]
-        ip_path_version = [
-            k
-            for k, v in sorted(BGP_IP_VERSION_MAP.items(), key=lambda item: item[0])
-            if len([ver for ver in v if mod_version.startswith(ver)]) > 0
-        ][0]
-
         if route_fam not in ROUTE_FAMILY:
             raise ValueError(f"Invalid route family {route_fam}")
         if (
@@ -362,7 +432,7 @@ class RoutingMixin:
                 1: (
                     f'.{{neighbor:neighbor, "0_st":"_r_state", "RD":"route-distinguisher", '
                     f'"Pfx":{_pfx_expr}, "lpref":"local-pref", med:med, "next-hop":"next-hop",'
-                    f'"as-path":"as-path".segment[0].member}}'
+                    f'"as-path":"as-path".segment[0].member}}}}'
                 ),
                 2: (
                     f'.{{neighbor:neighbor, "0_st":"_r_state", "RD":"route-distinguisher", '
@@ -495,53 +565,94 @@ class RoutingMixin:
 
         attribs: Dict[str, Dict[str, Any]] = dict()
 
-        resp = self.get(paths=[PATH_BGP_PATH_ATTRIBS], datatype="state")
-        for ni in resp[0].get("network-instance", []):
-            if ni["name"] not in attribs:
-                attribs[ni["name"]] = dict()
-            for path in ni.get("bgp-rib", {}).get("attr-sets", {}).get("attr-set", []):
-                path_copy = copy.deepcopy(path)
-                attribs[ni["name"]].update({path_copy.pop("index"): path_copy})
+        # filters that are keys of the route lists go into the RIB path
+        route_keys: Dict[str, str] = {}
+        local_prefix: Optional[str] = None
+        if neighbor:
+            route_keys["neighbor"] = neighbor
+        if prefix:
+            if route_fam in ("ipv4", "ipv6"):
+                route_keys["prefix"] = prefix
+            elif route_fam == "evpn" and route_type == "5":
+                route_keys["ip-prefix"] = prefix
+            elif route_fam == "evpn":
+                raise ValueError(
+                    f"prefix filter not supported for route type {route_type}"
+                )
+            else:
+                local_prefix = prefix
 
         path_spec: Dict[str, str] = PATH_SPECS[route_fam]
-        rib_path = str(path_spec.get("path"))
-        if route_fam in ("l3vpn-ipv4-unicast", "l3vpn-ipv6-unicast"):
+        attr_spec: GetSpec = (PATH_BGP_PATH_ATTRIBS, "state")
+        rib_spec: GetSpec = (
+            str(path_spec.get("path"))
+            + "".join(f"[{k}={v}]" for k, v in route_keys.items()),
+            path_spec["datatype"],
+        )
+        # Without filters, path attributes and routes are fetched in a single Get.
+        # With filters, the few routes are fetched first and then only the
+        # attr-sets they refer to.
+        specs = [rib_spec] if route_keys else [attr_spec, rib_spec]
+        if route_keys or route_fam in ("l3vpn-ipv4-unicast", "l3vpn-ipv6-unicast"):
             with _suppress_pygnmi_client_logging():
                 try:
-                    resp = self.get(paths=[rib_path], datatype=path_spec["datatype"])
+                    batch = self.get_batch(specs)
                 except BaseException as e:
-                    # Leaves / platforms without IP-VPN have no l3vpn-* RIB path; skip instead of failing.
+                    # Leaves / platforms without IP-VPN have no l3vpn-* RIB path and
+                    # filtered paths may not exist; skip instead of failing.
                     if _gnmi_path_missing(e):
                         return {"bgp_rib": []}
                     raise
         else:
-            resp = self.get(paths=[rib_path], datatype=path_spec["datatype"])
-        for ni in resp[0].get("network-instance", []):
-            ni = augment_routes(ni, attribs[ni["name"]])
+            batch = self.get_batch(specs)
+
+        resp = batch[rib_spec]
+        if route_keys:
+            attr_specs = _attr_set_specs(resp[0])
+            if len(attr_specs) > MAX_ATTR_SET_PATHS:
+                attr_specs = [attr_spec]
+            attr_resps = [r[0] for r in self.get_batch(attr_specs).values()]
+        else:
+            attr_resps = batch[attr_spec]
+
+        for attr_resp in attr_resps:
+            for ni in attr_resp.get("network-instance", []):
+                if ni["name"] not in attribs:
+                    attribs[ni["name"]] = dict()
+                for path in (
+                    ni.get("bgp-rib", {}).get("attr-sets", {}).get("attr-set", [])
+                ):
+                    path_copy = copy.deepcopy(path)
+                    attribs[ni["name"]].update({path_copy.pop("index"): path_copy})
 
-        res = jmespath.search(path_spec["jmespath"], resp[0])
+        for ni in resp[0].get("network-instance", []):
+            ni = augment_routes(ni, attribs.get(ni["name"], {}))
+
+        res = EXPRESSIONS.search(
+            (
+                "bgp_rib",
+                route_fam,
+                route_type if route_fam == "evpn" else None,
+                evpn_path_version if route_fam == "evpn" else ip_path_version,
+                evpn_route_type_version if route_fam == "evpn" else None,
+                detail,
+            ),
+            path_spec["jmespath"],
+            resp[0],
+        )
         if res is None:
             res = []
+        if local_prefix:
+            for ni in res:
+                ni["Rib"] = [
+                    r for r in ni.get("Rib") or [] if r.get("Pfx") == local_prefix
+                ]
         return {"bgp_rib": res}
 
     def get_sum_bgp(self, network_instance: Optional[str] = "*") -> Dict[str, Any]:
-        BGP_MOD = "urn:srl_nokia/bgp:srl_nokia-bgp"
-        BGP_MOD2 = "urn:nokia.com:srlinux:bgp:bgp:srl_nokia-bgp"
-
-        if self.capabilities is not None:
-            mod_version = [
-                m
-                for m in self.capabilities.get("supported_models", [])
-                if BGP_MOD == m.get("name") or BGP_MOD2 == m.get("name")
-            ][0].get("version")
-        else:
+        our_version = self.profile.bgp_path_version
+        if our_version is None:
             raise Exception("Capabilities not set")
-        BGP_VERSION_MAP = {1: ("2021-", "2022-"), 2: ("2023-3", "20")}
-        our_version = [
-            k
-            for k, v in sorted(BGP_VERSION_MAP.items(), key=lambda item: item[0])
-            if len([ver for ver in v if mod_version.startswith(ver)]) > 0
-        ][0]
 
         def augment_resp(resp):
             for ni in resp[0].get("network-instance", []):
@@ -709,117 +820,71 @@ class RoutingMixin:
             paths=[path_spec.get("path", "")], datatype=path_spec["datatype"]
         )
         augment_resp(resp)
-        res = jmespath.search(path_spec["jmespath"], resp[0])
+        res = EXPRESSIONS.search(("bgp_peers",), path_spec["jmespath"], resp[0])
         return {"bgp_peers": res}
 
     def get_rib(
         self,
         afi: str,
         network_instance: Optional[str] = "*",
-        lpm_address: Optional[str] = None,
+        lpm_address: Optional[Union[str, List[str]]] = None,
     ) -> Dict[str, Any]:
+        """
+        Get the IP RIB, optionally restricted to the longest prefix match of one or
+        more addresses
+
+        Args:
+            afi: ipv4-unicast or ipv6-unicast
+            network_instance: network-instance name, wildcards allowed
+            lpm_address: address or list (or comma-separated string) of addresses
+        """
+        if isinstance(lpm_address, str):
+            lpm_address = [a.strip() for a in lpm_address.split(",") if a.strip()]
+        prefix_key = "ipv4-prefix" if afi == "ipv4-unicast" else "ipv6-prefix"
         path_spec = {
             "path": f"/network-instance[name={network_instance}]/route-table/{afi}",
             "jmespath": '"network-instance"[?_hasrib].{NI:name, Rib:"route-table"."'
             + afi
             + '".route[].{"Prefix":"'
-            + ("ipv4-prefix" if afi == "ipv4-unicast" else "ipv6-prefix")
+            + prefix_key
             + '",\
                     "next-hop":"_next-hop",type:"route-type", Act:active, "orig-vrf":"_orig_vrf",metric:metric, pref:preference, itf:"_nh_itf"}}',
             "datatype": "state",
         }
 
-        nhgroups = self.get(
-            paths=[
-                f"/network-instance[name={network_instance}]/route-table/next-hop-group[index=*]"
-            ],
-            datatype="state",
-        )
-        nhs = self.get(
-            paths=[
-                f"/network-instance[name={network_instance}]/route-table/next-hop[index=*]"
-            ],
-            datatype="state",
-        )
+        rib_spec: GetSpec = (path_spec.get("path", ""), path_spec["datatype"])
 
-        nh_mapping: Dict[str, Dict[str, Any]] = {}
-        for ni in nhs[0].get("network-instance", {}):
-            tmp_map: Dict[str, Any] = {}
-            for nh in ni["route-table"]["next-hop"]:
-                tmp_map[nh["index"]] = {
-                    "ip-address": nh.get("ip-address"),
-                    "type": nh.get("type"),
-                    "subinterface": nh.get("subinterface"),
-                }
-                indirect = nh.get("indirect", {})
-                resolving_tunnel = indirect.get(
-                    "resolving-tunnel", nh.get("resolving-tunnel")
-                )
-                resolving_route = indirect.get(
-                    "resolving-route", nh.get("resolving-route")
-                )
-                if resolving_tunnel:
-                    tmp_map[nh["index"]].update(
-                        {
-                            "tunnel": resolving_tunnel.get("tunnel-type")
-                            + ":"
-                            + resolving_tunnel.get("ip-prefix")
-                        }
-                    )
-                if resolving_route:
-                    tmp_map[nh["index"]].update(
-                        {"resolving-route": resolving_route.get("ip-prefix")}
-                    )
-
-            nh_mapping.update({ni["name"]: tmp_map})
-        nhgroup_mapping: Dict[str, Dict[str, List[Any]]] = {}
-        for ni in nhgroups[0].get("network-instance", {}):
-            network_instance = ni["name"]
-            nh_map: Dict[str, List[Any]] = {}
-            for nhgroup in ni["route-table"]["next-hop-group"]:
-                nh_map[nhgroup["index"]] = [
-                    nh_mapping[network_instance][nh.get("next-hop")]
-                    for nh in nhgroup.get("next-hop", [])
-                ]
-            nhgroup_mapping.update({ni["name"]: nh_map})
+        def rib_groups(
+            batch: Dict[GetSpec, List[Dict[str, Any]]],
+        ) -> Iterator[Tuple[str, Any]]:
+            for ni in batch[rib_spec][0].get("network-instance", []):
+                for route in ni.get("route-table", {}).get(afi, {}).get("route", []):
+                    if "next-hop-group" in route:
+                        nh_ni = route.get("origin-network-instance", ni["name"])
+                        yield nh_ni, route["next-hop-group"]
 
-        resp = self.get(
-            paths=[path_spec.get("path", "")], datatype=path_spec["datatype"]
+        nh_index, batch = self.get_nexthop_index(
+            str(network_instance), [rib_spec], rib_groups
         )
+
+        resp = batch[rib_spec]
         for ni in resp[0].get("network-instance", {}):
             if len(ni["route-table"][afi]) == 0:
                 ni["_hasrib"] = False
             else:
                 ni["_hasrib"] = True
                 if lpm_address:
-                    lpm_prefix = lpm(
-                        lpm_address,
-                        [
-                            route[
-                                (
-                                    "ipv4-prefix"
-                                    if afi == "ipv4-unicast"
-                                    else "ipv6-prefix"
-                                )
-                            ]
-                            for route in ni["route-table"][afi]["route"]
-                        ],
-                    )
-                    if lpm_prefix:
-                        ni["route-table"][afi]["route"] = [
-                            r
-                            for r in ni["route-table"][afi]["route"]
-                            if r[
-                                (
-                                    "ipv4-prefix"
-                                    if afi == "ipv4-unicast"
-                                    else "ipv6-prefix"
-                                )
-                            ]
-                            == lpm_prefix
-                        ]
-                    else:
-                        ni["route-table"][afi]["route"] = []
+                    routes: Dict[str, List[Dict[str, Any]]] = {}
+                    for r in ni["route-table"][afi].get("route", []):
+                        routes.setdefault(r[prefix_key], []).append(r)
+                    index = PrefixIndex.from_prefixes((p, p) for p in routes)
+                    matched = {
+                        p: None for p in index.lookup_many(lpm_address).values() if p
+                    }
+                    ni["route-table"][afi]["route"] = [
+                        r for p in matched for r in routes[p]
+                    ]
+                    if not matched:
                         ni["_hasrib"] = False
                         continue
                 for route in ni["route-table"][afi].get("route", []):
@@ -836,47 +901,16 @@ class RoutingMixin:
                                 route["_orig_vrf"] = nh_ni
                         else:
                             nh_ni = ni["name"]
-                        route["_next-hop"] = [
-                            (
-                                nh.get("resolving-route") + " (indirect)"
-                                if nh.get("type") == "indirect"
-                                and nh.get("resolving-route")
-                                else nh.get("ip-address")
-                            )
-                            for nh in nhgroup_mapping[nh_ni].get(
-                                route["next-hop-group"], {}
-                            )
-                        ]
-
-                        route["_nh_itf"] = [
-                            (
-                                nh.get("subinterface") + f"@vrf:{nh_ni}"
-                                if leaked
-                                else nh.get("subinterface")
-                            )
-                            for nh in nhgroup_mapping[nh_ni].get(
-                                route["next-hop-group"], {}
-                            )
-                            if nh.get("subinterface")
-                        ]
-                        if len(route["_nh_itf"]) == 0:
-                            route["_nh_itf"] = [
-                                nh.get("tunnel")
-                                for nh in nhgroup_mapping[nh_ni].get(
-                                    route["next-hop-group"], {}
-                                )
-                                if nh.get("tunnel")
-                            ]
-                        if len(route["_nh_itf"]) == 0:
+                        nhg = nh_index.group(nh_ni, route["next-hop-group"])
+                        route["_next-hop"] = list(nhg.rib_next_hops)
+                        if leaked and nhg.subinterfaces:
                             route["_nh_itf"] = [
-                                nh.get("resolving-route")
-                                for nh in nhgroup_mapping[nh_ni].get(
-                                    route["next-hop-group"], {}
-                                )
-                                if nh.get("resolving-route")
+                                f"{itf}@vrf:{nh_ni}" for itf in nhg.subinterfaces
                             ]
+                        else:
+                            route["_nh_itf"] = list(nhg.itf)
 
-        res = jmespath.search(path_spec["jmespath"], resp[0])
+        res = EXPRESSIONS.search(("ip_rib", afi), path_spec["jmespath"], resp[0])
         return {"ip_rib": res}
 
     def get_tunnel_table(self, network_instance: str = "*") -> Dict[str, Any]:
@@ -887,51 +921,28 @@ class RoutingMixin:
         resolution used by :meth:`get_rib`. Returns flat rows with the fields
         required to verify transport/forwarding paths in tests.
         """
-        # Build next-hop and next-hop-group lookups (per network-instance).
-        nhs = self.get(
-            paths=[
-                f"/network-instance[name={network_instance}]/route-table/next-hop[index=*]"
-            ],
-            datatype="state",
-        )
-        nhgroups = self.get(
-            paths=[
-                f"/network-instance[name={network_instance}]/route-table/next-hop-group[index=*]"
-            ],
-            datatype="state",
+        tunnel_spec: GetSpec = (
+            f"/network-instance[name={network_instance}]/tunnel-table",
+            "state",
         )
 
-        nh_mapping: Dict[str, Dict[str, Dict[str, Any]]] = {}
-        for ni in nhs[0].get("network-instance", []):
-            tmp_map: Dict[str, Dict[str, Any]] = {}
-            for nh in ni.get("route-table", {}).get("next-hop", []):
-                label_stack = nh.get("mpls-encapsulation", {}).get(
-                    "pushed-mpls-label-stack"
-                ) or nh.get("mpls", {}).get("pushed-mpls-label-stack")
-                tmp_map[nh["index"]] = {
-                    "ip-address": nh.get("ip-address"),
-                    "subinterface": nh.get("subinterface"),
-                    "type": nh.get("type"),
-                    "labels": label_stack,
-                }
-            nh_mapping[ni["name"]] = tmp_map
-
-        nhgroup_mapping: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
-        for ni in nhgroups[0].get("network-instance", []):
-            ni_name = ni["name"]
-            nh_map: Dict[str, List[Dict[str, Any]]] = {}
-            for nhgroup in ni.get("route-table", {}).get("next-hop-group", []):
-                nh_map[nhgroup["index"]] = [
-                    nh_mapping.get(ni_name, {}).get(nh.get("next-hop"), {})
-                    for nh in nhgroup.get("next-hop", [])
-                ]
-            nhgroup_mapping[ni_name] = nh_map
-
-        resp = self.get(
-            paths=[f"/network-instance[name={network_instance}]/tunnel-table"],
-            datatype="state",
+        def tunnel_groups(
+            batch: Dict[GetSpec, List[Dict[str, Any]]],
+        ) -> Iterator[Tuple[str, Any]]:
+            for ni in batch[tunnel_spec][0].get("network-instance", []):
+                for afi in ("ipv4", "ipv6"):
+                    for tunnel in (
+                        ni.get("tunnel-table", {}).get(afi, {}).get("tunnel", [])
+                    ):
+                        if tunnel.get("next-hop-group") is not None:
+                            yield ni["name"], tunnel["next-hop-group"]
+
+        nh_index, batch = self.get_nexthop_index(
+            network_instance, [tunnel_spec], tunnel_groups
         )
 
+        resp = batch[tunnel_spec]
+
         rows: List[Dict[str, Any]] = []
         for ni in resp[0].get("network-instance", []):
             ni_name = ni["name"]
@@ -939,19 +950,7 @@ class RoutingMixin:
             for afi in ("ipv4", "ipv6"):
                 prefix_key = "ipv4-prefix" if afi == "ipv4" else "ipv6-prefix"
                 for tunnel in tunnel_table.get(afi, {}).get("tunnel", []):
-                    nhg_index = tunnel.get("next-hop-group")
-                    resolved = nhgroup_mapping.get(ni_name, {}).get(nhg_index, [])
-                    next_hops = [
-                        nh.get("ip-address") for nh in resolved if nh.get("ip-address")
-                    ]
-                    egress_itfs = [
-                        nh.get("subinterface")
-                        for nh in resolved
-                        if nh.get("subinterface")
-                    ]
-                    labels = [
-                        str(lbl) for nh in resolved for lbl in (nh.get("labels") or [])
-                    ]
+                    nhg = nh_index.group(ni_name, tunnel.get("next-hop-group"))
                     rows.append(
                         {
                             "NI": ni_name,
@@ -960,9 +959,9 @@ class RoutingMixin:
                             "owner": tunnel.get("owner"),
                             "pref": tunnel.get("preference"),
                             "metric": tunnel.get("metric"),
-                            "next-hop": next_hops,
-                            "egress-itf": egress_itfs,
-                            "label": labels,
+                            "next-hop": list(nhg.ip_addresses),
+                            "egress-itf": list(nhg.subinterfaces),
+                            "label": list(nhg.labels),
                         }
                     )
 
@@ -0,0 +1,306 @@
+"""Row builders: JMESPath projections compiled into plain Python functions."""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import jmespath
+from jmespath import functions
+
+Builder = Callable[[Any], Any]
+# output key, input field for plain fields else None, builder for other values
+_Pair = Tuple[str, Optional[str], Optional[Builder]]
+
+_FUNCTIONS = functions.Functions()
+
+
+def _is_false(value: Any) -> bool:
+    # JMESPath falsiness differs from Python's: 0 is true
+    return (
+        value is None
+        or value is False
+        or (isinstance(value, (str, list, dict)) and not value)
+    )
+
+
+def _field(name: str) -> Builder:
+    def build(value: Any) -> Any:
+        return value.get(name) if isinstance(value, dict) else None
+
+    return build
+
+
+def _fields(names: List[str]) -> Builder:
+    """chain of field lookups, i.e. ``a.b.c``, without a call per level"""
+
+    def build(value: Any) -> Any:
+        for name in names:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(name)
+        return value
+
+    return build
+
+
+def _chain(steps: List[Builder]) -> Builder:
+    def build(value: Any) -> Any:
+        for step in steps:
+            value = step(value)
+        return value
+
+    return build
+
+
+def _index(idx: int) -> Builder:
+    def build(value: Any) -> Any:
+        if not isinstance(value, list):
+            return None
+        try:
+            return value[idx]
+        except IndexError:
+            return None
+
+    return build
+
+
+def _slice(start: Optional[int], stop: Optional[int], step: Optional[int]) -> Builder:
+    def build(value: Any) -> Any:
+        if not isinstance(value, list):
+            return None
+        return value[start:stop:step]
+
+    return build
+
+
+def _flatten(base: Builder) -> Builder:
+    def build(value: Any) -> Any:
+        value = base(value)
+        if not isinstance(value, list):
+            return None
+        merged: List[Any] = []
+        for element in value:
+            if isinstance(element, list):
+                merged.extend(element)
+            else:
+                merged.append(element)
+        return merged
+
+    return build
+
+
+def _projection(base: Builder, each: Optional[Builder]) -> Builder:
+    if each is None:  # identity projection, e.g. the right side of ``a[]``
+
+        def build_identity(value: Any) -> Any:
+            value = base(value)
+            if not isinstance(value, list):
+                return None
+            return [element for element in value if element is not None]
+
+        return build_identity
+
+    def build(value: Any) -> Any:
+        value = base(value)
+        if not isinstance(value, list):
+            return None
+        collected = []
+        for element in value:
+            current = each(element)
+            if current is not None:
+                collected.append(current)
+        return collected
+
+    return build
+
+
+def _value_projection(base: Builder, each: Builder) -> Builder:
+    def build(value: Any) -> Any:
+        value = base(value)
+        if not isinstance(value, dict):
+            return None
+        collected = []
+        for element in value.values():
+            current = each(element)
+            if current is not None:
+                collected.append(current)
+        return collected
+
+    return build
+
+
+def _filter_projection(base: Builder, each: Builder, condition: Builder) -> Builder:
+    def build(value: Any) -> Any:
+        value = base(value)
+        if not isinstance(value, list):
+            return None
+        collected = []
+        for element in value:
+            if not _is_false(condition(element)):
+                current = each(element)
+                if current is not None:
+                    collected.append(current)
+        return collected
+
+    return build
+
+
+def _multi_select_dict(pairs: List[_Pair]) -> Builder:
+    # plain fields, by far the most common value, are looked up inline
+    fields = [(key, name) for key, name, _ in pairs]
+    if all(name is not None for _, name in fields):
+
+        def build_fields(value: Any) -> Any:
+            if value is None:
+                return None
+            if not isinstance(value, dict):
+                return {key: None for key, _ in fields}
+            get = value.get
+            return {key: get(name) for key, name in fields}
+
+        return build_fields
+
+    def build(value: Any) -> Any:
+        if value is None:
+            return None
+        is_dict = isinstance(value, dict)
+        row = {}
+        for key, name, fn in pairs:
+            if name is not None:
+                row[key] = value.get(name) if is_dict else None
+            elif fn is not None:
+                row[key] = fn(value)
+        return row
+
+    return build
+
+
+def _multi_select_list(items: List[Builder]) -> Builder:
+    def build(value: Any) -> Any:
+        if value is None:
+            return None
+        return [item(value) for item in items]
+
+    return build
+
+
+def _or(left: Builder, right: Builder) -> Builder:
+    def build(value: Any) -> Any:
+        matched = left(value)
+        return right(value) if _is_false(matched) else matched
+
+    return build
+
+
+def _and(left: Builder, right: Builder) -> Builder:
+    def build(value: Any) -> Any:
+        matched = left(value)
+        return matched if _is_false(matched) else right(value)
+
+    return build
+
+
+def _not(child: Builder) -> Builder:
+    def build(value: Any) -> Any:
+        result = child(value)
+        # !0 is false, 0 is not special-cased as falsy in JMESPath
+        if isinstance(result, (int, float)) and not isinstance(result, bool):
+            if result == 0:
+                return False
+        return not result
+
+    return build
+
+
+def _function(name: str, args: List[Builder]) -> Builder:
+    def build(value: Any) -> Any:
+        return _FUNCTIONS.call_function(name, [arg(value) for arg in args])
+
+    return build
+
+
+def _literal(literal: Any) -> Builder:
+    return lambda value: literal
+
+
+def _current(value: Any) -> Any:
+    return value
+
+
+def _compile(node: Dict[str, Any]) -> Builder:
+    kind = node["type"]
+    children = node["children"]
+    if kind == "field":
+        return _field(node["value"])
+    if kind in ("subexpression", "index_expression", "pipe"):
+        if all(c["type"] == "field" for c in children):
+            return _fields([c["value"] for c in children])
+        return _chain([_compile(c) for c in children])
+    if kind == "index":
+        return _index(node["value"])
+    if kind == "slice":
+        return _slice(*children)
+    if kind == "flatten":
+        return _flatten(_compile(children[0]))
+    if kind == "projection":
+        right = children[1]
+        each = None if right["type"] == "identity" else _compile(right)
+        return _projection(_compile(children[0]), each)
+    if kind == "value_projection":
+        return _value_projection(_compile(children[0]), _compile(children[1]))
+    if kind == "filter_projection":
+        return _filter_projection(
+            _compile(children[0]), _compile(children[1]), _compile(children[2])
+        )
+    if kind == "multi_select_dict":
+        pairs: List[_Pair] = []
+        for pair in children:
+            value = pair["children"][0]
+            if value["type"] == "field":
+                pairs.append((pair["value"], value["value"], None))
+            else:
+                pairs.append((pair["value"], None, _compile(value)))
+        return _multi_select_dict(pairs)
+    if kind == "multi_select_list":
+        return _multi_select_list([_compile(c) for c in children])
+    if kind == "or_expression":
+        return _or(_compile(children[0]), _compile(children[1]))
+    if kind == "and_expression":
+        return _and(_compile(children[0]), _compile(children[1]))
+    if kind == "not_expression":
+        return _not(_compile(children[0]))
+    if kind == "function_expression":
+        return _function(node["value"], [_compile(c) for c in children])
+    if kind == "literal":
+        return _literal(node["value"])
+    if kind in ("current", "identity"):
+        return _current
+    # comparators and expression references are not used by the reports
+    raise NotImplementedError(f"unsupported JMESPath node {kind}")
+
+
+class RowBuilder:
+    """
+    JMESPath expression compiled into nested Python closures
+
+    Produces the same output as :func:`jmespath.search` for the subset of the
+    language used by the reports, but evaluates each node as a direct function
+    call instead of dispatching through jmespath's tree interpreter. Field chains
+    and projections of plain fields, which make up most of a report row, are
+    collapsed into single dict lookups.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self._build = _compile(jmespath.compile(expression).parsed)
+
+    def search(self, data: Any) -> Any:
+        return self._build(data)
+
+
+def compile_row_builder(expression: str) -> Optional[RowBuilder]:
+    """:class:`RowBuilder` for *expression*, None if it uses unsupported syntax"""
+    try:
+        return RowBuilder(expression)
+    except NotImplementedError:
+        return None
@@ -0,0 +1,273 @@
+"""Fabric state snapshots: recorded gNMI Get responses replayed without device I/O.
+
+A snapshot holds, per node, the normalized response to every ``(path, datatype)``
+Get spec the report getters asked for, in the form :class:`ReplayDevice` serves
+them. Responses are stored content-addressed and gzip-compressed, so state that
+is identical across nodes or snapshots (e.g. unchanged configuration) is stored
+once::
+
+    <store>/objects/ab/abcdef....json.gz    one response (or capabilities)
+    <store>/snapshots/<name>.json            manifest: node -> spec -> object
+
+Reports run against a snapshot with :meth:`SnapshotStore.nornir`, which returns
+a Nornir object whose hosts are connected to :class:`SnapshotDevice` instances.
+Getters that ask for a spec that was not recorded (e.g. a BGP RIB filtered on a
+prefix in the path keys) raise :class:`MissingResponse`.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from nornir.core import Nornir
+from nornir.core.configuration import Config
+from nornir.core.inventory import (
+    Defaults,
+    Group,
+    Groups,
+    Host,
+    Hosts,
+    Inventory,
+    ParentGroups,
+)
+from nornir.plugins.runners import ThreadedRunner
+
+from .aio import MissingResponse, ReplayDevice
+from .srlinux import CONNECTION_NAME, SrLinux
+
+logger = logging.getLogger(__name__)
+
+LATEST = "latest"
+RE_SNAPSHOT_NAME = re.compile(r"^[\w.-]+$")
+
+# getters run to record a snapshot: every report with its default arguments, so
+# that the report runs unchanged against the snapshot. Interface rates need two
+# samples in time and are not part of a snapshot.
+SNAPSHOT_GETTERS: Dict[str, Callable[[SrLinux], Any]] = {
+    "sys_info": lambda d: d.get_info(),
+    "bgp_peers": lambda d: d.get_sum_bgp(),
+    "subinterface": lambda d: d.get_sum_subitf(),
+    "lag": lambda d: d.get_lag(),
+    "ipv4_rib": lambda d: d.get_rib(afi="ipv4-unicast"),
+    "ipv6_rib": lambda d: d.get_rib(afi="ipv6-unicast"),
+    "static_routes": lambda d: d.get_static_routes(),
+    "tunnel_table": lambda d: d.get_tunnel_table(),
+    **{
+        f"bgp_rib_evpn_{rt}": partial(
+            SrLinux.get_bgp_rib, route_fam="evpn", route_type=rt
+        )
+        for rt in ("1", "2", "3", "4", "5")
+    },
+    **{
+        f"bgp_rib_{fam}": partial(SrLinux.get_bgp_rib, route_fam=fam)
+        for fam in ("ipv4", "ipv6", "l3vpn-ipv4-unicast", "l3vpn-ipv6-unicast")
+    },
+    "mac_table": lambda d: d.get_mac_table(),
+    "nwi_itfs": lambda d: d.get_nwi_itf(),
+    "lldp_nbrs": lambda d: d.get_lldp_sum(),
+    "irb": lambda d: d.get_irb(),
+    "es": lambda d: d.get_es(),
+    "es_dest": lambda d: d.get_es_dest(),
+    "vxlan": lambda d: d.get_vxlan(),
+    "arp": lambda d: d.get_arp(),
+    "nd": lambda d: d.get_nd(),
+    "routing_pol": lambda d: d.get_routing_policies(),
+}
+
+
+class SnapshotError(Exception):
+    """A device error recorded in a snapshot, raised again on replay"""
+
+
+class SnapshotDevice(ReplayDevice):
+    """:class:`ReplayDevice` serving the responses of a node recorded in a snapshot"""
+
+
+def record(
+    device: SrLinux,
+    getters: Optional[Dict[str, Callable[[SrLinux], Any]]] = None,
+) -> ReplayDevice:
+    """
+    Record the Get responses the *getters* need from *device*
+
+    Each getter runs against a :class:`ReplayDevice`. Specs it asks for that have
+    not been recorded yet are fetched from *device* in one :meth:`SrLinux.get_batch`
+    and the getter runs again, until it completes. Device errors are recorded too.
+
+    Returns:
+        ReplayDevice: the recorded responses, see :meth:`SnapshotStore.save`
+    """
+    replay = ReplayDevice(device.hostname, device.capabilities, None)
+    for name, getter in (SNAPSHOT_GETTERS if getters is None else getters).items():
+        while True:
+            try:
+                getter(replay)
+            except MissingResponse as e:
+                try:
+                    fetched: Union[Dict, BaseException] = device.get_batch(
+                        e.specs, e.strip_mod
+                    )
+                except Exception as err:
+                    fetched = err
+                replay.store(e.specs, e.strip_mod, fetched)
+                continue
+            except Exception as e:  # recorded, the report fails the same way
+                logger.info("%s: %s failed: %s", device.hostname, name, e)
+            break
+    return replay
+
+
+class SnapshotStore:
+    """
+    Content-addressed store of fabric snapshots in directory *root*
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.manifests = self.root / "snapshots"
+
+    def put(self, obj: Any) -> str:
+        """store *obj* as compressed canonical JSON, return its SHA-256 digest"""
+        data = json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str)
+        digest = hashlib.sha256(data.encode("utf-8")).hexdigest()
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(gzip.compress(data.encode("utf-8"), mtime=0))
+            os.replace(tmp, path)
+        return digest
+
+    def load(self, digest: str) -> Any:
+        return json.loads(gzip.decompress(self._object_path(digest).read_bytes()))
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / f"{digest}.json.gz"
+
+    def save(
+        self,
+        name: str,
+        nodes: Dict[str, ReplayDevice],
+        inventory: Optional[Dict[str, Host]] = None,
+    ) -> Path:
+        """
+        Write the responses recorded per node as snapshot *name*
+
+        Args:
+            name: snapshot name, letters, digits, ``_``, ``.`` and ``-``
+            nodes: node name -> device with recorded responses, see :func:`record`
+            inventory: node name -> Nornir host, whose hostname, platform, groups
+                and data are kept so that inventory filters work on the snapshot
+        """
+        if not RE_SNAPSHOT_NAME.match(name) or name == LATEST:
+            raise ValueError(f"invalid snapshot name: {name!r}")
+        manifest: Dict[str, Any] = {
+            "name": name,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "nodes": {},
+        }
+        for node, device in sorted(nodes.items()):
+            host = (inventory or {}).get(node)
+            responses = []
+            for (path, datatype, strip_mod), resp in sorted(
+                device.responses.items(), key=lambda x: str(x[0])
+            ):
+                entry = {"path": path, "datatype": datatype, "strip_mod": strip_mod}
+                if isinstance(resp, BaseException):
+                    entry["error"] = str(resp)
+                else:
+                    entry["object"] = self.put(resp)
+                responses.append(entry)
+            manifest["nodes"][node] = {
+                "hostname": host.hostname if host else device.hostname,
+                "platform": host.platform if host else None,
+                "groups": [g.name for g in host.groups] if host else [],
+                "data": dict(host.data) if host else {},
+                "capabilities": self.put(device.capabilities),
+                "responses": responses,
+            }
+        self.manifests.mkdir(parents=True, exist_ok=True)
+        path = self.manifests / f"{name}.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(manifest, indent=1, default=str))
+        os.replace(tmp, path)
+        return path
+
+    def list(self) -> List[Dict[str, Any]]:
+        """name, creation time and nodes of all snapshots, oldest first"""
+        result = []
+        for path in self.manifests.glob("*.json"):
+            manifest = json.loads(path.read_text())
+            result.append(
+                {
+                    "name": manifest["name"],
+                    "created": manifest["created"],
+                    "nodes": len(manifest["nodes"]),
+                    "mtime": path.stat().st_mtime,
+                }
+            )
+        return sorted(result, key=lambda m: m["mtime"])
+
+    def manifest(self, name: str = LATEST) -> Dict[str, Any]:
+        if name == LATEST:
+            snapshots = self.list()
+            if not snapshots:
+                raise FileNotFoundError(f"no snapshots in {self.root}")
+            name = snapshots[-1]["name"]
+        path = self.manifests / f"{name}.json"
+        if not RE_SNAPSHOT_NAME.match(name) or not path.exists():
+            raise FileNotFoundError(f"no snapshot {name!r} in {self.root}")
+        return json.loads(path.read_text())
+
+    def devices(self, name: str = LATEST) -> Dict[str, SnapshotDevice]:
+        """node name -> device replaying its responses in snapshot *name*"""
+        return {
+            node: self._device(spec)
+            for node, spec in self.manifest(name)["nodes"].items()
+        }
+
+    def _device(self, spec: Dict[str, Any]) -> SnapshotDevice:
+        device = SnapshotDevice(spec["hostname"], self.load(spec["capabilities"]), None)
+        for r in spec["responses"]:
+            device.responses[(r["path"], r["datatype"], r["strip_mod"])] = (
+                SnapshotError(r["error"]) if "error" in r else self.load(r["object"])
+            )
+        return device
+
+    def nornir(self, name: str = LATEST, num_workers: int = 20) -> Nornir:
+        """
+        Nornir object with the nodes of snapshot *name* as hosts
+
+        Every host is connected to a :class:`SnapshotDevice`, so tasks using the
+        ``srlinux`` connection run against the snapshot without any device I/O.
+        """
+        nodes = self.manifest(name)["nodes"]
+        groups = Groups(
+            {g: Group(g) for spec in nodes.values() for g in spec.get("groups", [])}
+        )
+        hosts = Hosts()
+        for node, spec in nodes.items():
+            hosts[node] = Host(
+                node,
+                hostname=spec["hostname"],
+                platform=spec.get("platform"),
+                groups=ParentGroups([groups[g] for g in spec.get("groups", [])]),
+                data=spec.get("data", {}),
+            )
+            device: Any = self._device(spec)
+            hosts[node].connections[CONNECTION_NAME] = device
+        return Nornir(
+            inventory=Inventory(hosts=hosts, groups=groups, defaults=Defaults()),
+            config=Config(),
+            runner=ThreadedRunner(num_workers=num_workers),
+        )
@@ -1,15 +1,30 @@
-from typing import Any, List, Dict, Optional, Union
-import difflib
-import json
+from typing import Any, Iterator, List, Dict, Optional, Tuple, Union
 import re
 
 
+import grpc
 from pygnmi.client import gNMIclient
+from pygnmi.spec.v080.gnmi_pb2 import CapabilityRequest
+from pygnmi.spec.v080.gnmi_pb2_grpc import gNMIStub
 
 from nornir.core.configuration import Config
 from nornir.core.exceptions import ConnectionException
 
-from .helpers import strip_modules, normalize_gnmi_resp
+from .config_diff import (
+    AfterStateUnknown,
+    apply_transaction,
+    diff_config_list,
+    render_changes,
+    set_arguments,
+)
+from .helpers import (
+    GetSpec,
+    group_specs,
+    strip_modules,
+    normalize_gnmi_resp,
+)
+from .profile import DeviceProfile, FEATURES_PATH, SW_VERSION_PATH
+from .streaming import PathElems, iter_gnmi_updates, subscribe_once
 from .interfaces import NetworkInstanceMixin
 from .routing import RoutingMixin
 from .layer2 import Layer2Mixin
@@ -102,6 +117,8 @@ class SrLinux(
         self.connection = self
         self.hostname = hostname
         self.capabilities = self._connection.capabilities()
+        self._profile: Optional[DeviceProfile] = None
+        self.refresh_profile()
 
     def gnmi_get(self, **kw):
         return self._connection.get(**kw)
@@ -109,9 +126,76 @@ class SrLinux(
     def gnmi_set(self, **kw):
         return self._connection.set(**kw)
 
+    def subscribe(self, subscribe: Dict[str, Any]) -> Any:
+        return self._connection.subscribe2(subscribe=subscribe)
+
+    def iter_get(
+        self, paths: List[str], strip_mod: Optional[bool] = True
+    ) -> Iterator[Tuple[PathElems, Any]]:
+        """
+        Stream the state of *paths* update by update over a ONCE subscription
+
+        Unlike :meth:`get`, nothing is buffered: updates are decoded as the consumer
+        asks for them and the device is paused by gRPC flow control meanwhile.
+
+        Args:
+            paths: gNMI paths, wildcards allowed
+            strip_mod: strip module prefixes from path elements and values
+
+        Yields:
+            tuple: path elements and decoded value of each update
+        """
+        # pygnmi reads subscriptions ahead into an unbounded queue, so the
+        # subscription is read here, on the same channel
+        channel, metadata = self._grpc_channel()
+        return iter_gnmi_updates(
+            subscribe_once(channel, metadata, paths), strip_mod=bool(strip_mod)
+        )
+
+    def is_alive(self, timeout: float = 2.0) -> bool:
+        """True if the device answers a Capabilities RPC within *timeout* seconds"""
+        channel, metadata = self._grpc_channel()
+        try:
+            gNMIStub(channel).Capabilities(
+                CapabilityRequest(), metadata=metadata, timeout=timeout
+            )
+        except (grpc.RpcError, ValueError):  # ValueError: channel closed
+            return False
+        return True
+
+    def _grpc_channel(self) -> Tuple[Any, List[Tuple[str, str]]]:
+        # pygnmi keeps the channel and call metadata of its client private
+        channel = getattr(self._connection, "_gNMIclient__channel")
+        metadata = getattr(self._connection, "_gNMIclient__metadata", [])
+        return channel, list(metadata)
+
     def close(self) -> None:
+        self.close_ifstats_streams()
         self._connection.close()
 
+    @property
+    def profile(self) -> DeviceProfile:
+        """Device profile, (re)built on first use after :meth:`invalidate_profile`"""
+        if getattr(self, "_profile", None) is None:
+            self.refresh_profile()
+        return self._profile  # type: ignore
+
+    def refresh_profile(self) -> DeviceProfile:
+        """Fetch features and software version in one Get and rebuild the device profile"""
+        features_spec: GetSpec = (FEATURES_PATH, "state")
+        version_spec: GetSpec = (SW_VERSION_PATH, "state")
+        batch = self.get_batch([features_spec, version_spec])
+        self._profile = DeviceProfile.from_responses(
+            self.capabilities,
+            batch[features_spec][0],
+            batch[version_spec][0],
+        )
+        return self._profile
+
+    def invalidate_profile(self) -> None:
+        """Drop the cached device profile, e.g. after a software upgrade"""
+        self._profile = None
+
     def __repr__(self) -> str:
         return f"{self.__class__.__name__} on {self.hostname}"
 
@@ -134,60 +218,124 @@ class SrLinux(
         else:
             return resp
 
+    def get_batch(
+        self,
+        specs: List[GetSpec],
+        strip_mod: Optional[bool] = True,
+    ) -> Dict[GetSpec, List[Dict[str, Any]]]:
+        """
+        Fetch multiple (path, datatype) specs with as few gNMI Get RPCs as possible
+
+        The datatype is a property of the GetRequest, so specs are grouped per datatype
+        and each group is sent as a single multi-path Get. SR Linux returns one
+        notification per requested path, in request order, which is used to map the
+        response back to the individual specs.
+
+        Args:
+            specs: list of (path, datatype) tuples
+            strip_mod: strip module prefixes from keys and values
+
+        Returns:
+            dict: spec -> response, in the same format as returned by get() for that single path
+        """
+        groups = group_specs(specs)
+        result: Dict[GetSpec, List[Dict[str, Any]]] = {}
+        for datatype, paths in groups.items():
+            resp = self.get(paths=paths, datatype=datatype, strip_mod=strip_mod)
+            if len(resp) == len(paths):
+                for path, r in zip(paths, resp):
+                    result[(path, datatype)] = [r]
+            else:  # cannot demultiplex, fall back to a Get per path
+                for path in paths:
+                    result[(path, datatype)] = self.get(
+                        paths=[path], datatype=datatype, strip_mod=strip_mod
+                    )
+        return result
+
     def set_config(
         self,
         input: List[Dict[str, Any]],
         op: Optional[str] = "update",
         dry_run: Optional[bool] = False,
         strip_mod: Optional[bool] = True,
-    ) -> str:
-        device_cfg_after = []
-        r_list: List[str] = []
-        for r in input:
-            r_list += r.keys()
-        #        r_list = [ list(r.keys())[0] for r in input ]
-        device_cfg_before = self.get(paths=r_list, datatype="config")
+        structured: Optional[bool] = False,
+        verify: Optional[bool] = False,
+    ) -> Union[str, List[Dict[str, Any]]]:
+        """
+        Apply *input*, a list of ``{path: config}`` dicts, with a gNMI Set of type *op*
 
+        For ``delete``, the first path of each dict is deleted. See :meth:`commit_config`.
+        """
+        if op == "update":
+            return self.commit_config(
+                update=input, dry_run=dry_run, structured=structured, verify=verify
+            )
+        if op == "replace":
+            return self.commit_config(
+                replace=input, dry_run=dry_run, structured=structured, verify=verify
+            )
+        if op == "delete":
+            return self.commit_config(
+                delete=[list(d.keys())[0] for d in input],
+                dry_run=dry_run,
+                structured=structured,
+                verify=verify,
+            )
+        raise ValueError(f"invalid value for parameter 'op': {op}")
+
+    def commit_config(
+        self,
+        update: Optional[List[Dict[str, Any]]] = None,
+        replace: Optional[List[Dict[str, Any]]] = None,
+        delete: Optional[List[str]] = None,
+        dry_run: Optional[bool] = False,
+        structured: Optional[bool] = False,
+        verify: Optional[bool] = False,
+    ) -> Union[str, List[Dict[str, Any]]]:
+        """
+        Apply deletes, replaces and updates in a single gNMI Set, i.e. one transaction
+
+        The config at all paths is fetched in one Get before the change. The config
+        after the change is computed from it, see
+        :func:`.config_diff.apply_transaction`, with *verify* it is read back from
+        the device instead, at the cost of a second Get. It is also read back when
+        it depends on how the device merges a list with unknown keys or when a
+        path is nested in another one, a dry-run then shows an approximation.
+
+        Args:
+            update: list of ``{path: config}`` dicts to merge into the config
+            replace: list of ``{path: config}`` dicts to replace
+            delete: paths to delete
+            dry_run: only compute the diff, leave the config unchanged
+            structured: return the changes as a list instead of as text
+            verify: read the config after the change back from the device
+
+        Returns:
+            the diff of the config at the paths before and after the change, as
+            text or, with *structured*, as a list of changes (op, path, before,
+            after), see :mod:`.config_diff`. Empty if nothing changed.
+        """
+        paths, sets = set_arguments(update, replace, delete)
+        if not paths:
+            return [] if structured else ""
+        before = self.get(paths=paths, datatype="config")[: len(paths)]
         if not dry_run:
-            paths = []
-            for d in input:
-                for p, v in d.items():
-                    ### to check - hack
-                    ### to address intents that are lists, e.g. /interface
-                    #                    if isinstance(v, list):
-                    #                        v = { p: v }
-                    #                        p = '/'.join(p.split('/')[:-1])
-                    #                        if len(p) == 0:
-                    #                            p = "/"
-                    ###
-                    paths.append((p, v))
-            if op == "update":
-                r = self._connection.set(update=paths, encoding="json_ietf")
-            elif op == "replace":
-                r = self._connection.set(replace=paths, encoding="json_ietf")
-            elif op == "delete":
-                delete_paths = [list(p.keys())[0] for p in input]
-                r = self._connection.set(delete=delete_paths, encoding="json_ietf")
-            else:
-                raise ValueError(f"invalid value for parameter 'op': {op}")
-            device_cfg_after = self.get(paths=r_list, datatype="config")
+            self._connection.set(**sets, encoding="json_ietf")
+        if verify and not dry_run:
+            after = self.get(paths=paths, datatype="config")
         else:
-            device_cfg_after = input
-
-        #        dd = DeepDiff(device_cfg_before, device_cfg_after)
-        diff = ""
-        for i in range(len(r_list)):
-            before_json = json.dumps(device_cfg_before[i], indent=2, sort_keys=True)
-            after_json = json.dumps(device_cfg_after[i], indent=2, sort_keys=True)
-            for line in difflib.unified_diff(
-                before_json.splitlines(keepends=True),
-                after_json.splitlines(keepends=True),
-                fromfile="before",
-                tofile="after",
-                n=5,
-            ):
-                diff += line
-            if len(diff) > 0:
-                diff += "\n"
-
-        return diff
+            try:
+                after = apply_transaction(
+                    before,
+                    paths,
+                    delete or [],
+                    replace or [],
+                    update or [],
+                    strict=not dry_run,
+                )
+            except AfterStateUnknown:  # e.g. merged by the device in a way unknown here
+                after = self.get(paths=paths, datatype="config")
+        changes = diff_config_list(before, after)
+        if structured:
+            return [c._asdict() for c in changes]
+        return render_changes(changes)
@@ -0,0 +1,113 @@
+"""Streaming Get: a gNMI ONCE subscription decoded one notification at a time.
+
+A unary Get returns the whole payload in one message that is decoded, normalized
+and stripped of module prefixes before a getter sees the first entry. A ONCE
+subscription returns the same state as a stream of notifications. Reading that
+stream from the consuming thread, without a read-ahead queue, lets gRPC flow
+control pause the device when the consumer falls behind, so memory stays bounded
+by the size of one notification regardless of the size of the table.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from pygnmi.create_gnmi_path import gnmi_path_generator
+from pygnmi.spec.v080.gnmi_pb2 import (
+    Encoding,
+    SubscribeRequest,
+    Subscription,
+    SubscriptionList,
+)
+from pygnmi.spec.v080.gnmi_pb2_grpc import gNMIStub
+
+from .helpers import RE_MODULE_PREFIX, strip_modules
+
+# gNMI path as (element name, keys) tuples, e.g. [("interface", {"name": "mgmt0"})]
+PathElems = List[Tuple[str, Dict[str, str]]]
+
+
+def typed_value(val: Any) -> Any:
+    """decode a gNMI TypedValue, JSON values into Python objects"""
+    kind = val.WhichOneof("value")
+    if kind is None:
+        return None
+    v = getattr(val, kind)
+    if kind in ("json_ietf_val", "json_val"):
+        try:
+            return json.loads(v)
+        except ValueError:
+            return v.decode("utf-8") if isinstance(v, bytes) else v
+    return v
+
+
+def _path_elems(path: Any, strip_mod: bool) -> PathElems:
+    if strip_mod:
+        return [(RE_MODULE_PREFIX.sub("", e.name), dict(e.key)) for e in path.elem]
+    return [(e.name, dict(e.key)) for e in path.elem]
+
+
+def iter_gnmi_updates(
+    responses: Iterable[Any], strip_mod: bool = True
+) -> Iterator[Tuple[PathElems, Any]]:
+    """
+    (path, value) of every update in a stream of SubscribeResponses
+
+    Iteration stops at the first ``sync_response``. Deletes are ignored, a ONCE
+    subscription does not send any.
+
+    Args:
+        responses: SubscribeResponse protobuf messages
+        strip_mod: strip module prefixes from path elements and values
+
+    Yields:
+        tuple: full path (prefix included) as :data:`PathElems`, decoded value
+    """
+    for resp in responses:
+        kind = resp.WhichOneof("response")
+        if kind == "sync_response":
+            return
+        if kind != "update":
+            continue
+        notif = resp.update
+        prefix = (
+            _path_elems(notif.prefix, strip_mod) if notif.HasField("prefix") else []
+        )
+        for u in notif.update:
+            val = typed_value(u.val)
+            yield prefix + _path_elems(u.path, strip_mod), (
+                strip_modules(val) if strip_mod else val
+            )
+
+
+def subscribe_once(
+    channel: Any, metadata: Sequence[Tuple[str, str]], paths: List[str]
+) -> Iterator[Any]:
+    """
+    SubscribeResponses of a ONCE subscription to *paths*, read on demand
+
+    The RPC is cancelled when the iterator is closed or garbage collected, e.g. when
+    the consumer stops early.
+    """
+    request = SubscribeRequest(
+        subscribe=SubscriptionList(
+            subscription=[Subscription(path=gnmi_path_generator(p)) for p in paths],
+            mode=SubscriptionList.ONCE,
+            encoding=Encoding.JSON_IETF,
+        )
+    )
+    done = threading.Event()
+
+    def _requests() -> Iterator[SubscribeRequest]:
+        yield request
+        # keep the request stream open, some targets cancel on half-close
+        done.wait()
+
+    responses = gNMIStub(channel).Subscribe(_requests(), metadata=list(metadata))
+    try:
+        yield from responses
+    finally:
+        done.set()
+        responses.cancel()
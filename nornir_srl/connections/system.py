@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
 
+from .helpers import GetSpec
+
 
 class SystemMixin:
     """Mixin providing system related getters."""
@@ -15,6 +17,14 @@ class SystemMixin:
         """Placeholder method implemented in :class:`SrLinux`."""
         raise NotImplementedError
 
+    def get_batch(
+        self,
+        specs: List[GetSpec],
+        strip_mod: Optional[bool] = True,
+    ) -> Dict[GetSpec, List[Dict[str, Any]]]:
+        """Placeholder method implemented in :class:`SrLinux`."""
+        raise NotImplementedError
+
     def get_info(self) -> Dict[str, Any]:
         """Return system information such as chassis and software details."""
         path_specs: List[Dict[str, Any]] = [
@@ -38,8 +48,11 @@ class SystemMixin:
             },
         ]
         result: Dict[str, Any] = {}
+        batch = self.get_batch(
+            [(spec["path"], spec["datatype"]) for spec in path_specs]
+        )
         for spec in path_specs:
-            resp = self.get(paths=[spec.get("path", "")], datatype=spec["datatype"])
+            resp = batch[(spec["path"], spec["datatype"])]
             for path in resp[0]:
                 result.update(
                     {k: v for k, v in resp[0][path].items() if k in spec["fields"]}
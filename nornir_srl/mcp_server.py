@@ -26,17 +26,29 @@ import glob
 import json
 import logging
 import os
+import secrets
 import tempfile
-from typing import Any, Dict, List, Optional, Literal
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Literal, Tuple
 
 import yaml  # type: ignore[import-untyped]
 from mcp.server.fastmcp import FastMCP
 from nornir import InitNornir
 from nornir.core import Nornir
-from nornir.core.task import Result, Task
+from nornir.core.task import AggregatedResult, MultiResult, Result, Task
 
 from .connections.srlinux import CONNECTION_NAME
+from .connections.aio import AsyncioRunner, DEFAULT_MAX_CONCURRENCY
+from .connections.pool import (
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_PROBE_INTERVAL,
+    SessionPool,
+)
 from .connections.helpers import clean_structured_key
+from .connections.rates import rate_percentiles
 
 logger = logging.getLogger(__name__)
 
@@ -58,11 +70,23 @@ NORNIR_DEFAULT_CONFIG: Dict[str, Any] = {
     "logging": {"enabled": False},
 }
 
+DEFAULT_CACHE_TTL = 30.0
+DEFAULT_CACHE_SIZE = 1024
+# seconds results of a report stay valid, DEFAULT_CACHE_TTL for other reports
+REPORT_CACHE_TTLS: Dict[str, float] = {
+    "sys_info": 300.0,
+    "lldp_nbrs": 120.0,
+    "ifstats": 0.0,  # rates over an interval, never cached
+}
+
 
 # ---- Nornir initialization ----
 
 # These hold the initialized nornir instance and persistent temp files
 _nornir_instance: Optional[Nornir] = None
+_async_runner: Optional[AsyncioRunner] = None  # set with --async
+_session_pool: Optional[SessionPool] = None  # disabled with --no-session-pool
+_result_cache: Optional["ResultCache"] = None  # disabled with --no-cache
 _temp_files: List[Any] = []  # prevent GC of NamedTemporaryFile objects
 
 
@@ -186,6 +210,158 @@ def get_nornir() -> Nornir:
     return _nornir_instance
 
 
+# ---- Result cache ----
+
+CacheKey = Tuple[str, str, Tuple[Any, ...]]
+
+
+class ResultCache:
+    """
+    Per-host task results keyed by (report, host, arguments)
+
+    Entries expire after the TTL of their report and the least recently used
+    entries are evicted beyond *max_entries*. A query for a host whose result is
+    being fetched by another tool call waits for that call instead of querying the
+    host again. Failed results are returned to waiting calls but not cached.
+    """
+
+    def __init__(
+        self,
+        default_ttl: float = DEFAULT_CACHE_TTL,
+        ttls: Optional[Dict[str, float]] = None,
+        max_entries: int = DEFAULT_CACHE_SIZE,
+    ):
+        self.default_ttl = default_ttl
+        self.ttls = dict(REPORT_CACHE_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[CacheKey, Tuple[float, MultiResult]]" = (
+            OrderedDict()
+        )
+        self._inflight: Dict[CacheKey, Future] = {}
+        self._lock = threading.Lock()
+
+    def ttl(self, report: str) -> float:
+        return self.ttls.get(report, self.default_ttl)
+
+    def run(
+        self,
+        report: str,
+        args: Tuple[Any, ...],
+        target: Nornir,
+        execute: Callable[[Nornir], AggregatedResult],
+    ) -> AggregatedResult:
+        """
+        results of *report* for the hosts of *target*, from cache where possible
+
+        Args:
+            report: report name, also the name of the aggregated result
+            args: hashable arguments that change the result of the report
+            target: filtered fabric to query
+            execute: runs the report task on a subset of *target*
+        """
+        hosts = list(target.inventory.hosts)
+        cached: Dict[str, MultiResult] = {}
+        waiting: Dict[str, Future] = {}
+        owned: Dict[str, Future] = {}
+        now = time.monotonic()
+        with self._lock:
+            for host in hosts:
+                key = (report, host, args)
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(key)
+                    cached[host] = entry[1]
+                    self.hits += 1
+                elif key in self._inflight:
+                    waiting[host] = self._inflight[key]
+                    self.hits += 1
+                else:
+                    owned[host] = self._inflight[key] = Future()
+                    self.misses += 1
+        if owned:
+            self._fetch(report, args, target, execute, owned)
+        result = AggregatedResult(report)
+        for host in hosts:
+            if host in cached:
+                result[host] = cached[host]
+            else:
+                multi = (owned.get(host) or waiting[host]).result()
+                if multi is not None:
+                    result[host] = multi
+        return result
+
+    def _fetch(
+        self,
+        report: str,
+        args: Tuple[Any, ...],
+        target: Nornir,
+        execute: Callable[[Nornir], AggregatedResult],
+        owned: Dict[str, Future],
+    ) -> None:
+        try:
+            fresh = execute(target.filter(filter_func=lambda h: h.name in owned))
+        except BaseException as e:
+            with self._lock:
+                for host, fut in owned.items():
+                    del self._inflight[(report, host, args)]
+                    fut.set_exception(e)
+            raise
+        expires = time.monotonic() + self.ttl(report)
+        with self._lock:
+            for host, fut in owned.items():
+                key = (report, host, args)
+                del self._inflight[key]
+                multi = fresh.get(host)
+                if multi is not None and not multi.failed:
+                    self._entries[key] = (expires, multi)
+                    self._entries.move_to_end(key)
+                fut.set_result(multi)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(
+        self, report: Optional[str] = None, hosts: Optional[List[str]] = None
+    ) -> int:
+        """drop the entries of *report* and *hosts* (all if None), return the count"""
+        with self._lock:
+            keys = [
+                k
+                for k in self._entries
+                if (report is None or k[0] == report)
+                and (hosts is None or k[1] in hosts)
+            ]
+            for k in keys:
+                del self._entries[k]
+        return len(keys)
+
+    def status(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            live = sum(1 for exp, _ in self._entries.values() if exp > now)
+            return {
+                "entries": len(self._entries),
+                "live": live,
+                "in_flight": len(self._inflight),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def _parse_cache_ttls(values: List[str]) -> Tuple[float, Dict[str, float]]:
+    """default TTL and per-report TTLs from 'SECONDS' or 'REPORT=SECONDS' options"""
+    default = DEFAULT_CACHE_TTL
+    ttls = dict(REPORT_CACHE_TTLS)
+    for v in values:
+        if "=" in v:
+            report, seconds = v.split("=", 1)
+            ttls[report.strip()] = float(seconds)
+        else:
+            default = float(v)
+    return default, ttls
+
+
 # ---- Data extraction (reused from cli.py logic) ----
 
 
@@ -262,19 +438,69 @@ def _extract_report_data(
     return [{clean_structured_key(k): v for k, v in row.items()} for row in rows]
 
 
+def _run(
+    name: str,
+    task_func: Any,
+    inv_filter: Optional[Dict[str, str]] = None,
+    async_capable: bool = True,
+    args: Tuple[Any, ...] = (),
+) -> AggregatedResult:
+    """Run a nornir task on the filtered fabric, from the result cache if enabled.
+
+    *args* must hold every tool argument that changes the result of the task.
+    """
+    nornir = get_nornir()
+    target = nornir.filter(**inv_filter) if inv_filter else nornir
+    if _result_cache is None or _result_cache.ttl(name) <= 0:
+        return _execute(name, task_func, target, async_capable)
+    return _result_cache.run(
+        name,
+        args,
+        target,
+        lambda t: _execute(name, task_func, t, async_capable),
+    )
+
+
+def _execute(
+    name: str, task_func: Any, target: Nornir, async_capable: bool
+) -> AggregatedResult:
+    """Run a nornir task on *target*, on pooled sessions if enabled."""
+    if async_capable and _async_runner is not None:
+        target = target.with_runner(_async_runner)
+        return target.run(task=task_func, name=name, raise_on_error=False)
+    if _session_pool is None:
+        return target.run(task=task_func, name=name, raise_on_error=False)
+    with _session_pool.session(target):
+        result = target.run(task=task_func, name=name, raise_on_error=False)
+    if result.failed_hosts:
+        _session_pool.report_failed(list(result.failed_hosts))
+    return result
+
+
 def _run_report(
     resource: str,
     task_func: Any,
     inv_filter: Optional[Dict[str, str]] = None,
     field_filter: Optional[Dict[str, str]] = None,
+    async_capable: bool = True,
+    args: Tuple[Any, ...] = (),
 ) -> List[Dict[str, Any]]:
     """Run a nornir task and return structured data."""
-    nornir = get_nornir()
-    target = nornir.filter(**inv_filter) if inv_filter else nornir
-    result = target.run(task=task_func, name=resource, raise_on_error=False)
+    result = _run(resource, task_func, inv_filter, async_capable, args)
     return _extract_report_data(resource, result, field_filter)
 
 
+def _set_fabric(nornir: Nornir) -> None:
+    """Make *nornir* the active fabric and pre-open its sessions."""
+    global _nornir_instance
+    _nornir_instance = nornir
+    if _result_cache is not None:
+        _result_cache.invalidate()
+    if _session_pool is not None:
+        _session_pool.clear()
+        _session_pool.warm(nornir)
+
+
 def _parse_filters(
     inv_filter: Optional[str] = None,
     field_filter: Optional[str] = None,
@@ -301,6 +527,96 @@ def _parse_filters(
     return i_filter, f_filter
 
 
+# ---- Paged output ----
+
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 5000
+PAGE_STORE_SIZE = 32  # result sets kept for cursors
+PAGE_STORE_TTL = 600.0
+
+_pages: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+_pages_lock = threading.Lock()
+
+
+def _project(
+    rows: List[Dict[str, Any]], columns: Optional[str]
+) -> List[Dict[str, Any]]:
+    """Keep Node, _error and the comma-separated *columns* (case-insensitive)."""
+    if not columns:
+        return rows
+    wanted = {"node", "_error"} | {
+        c.strip().lower() for c in columns.split(",") if c.strip()
+    }
+    return [{k: v for k, v in row.items() if k.lower() in wanted} for row in rows]
+
+
+def _page(
+    rows: List[Dict[str, Any]],
+    offset: int = 0,
+    limit: Optional[int] = None,
+    token: Optional[str] = None,
+) -> str:
+    """Compact JSON page of *rows* with a cursor to the next page, if any."""
+    limit = max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+    offset = max(0, offset)
+    end = offset + limit
+    next_cursor = None
+    if end < len(rows):
+        if token is None:
+            token = secrets.token_urlsafe(8)
+            with _pages_lock:
+                _pages[token] = (time.monotonic() + PAGE_STORE_TTL, rows)
+                while len(_pages) > PAGE_STORE_SIZE:
+                    _pages.popitem(last=False)
+        next_cursor = f"{token}.{end}.{limit}"
+    return json.dumps(
+        {
+            "total": len(rows),
+            "offset": offset,
+            "rows": rows[offset:end],
+            "next_cursor": next_cursor,
+        },
+        separators=(",", ":"),
+        default=str,
+    )
+
+
+def _resume(cursor: str) -> str:
+    """Page of the result set a cursor returned by :func:`_page` points into."""
+    try:
+        token, offset, limit = cursor.rsplit(".", 2)
+        start, size = int(offset), int(limit)
+    except ValueError:
+        raise ValueError(f"invalid cursor {cursor!r}")
+    with _pages_lock:
+        entry = _pages.get(token)
+        if entry is None or entry[0] < time.monotonic():
+            _pages.pop(token, None)
+            raise ValueError(
+                "cursor expired, call the tool again without cursor to get fresh data"
+            )
+        _pages.move_to_end(token)
+    return _page(entry[1], start, size, token)
+
+
+def _paged_report(
+    resource: str,
+    task_func: Any,
+    inv_filter: Optional[Dict[str, str]],
+    field_filter: Optional[Dict[str, str]],
+    columns: Optional[str],
+    offset: int,
+    limit: Optional[int],
+    cursor: Optional[str],
+    args: Tuple[Any, ...] = (),
+) -> str:
+    """Run a report, or continue at *cursor*, and return one page of its rows."""
+    if cursor:
+        return _resume(cursor)
+    rows = _run_report(resource, task_func, inv_filter, field_filter, args=args)
+    return _page(_project(rows, columns), offset, limit)
+
+
 # ---- MCP Server definition ----
 
 mcp = FastMCP(
@@ -318,6 +634,9 @@ mcp = FastMCP(
         "FIELD FILTERS (field_filter): use field_filter to filter output rows (e.g. 'session-state=established'). "
         "field_filter values are regex patterns matched case-insensitively against field values. "
         "inv_filter supports wildcards (*, ?). Both accept comma-separated key=value pairs. "
+        "LARGE TABLES (bgp_rib, ipv4_rib, ipv6_rib, mac_table, arp_table, ipv6_neighbors) are paged: "
+        "responses hold 'total', 'offset', 'rows' and 'next_cursor'. Pass next_cursor back to get the "
+        "next page, and use 'columns' to return only the fields you need. "
         "Topologies can be loaded at runtime using 'load_topology' or 'load_config'."
     ),
 )
@@ -377,18 +696,18 @@ def load_topology(
             If labels are not defined on nodes, omit this parameter.
         gnmi_port: gNMI port for SR Linux nodes (default: 57400). EDA-deployed labs typically use 57410.
     """
-    global _nornir_instance
-    _nornir_instance = _init_nornir_from_topo(topo_file, cert_file, gnmi_port)
+    nornir = _init_nornir_from_topo(topo_file, cert_file, gnmi_port)
 
     all_label_keys: set = set()
-    for host in _nornir_instance.inventory.hosts.values():
+    for host in nornir.inventory.hosts.values():
         if host.data:
             all_label_keys.update(host.data.keys())
 
     if inv_filter:
         i_filt, _ = _parse_filters(inv_filter=inv_filter)
         if i_filt:
-            _nornir_instance = _nornir_instance.filter(**i_filt)
+            nornir = nornir.filter(**i_filt)
+    _set_fabric(nornir)
 
     label_info = (
         f" Available inv_filter keys (from node labels): {sorted(all_label_keys)}."
@@ -397,7 +716,7 @@ def load_topology(
     )
     return (
         f"Fabric initialized from {topo_file}. "
-        f"{len(_nornir_instance.inventory.hosts)} nodes matched filter.{label_info}"
+        f"{len(nornir.inventory.hosts)} nodes matched filter.{label_info}"
     )
 
 
@@ -413,15 +732,15 @@ def load_config(
         inv_filter: Optional inventory filter as comma-separated key=value pairs.
             Matches against host data attributes. Use 'show_topology' to see available keys.
     """
-    global _nornir_instance
-    _nornir_instance = _init_nornir_from_config(config_file)
+    nornir = _init_nornir_from_config(config_file)
 
     if inv_filter:
         i_filt, _ = _parse_filters(inv_filter=inv_filter)
         if i_filt:
-            _nornir_instance = _nornir_instance.filter(**i_filt)
+            nornir = nornir.filter(**i_filt)
+    _set_fabric(nornir)
 
-    return f"Fabric initialized from {config_file}. {len(_nornir_instance.inventory.hosts)} nodes matched filter."
+    return f"Fabric initialized from {config_file}. {len(nornir.inventory.hosts)} nodes matched filter."
 
 
 @mcp.tool()
@@ -520,8 +839,15 @@ def bgp_rib(
         "l3vpn-ipv6-unicast",
     ],
     route_type: Optional[Literal["1", "2", "3", "4", "5"]] = None,
+    network_instance: str = "*",
+    prefix: Optional[str] = None,
+    neighbor: Optional[str] = None,
     inv_filter: Optional[str] = None,
     field_filter: Optional[str] = None,
+    columns: Optional[str] = None,
+    offset: int = 0,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
 ) -> str:
     """Get BGP RIB (Routing Information Base) entries.
 
@@ -536,21 +862,46 @@ def bgp_rib(
             (``l3vpn-v4`` / ``l3vpn-v6`` short names, or ``l3vpn-ipv4-unicast`` / ``l3vpn-ipv6-unicast``).
         route_type: Route type for EVPN (1-5). Only applicable when route_fam='evpn'.
             1=Ethernet Auto-Discovery, 2=MAC/IP, 3=Inclusive Multicast, 4=ES, 5=IP Prefix.
+        network_instance: Only routes of this network instance (default: all).
+        prefix: Only routes for this exact prefix (e.g. '10.0.0.0/24'). Supported for ipv4, ipv6,
+            l3vpn and EVPN route type 5. Much faster than a field_filter on large RIBs.
+        neighbor: Only routes received from this peer address. Much faster than a field_filter.
         inv_filter: Inventory filter as comma-separated key=value pairs. Supports wildcards.
             Matches against node labels from the topology file. Omit if no labels are defined.
         field_filter: Field filter as comma-separated key=value pairs. Supports regex.
+        columns: Comma-separated columns to return (e.g. 'prefix,next-hop'). Node is always returned.
+            Omit to return all columns.
+        offset: Index of the first row to return (default 0).
+        limit: Maximum number of rows to return (default 200, at most 5000).
+        cursor: next_cursor of a previous response, to fetch the next page of the same result.
+            All other arguments are ignored when a cursor is given.
     """
     i_filt, f_filt = _parse_filters(inv_filter, field_filter)
 
     def _task(task: Task) -> Result:
         device = task.host.get_connection(CONNECTION_NAME, task.nornir.config)
-        kwargs: Dict[str, Any] = {"route_fam": route_fam, "detail": True}
+        kwargs: Dict[str, Any] = {
+            "route_fam": route_fam,
+            "detail": True,
+            "network_instance": network_instance,
+            "prefix": prefix,
+            "neighbor": neighbor,
+        }
         if route_type is not None:
             kwargs["route_type"] = route_type
         return Result(host=task.host, result=device.get_bgp_rib(**kwargs))
 
-    data = _run_report("bgp_rib", _task, i_filt, f_filt)
-    return json.dumps(data, indent=2, default=str)
+    return _paged_report(
+        "bgp_rib",
+        _task,
+        i_filt,
+        f_filt,
+        columns,
+        offset,
+        limit,
+        cursor,
+        args=(route_fam, route_type, network_instance, prefix, neighbor),
+    )
 
 
 @mcp.tool()
@@ -558,16 +909,27 @@ def ipv4_rib(
     address: Optional[str] = None,
     inv_filter: Optional[str] = None,
     field_filter: Optional[str] = None,
+    columns: Optional[str] = None,
+    offset: int = 0,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
 ) -> str:
     """Get IPv4 routing table entries.
 
     Shows active routes with next-hops, metrics, preferences, and route owners.
 
     Args:
-        address: Optional IP address for longest-prefix-match (LPM) lookup (e.g. '10.0.0.1').
+        address: Optional IP address(es) for longest-prefix-match (LPM) lookup, comma-separated
+            (e.g. '10.0.0.1' or '10.0.0.1,10.0.1.1').
         inv_filter: Inventory filter as comma-separated key=value pairs. Supports wildcards.
             Matches against node labels from the topology file. Omit if no labels are defined.
         field_filter: Field filter as comma-separated key=value pairs. Supports regex.
+        columns: Comma-separated columns to return (e.g. 'prefix,next-hop'). Node is always returned.
+            Omit to return all columns.
+        offset: Index of the first row to return (default 0).
+        limit: Maximum number of rows to return (default 200, at most 5000).
+        cursor: next_cursor of a previous response, to fetch the next page of the same result.
+            All other arguments are ignored when a cursor is given.
     """
     i_filt, f_filt = _parse_filters(inv_filter, field_filter)
 
@@ -578,8 +940,17 @@ def ipv4_rib(
             result=device.get_rib(afi="ipv4-unicast", lpm_address=address),
         )
 
-    data = _run_report("ip_rib", _task, i_filt, f_filt)
-    return json.dumps(data, indent=2, default=str)
+    return _paged_report(
+        "ip_rib",
+        _task,
+        i_filt,
+        f_filt,
+        columns,
+        offset,
+        limit,
+        cursor,
+        args=("ipv4-unicast", address),
+    )
 
 
 @mcp.tool()
@@ -587,16 +958,26 @@ def ipv6_rib(
     address: Optional[str] = None,
     inv_filter: Optional[str] = None,
     field_filter: Optional[str] = None,
+    columns: Optional[str] = None,
+    offset: int = 0,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
 ) -> str:
     """Get IPv6 routing table entries.
 
     Shows active routes with next-hops, metrics, preferences, and route owners.
 
     Args:
-        address: Optional IPv6 address for longest-prefix-match (LPM) lookup.
+        address: Optional IPv6 address(es) for longest-prefix-match (LPM) lookup, comma-separated.
         inv_filter: Inventory filter as comma-separated key=value pairs. Supports wildcards.
             Matches against node labels from the topology file. Omit if no labels are defined.
         field_filter: Field filter as comma-separated key=value pairs. Supports regex.
+        columns: Comma-separated columns to return (e.g. 'prefix,next-hop'). Node is always returned.
+            Omit to return all columns.
+        offset: Index of the first row to return (default 0).
+        limit: Maximum number of rows to return (default 200, at most 5000).
+        cursor: next_cursor of a previous response, to fetch the next page of the same result.
+            All other arguments are ignored when a cursor is given.
     """
     i_filt, f_filt = _parse_filters(inv_filter, field_filter)
 
@@ -607,8 +988,17 @@ def ipv6_rib(
             result=device.get_rib(afi="ipv6-unicast", lpm_address=address),
         )
 
-    data = _run_report("ip_rib", _task, i_filt, f_filt)
-    return json.dumps(data, indent=2, default=str)
+    return _paged_report(
+        "ip_rib",
+        _task,
+        i_filt,
+        f_filt,
+        columns,
+        offset,
+        limit,
+        cursor,
+        args=("ipv6-unicast", address),
+    )
 
 
 @mcp.tool()
@@ -765,6 +1155,10 @@ def lldp_neighbors(
 def mac_table(
     inv_filter: Optional[str] = None,
     field_filter: Optional[str] = None,
+    columns: Optional[str] = None,
+    offset: int = 0,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
 ) -> str:
     """Get MAC address table entries.
 
@@ -774,6 +1168,12 @@ def mac_table(
         inv_filter: Inventory filter as comma-separated key=value pairs. Supports wildcards.
             Matches against node labels from the topology file. Omit if no labels are defined.
         field_filter: Field filter as comma-separated key=value pairs. Supports regex.
+        columns: Comma-separated columns to return (e.g. 'prefix,next-hop'). Node is always returned.
+            Omit to return all columns.
+        offset: Index of the first row to return (default 0).
+        limit: Maximum number of rows to return (default 200, at most 5000).
+        cursor: next_cursor of a previous response, to fetch the next page of the same result.
+            All other arguments are ignored when a cursor is given.
     """
     i_filt, f_filt = _parse_filters(inv_filter, field_filter)
 
@@ -781,8 +1181,9 @@ def mac_table(
         device = task.host.get_connection(CONNECTION_NAME, task.nornir.config)
         return Result(host=task.host, result=device.get_mac_table())
 
-    data = _run_report("mac_table", _task, i_filt, f_filt)
-    return json.dumps(data, indent=2, default=str)
+    return _paged_report(
+        "mac_table", _task, i_filt, f_filt, columns, offset, limit, cursor
+    )
 
 
 @mcp.tool()
@@ -892,6 +1293,10 @@ def vxlan_tunnels(
 def arp_table(
     inv_filter: Optional[str] = None,
     field_filter: Optional[str] = None,
+    columns: Optional[str] = None,
+    offset: int = 0,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
 ) -> str:
     """Get ARP table entries.
 
@@ -901,6 +1306,12 @@ def arp_table(
         inv_filter: Inventory filter as comma-separated key=value pairs. Supports wildcards.
             Matches against node labels from the topology file. Omit if no labels are defined.
         field_filter: Field filter as comma-separated key=value pairs. Supports regex.
+        columns: Comma-separated columns to return (e.g. 'prefix,next-hop'). Node is always returned.
+            Omit to return all columns.
+        offset: Index of the first row to return (default 0).
+        limit: Maximum number of rows to return (default 200, at most 5000).
+        cursor: next_cursor of a previous response, to fetch the next page of the same result.
+            All other arguments are ignored when a cursor is given.
     """
     i_filt, f_filt = _parse_filters(inv_filter, field_filter)
 
@@ -908,20 +1319,25 @@ def arp_table(
         device = task.host.get_connection(CONNECTION_NAME, task.nornir.config)
         return Result(host=task.host, result=device.get_arp())
 
-    data = _run_report("arp", _task, i_filt, f_filt)
-    return json.dumps(data, indent=2, default=str)
+    return _paged_report("arp", _task, i_filt, f_filt, columns, offset, limit, cursor)
 
 
 @mcp.tool()
 def ifstats(
     interval: int = 5,
+    stream: bool = False,
+    window: Optional[int] = None,
+    windows: Optional[str] = None,
+    percentiles: Optional[str] = None,
     inv_filter: Optional[str] = None,
     field_filter: Optional[str] = None,
 ) -> str:
     """Get per-interface traffic rates (in/out bps) computed from two consecutive gNMI samples.
 
     Queries interface statistics twice with a configurable interval, then calculates
-    the delta to derive rates for each interface.
+    the delta to derive rates for each interface. With stream=True a gNMI SAMPLE
+    subscription is opened per device and kept open, so the first call returns after
+    one interval and subsequent calls return the current rates immediately.
 
     Returns per interface: in-Kbps/out-Kbps (rate over the interval), in-err/out-err
     and in-disc/out-disc (deltas), plus cumulative counters in-pkts/out-pkts and
@@ -930,6 +1346,12 @@ def ifstats(
 
     Args:
         interval: Seconds between the two samples (default 5).
+        stream: Compute rates from a streaming subscription (default False).
+        window: With stream, seconds to average rates over (default: one interval).
+        windows: Comma-separated windows in seconds (e.g. '5,60,300'). Implies stream and
+            returns in/out Kbps, pps, errors/s and discards/s per interface for each window.
+        percentiles: Comma-separated percentiles (e.g. '50,95,99') of the rates across all
+            interfaces of all matched nodes, appended as rows with Node 'fabric'.
         inv_filter: Inventory filter as comma-separated key=value pairs. Supports wildcards.
             Matches against node labels from the topology file. Omit if no labels are defined.
         field_filter: Field filter as comma-separated key=value pairs. Supports regex.
@@ -938,16 +1360,57 @@ def ifstats(
 
     def _task(task: Task) -> Result:
         device = task.host.get_connection(CONNECTION_NAME, task.nornir.config)
-        return Result(host=task.host, result=device.get_ifstats(interval=interval))
+        return Result(
+            host=task.host,
+            result=device.get_ifstats(
+                interval=interval,
+                stream=stream or bool(win),
+                window=window,
+                windows=win,
+            ),
+        )
 
-    data = _run_report("ifstats", _task, i_filt, f_filt)
+    win = [int(w) for w in windows.split(",") if w.strip()] if windows else None
+    data = _run_report("ifstats", _task, i_filt, f_filt, async_capable=False)
+    if percentiles:
+        q = [float(p) for p in percentiles.split(",") if p.strip()]
+        data += _fabric_percentiles(data, q)
     return json.dumps(data, indent=2, default=str)
 
 
+def _fabric_percentiles(
+    rows: List[Dict[str, Any]], q: List[float]
+) -> List[Dict[str, Any]]:
+    """Percentile rows of the ifstats rates across all nodes, per window."""
+    fields = [
+        f
+        for f in ("in-Kbps", "out-Kbps", "in-pps", "out-pps", "in-err/s", "out-err/s")
+        if any(f in r for r in rows)
+    ]
+    by_window: Dict[str, List[Dict[str, Any]]] = {}
+    for r in rows:
+        if "_error" not in r:
+            by_window.setdefault(r.get("window", "last"), []).append(r)
+    result = []
+    for w, w_rows in by_window.items():
+        pct = rate_percentiles(w_rows, fields, q)
+        for p in q:
+            row: Dict[str, Any] = {"Node": "fabric", "interface": f"p{p:g}"}
+            if "window" in w_rows[0]:
+                row["window"] = w
+            row.update({f: round(pct[f][p], 2) for f in fields})
+            result.append(row)
+    return result
+
+
 @mcp.tool()
 def ipv6_neighbors(
     inv_filter: Optional[str] = None,
     field_filter: Optional[str] = None,
+    columns: Optional[str] = None,
+    offset: int = 0,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
 ) -> str:
     """Get IPv6 Neighbor Discovery table entries.
 
@@ -957,6 +1420,12 @@ def ipv6_neighbors(
         inv_filter: Inventory filter as comma-separated key=value pairs. Supports wildcards.
             Matches against node labels from the topology file. Omit if no labels are defined.
         field_filter: Field filter as comma-separated key=value pairs. Supports regex.
+        columns: Comma-separated columns to return (e.g. 'prefix,next-hop'). Node is always returned.
+            Omit to return all columns.
+        offset: Index of the first row to return (default 0).
+        limit: Maximum number of rows to return (default 200, at most 5000).
+        cursor: next_cursor of a previous response, to fetch the next page of the same result.
+            All other arguments are ignored when a cursor is given.
     """
     i_filt, f_filt = _parse_filters(inv_filter, field_filter)
 
@@ -964,8 +1433,7 @@ def ipv6_neighbors(
         device = task.host.get_connection(CONNECTION_NAME, task.nornir.config)
         return Result(host=task.host, result=device.get_nd())
 
-    data = _run_report("nd", _task, i_filt, f_filt)
-    return json.dumps(data, indent=2, default=str)
+    return _paged_report("nd", _task, i_filt, f_filt, columns, offset, limit, cursor)
 
 
 @mcp.tool()
@@ -986,9 +1454,7 @@ def routing_policies(
         device = task.host.get_connection(CONNECTION_NAME, task.nornir.config)
         return Result(host=task.host, result=device.get_routing_policies())
 
-    nornir = get_nornir()
-    target = nornir.filter(**i_filt) if i_filt else nornir
-    result = target.run(task=_task, name="routing_pol", raise_on_error=False)
+    result = _run("routing_pol", _task, i_filt, async_capable=False)
 
     all_data = []
     for host, host_result in result.items():
@@ -1004,6 +1470,56 @@ def routing_policies(
     return json.dumps(all_data, indent=2, default=str)
 
 
+@mcp.tool()
+def session_pool_status() -> str:
+    """Show the pooled gNMI sessions: connected, alive at the last probe, idle time.
+
+    Sessions are kept open between tool calls, probed in the background and
+    reconnected when a node stops answering, so that tool calls hit warm sessions.
+    """
+    if _session_pool is None:
+        return json.dumps({"enabled": False})
+    return json.dumps(
+        {
+            "enabled": True,
+            "probe_interval": _session_pool.probe_interval,
+            "idle_timeout": _session_pool.idle_timeout,
+            "sessions": _session_pool.status(),
+        },
+        indent=2,
+    )
+
+
+@mcp.tool()
+def invalidate_cache(
+    report: Optional[str] = None,
+    inv_filter: Optional[str] = None,
+) -> str:
+    """Drop cached report results so that the next tool call queries the nodes again.
+
+    Report results are cached per node for a short time (30s by default, longer for
+    sys_info and lldp_nbrs), so repeated tool calls do not query the fabric again.
+    Call this after changing the fabric, or when fresh data is needed right away.
+
+    Args:
+        report: Report to invalidate, e.g. 'bgp_peers', 'bgp_rib', 'ip_rib', 'mac_table'.
+            Omit to invalidate all reports.
+        inv_filter: Inventory filter as comma-separated key=value pairs. Supports wildcards.
+            Omit to invalidate the results of all nodes.
+    """
+    if _result_cache is None:
+        return json.dumps({"enabled": False})
+    hosts = None
+    if inv_filter:
+        i_filt, _ = _parse_filters(inv_filter=inv_filter)
+        hosts = list(get_nornir().filter(**(i_filt or {})).inventory.hosts)
+    dropped = _result_cache.invalidate(report, hosts)
+    return json.dumps(
+        {"enabled": True, "invalidated": dropped, **_result_cache.status()},
+        indent=2,
+    )
+
+
 # ---- CLI entry point ----
 
 
@@ -1038,6 +1554,55 @@ def main() -> None:
         action="append",
         help="Inventory filter in key=value format (can be repeated)",
     )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Query all nodes concurrently on a single asyncio event loop",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help=f"Maximum number of nodes queried at the same time with --async (default: {DEFAULT_MAX_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--no-session-pool",
+        dest="session_pool",
+        action="store_false",
+        help="Do not keep gNMI sessions warm between tool calls",
+    )
+    parser.add_argument(
+        "--probe-interval",
+        type=float,
+        default=DEFAULT_PROBE_INTERVAL,
+        help=f"Seconds between liveness probes of pooled sessions (default: {DEFAULT_PROBE_INTERVAL:g})",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT,
+        help=f"Close pooled sessions unused for this many seconds (default: {DEFAULT_IDLE_TIMEOUT:g})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        help="Do not cache report results between tool calls",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        action="append",
+        default=[],
+        metavar="[REPORT=]SECONDS",
+        help=f"Seconds report results stay cached, for all or one report (can be repeated, default: {DEFAULT_CACHE_TTL:g})",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        help=f"Maximum number of cached per-node results (default: {DEFAULT_CACHE_SIZE})",
+    )
     parser.add_argument(
         "--transport",
         choices=["stdio", "http"],
@@ -1062,7 +1627,21 @@ def main() -> None:
         parser.error("--topo-file and --config-file are mutually exclusive")
 
     # Initialize Nornir
-    global _nornir_instance
+    global _nornir_instance, _async_runner, _session_pool, _result_cache
+    if args.cache:
+        try:
+            default_ttl, ttls = _parse_cache_ttls(args.cache_ttl)
+        except ValueError:
+            parser.error("--cache-ttl expects SECONDS or REPORT=SECONDS")
+        _result_cache = ResultCache(default_ttl, ttls, args.cache_size)
+    if args.use_async:
+        _async_runner = AsyncioRunner(max_concurrency=args.max_concurrency)
+        atexit.register(_async_runner.close)
+    if args.session_pool:
+        _session_pool = SessionPool(
+            probe_interval=args.probe_interval, idle_timeout=args.idle_timeout
+        ).start()
+        atexit.register(_session_pool.stop)
     try:
         if args.topo_file:
             _nornir_instance = _init_nornir_from_topo(args.topo_file, args.cert_file)
@@ -1082,6 +1661,8 @@ def main() -> None:
                 i_filter[k] = v
         if i_filter:
             _nornir_instance = _nornir_instance.filter(**i_filter)
+    if _nornir_instance is not None:
+        _set_fabric(_nornir_instance)
 
     # Run server
     if args.transport == "http":
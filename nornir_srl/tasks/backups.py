@@ -0,0 +1,187 @@
+"""Versioned, content-addressed config backups of a device.
+
+Every config is stored once, compressed and named by the SHA-256 digest of its
+canonical JSON, so backing up a config identical to an earlier version adds a
+version to the index but no data. An index file lists the versions newest first,
+so version *N* is found without listing and sorting the directory::
+
+    <root>/index.json                          versions and objects
+    <root>/objects/ab/abcdef....json.gz         a config
+    <root>/objects/cd/cdef....delta.json.gz     a config as delta to another one
+
+Configs are compressed with zstd if ``zstandard`` is installed (``pip install
+nornir-srl[zstd]``), with gzip otherwise; objects of both can be read as long as
+``zstandard`` is installed. With *deltas*, a config is stored as a structural
+delta against the previous version (see :func:`config_delta`) when that is
+smaller, with at most :data:`DELTA_CHAIN` deltas to the closest full config.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from nornir_srl.connections.config_diff import apply_delta, config_delta
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+INDEX = "index.json"
+# max number of deltas to apply to a full config to get a version
+DELTA_CHAIN = 10
+
+
+def _zstd_compress(data: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=10).compress(data)
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+# compression -> file suffix, compress, decompress
+CODECS: Dict[str, Tuple[str, Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "gzip": (".gz", lambda b: gzip.compress(b, mtime=0), gzip.decompress),
+    "zstd": (".zst", _zstd_compress, _zstd_decompress),
+}
+
+
+def _canonical(obj: Any) -> bytes:
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str).encode(
+        "utf-8"
+    )
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class BackupStore:
+    """
+    Config backups of one device in directory *root*
+
+    Args:
+        root: directory of the store, created on the first backup
+        compression: ``zstd`` or ``gzip``, zstd if available by default
+        deltas: store configs as deltas against the previous version
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        compression: Optional[str] = None,
+        deltas: bool = False,
+    ):
+        if compression is None:
+            compression = "gzip" if zstandard is None else "zstd"
+        if compression not in CODECS:
+            raise ValueError(f"invalid compression: {compression!r}")
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package")
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.compression = compression
+        self.deltas = deltas
+        self._index: Optional[Dict[str, Any]] = None
+
+    @property
+    def index(self) -> Dict[str, Any]:
+        if self._index is None:
+            path = self.root / INDEX
+            self._index = (
+                json.loads(path.read_text())
+                if path.exists()
+                else {"versions": [], "objects": {}}
+            )
+        return self._index
+
+    def versions(self) -> List[Dict[str, Any]]:
+        """digest and time of all versions, newest (version 1) first"""
+        return list(self.index["versions"])
+
+    def save(self, config: Any, history_len: int = 10) -> str:
+        """
+        Add *config* as the newest version, keep the newest *history_len* versions
+
+        Nothing is added if *config* is identical to the newest version.
+
+        Returns:
+            str: SHA-256 digest of *config*
+        """
+        data = _canonical(config)
+        digest = hashlib.sha256(data).hexdigest()
+        versions = self.index["versions"]
+        if versions and versions[0]["config"] == digest:
+            return digest
+        if digest not in self.index["objects"]:
+            base = versions[0]["config"] if versions and self.deltas else None
+            self._put(digest, config, data, base)
+        versions.insert(
+            0,
+            {
+                "config": digest,
+                "time": datetime.now().isoformat(timespec="seconds"),
+            },
+        )
+        del versions[history_len:]
+        unused = self._collect()
+        _write_atomic(self.root / INDEX, json.dumps(self.index, indent=1).encode())
+        for file in unused:
+            file.unlink(missing_ok=True)
+        return digest
+
+    def load(self, version: int = 1) -> Any:
+        """config of *version*, 1 being the newest"""
+        versions = self.index["versions"]
+        if not 1 <= version <= len(versions):
+            raise ValueError(
+                f"Version {version} asked but only {len(versions)} versions available"
+            )
+        return self._load(versions[version - 1]["config"])
+
+    def _put(self, digest: str, config: Any, data: bytes, base: Optional[str]) -> None:
+        obj: Dict[str, Any] = {"base": None, "depth": 0}
+        if base is not None and self.index["objects"][base]["depth"] < DELTA_CHAIN:
+            delta = _canonical(config_delta(self._load(base), config))
+            if len(delta) < len(data):
+                data = delta
+                obj = {"base": base, "depth": self.index["objects"][base]["depth"] + 1}
+        suffix, compress, _ = CODECS[self.compression]
+        kind = ".delta" if obj["base"] else ""
+        obj["file"] = f"{digest[:2]}/{digest}{kind}.json{suffix}"
+        _write_atomic(self.objects / obj["file"], compress(data))
+        self.index["objects"][digest] = obj
+
+    def _load(self, digest: str) -> Any:
+        obj = self.index["objects"][digest]
+        file = self.objects / obj["file"]
+        codec = next(c for c in CODECS.values() if file.name.endswith(c[0]))
+        data = json.loads(codec[2](file.read_bytes()))
+        if obj["base"] is None:
+            return data
+        return apply_delta(self._load(obj["base"]), data)
+
+    def _collect(self) -> List[Path]:
+        """remove the objects that no version needs from the index, return their files"""
+        objects = self.index["objects"]
+        keep = set()
+        for v in self.index["versions"]:
+            digest = v["config"]
+            while digest is not None and digest not in keep:
+                keep.add(digest)
+                digest = objects[digest]["base"]
+        return [
+            self.objects / objects.pop(d)["file"]
+            for d in list(objects)
+            if d not in keep
+        ]
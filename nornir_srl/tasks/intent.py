@@ -0,0 +1,191 @@
+"""Fabric-wide index of the YAML documents in an intent directory.
+
+Every file is parsed once, not once per host, and re-parsed only when its mtime or
+size changes; the files are checked on every lookup, which costs a stat per file. Documents with ``metadata`` are indexed by the hostname, groups and
+labels they apply to, so the documents of a host are found without going through
+all documents of the fabric.
+
+``__var`` placeholders are substituted with host variables before a document is
+parsed, as YAML types depend on the substituted text. A document with
+placeholders is therefore kept as text and parsed per host, but only for the hosts
+it applies to. Files that cannot be parsed before substitution are parsed per host
+as a whole.
+"""
+
+from __future__ import annotations
+
+import copy
+import re
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import yaml  # type: ignore
+from natsort import natsorted
+from nornir.core.inventory import Host
+
+RE_VAR = re.compile(r"(__(\S+))")
+
+
+class IntentDoc(NamedTuple):
+    text: str  # source, parsed per host if it has placeholders
+    metadata: Optional[Dict[str, Any]]  # None: known after substitution only
+    data: Any  # parsed document without metadata, if it has no placeholders
+    has_vars: bool
+    whole_file: bool = False  # text is a file that only parses after substitution
+
+
+def host_matches(metadata: Dict[str, Any], host: Host) -> bool:
+    """True if a document with *metadata* applies to *host*"""
+    if "hostname" in metadata and host.hostname != metadata["hostname"]:
+        return False
+    if "groups" in metadata and not any(
+        str(g) in metadata["groups"] for g in host.groups
+    ):
+        return False
+    if "labels" in metadata:
+        data = host.extended_data()
+        if any(k not in data or data[k] != v for k, v in metadata["labels"].items()):
+            return False
+    return True
+
+
+def parse_intent(text: str) -> List[IntentDoc]:
+    """documents with metadata of an intent file, placeholders not substituted"""
+    docs: List[IntentDoc] = []
+    try:
+        nodes = list(yaml.compose_all(text, Loader=yaml.SafeLoader))
+    except yaml.YAMLError:
+        return [IntentDoc(text, None, None, True, whole_file=True)]
+    for node in nodes:
+        if node is None:
+            continue
+        start, end = node.start_mark, node.end_mark
+        src = " " * start.column + text[start.index : end.index]
+        data = yaml.safe_load(src)
+        if not isinstance(data, dict) or "metadata" not in data:
+            continue
+        metadata = data.pop("metadata") or {}
+        has_vars = RE_VAR.search(src) is not None
+        docs.append(
+            IntentDoc(
+                src,
+                None if RE_VAR.search(repr(metadata)) else metadata,
+                None if has_vars else data,
+                has_vars,
+            )
+        )
+    return docs
+
+
+class _Index(NamedTuple):
+    docs: List[IntentDoc]
+    by_hostname: Dict[Any, List[int]]
+    by_group: Dict[str, List[int]]
+    by_label: Dict[Tuple[str, Any], List[int]]
+    any_host: List[int]
+
+
+def _build_index(docs: List[IntentDoc]) -> _Index:
+    index = _Index(docs, {}, {}, {}, [])
+    for i, doc in enumerate(docs):
+        md = doc.metadata
+        if md is None:
+            index.any_host.append(i)
+        elif "hostname" in md:
+            index.by_hostname.setdefault(md["hostname"], []).append(i)
+        elif "groups" in md and isinstance(md["groups"], list):
+            for g in md["groups"]:
+                index.by_group.setdefault(str(g), []).append(i)
+        elif "labels" in md and md["labels"]:
+            k, v = next(iter(md["labels"].items()))
+            try:
+                index.by_label.setdefault((k, v), []).append(i)
+            except TypeError:  # unhashable label value
+                index.any_host.append(i)
+        else:
+            index.any_host.append(i)
+    return index
+
+
+class IntentIndex:
+    """
+    Parsed and indexed YAML documents of the intent directory *path*
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._files: Dict[Path, Tuple[Tuple[int, int], List[IntentDoc]]] = {}
+        self._index = _build_index([])
+        self._lock = threading.Lock()
+
+    def refresh(self) -> None:
+        """re-parse the files whose mtime or size changed"""
+        with self._lock:
+            files: Dict[Path, Tuple[Tuple[int, int], List[IntentDoc]]] = {}
+            for f in natsorted(self.path.glob("**/*.y?ml")):
+                st = f.stat()
+                sig = (st.st_mtime_ns, st.st_size)
+                cached = self._files.get(f)
+                if cached is None or cached[0] != sig:
+                    cached = (sig, parse_intent(f.read_text()))
+                files[f] = cached
+            if list(files.items()) != list(self._files.items()):
+                self._index = _build_index(
+                    [d for _, docs in files.values() for d in docs]
+                )
+            self._files = files
+
+    def documents(self, host: Host) -> Iterator[Dict[str, Any]]:
+        """
+        documents that apply to *host*, placeholders substituted and without
+        metadata, in file and document order
+
+        Every document is a new copy, it can be modified by the caller.
+        """
+        self.refresh()
+        index = self._index
+        candidates = set(index.any_host)
+        candidates.update(index.by_hostname.get(host.hostname, ()))
+        for g in host.groups:
+            candidates.update(index.by_group.get(str(g), ()))
+        for k, v in host.extended_data().items():
+            try:
+                candidates.update(index.by_label.get((k, v), ()))
+            except TypeError:  # unhashable host data
+                pass
+
+        def _render(matchobj: Any) -> str:
+            return str(host.get(matchobj.group(2)))
+
+        for i in sorted(candidates):
+            yield from _resolve(index.docs[i], host, _render)
+
+
+def _resolve(
+    doc: IntentDoc, host: Host, render: Callable[[Any], str]
+) -> Iterator[Dict[str, Any]]:
+    if not doc.has_vars:
+        if doc.metadata is not None and host_matches(doc.metadata, host):
+            yield copy.deepcopy(doc.data)
+        return
+    text = RE_VAR.sub(render, doc.text)
+    for data in yaml.safe_load_all(text) if doc.whole_file else [yaml.safe_load(text)]:
+        if not isinstance(data, dict) or "metadata" not in data:
+            continue
+        if host_matches(data.pop("metadata") or {}, host):
+            yield data
+
+
+_indexes: Dict[str, IntentIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def intent_index(path: str) -> IntentIndex:
+    """the process-wide :class:`IntentIndex` of directory *path*"""
+    key = str(Path(path).resolve())
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = IntentIndex(key)
+        return index
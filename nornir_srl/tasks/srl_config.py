@@ -1,19 +1,25 @@
+import hashlib
 import json
 import logging
-import re
-import difflib
-from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from jinja2 import Environment, FileSystemLoader, StrictUndefined
-from natsort import natsorted
 from nornir.core.task import Result, Task
 import yaml  # type: ignore
 
+from nornir_srl.connections.config_diff import change_sets, diff_config, render_changes
 from nornir_srl.connections.srlinux import CONNECTION_NAME
 
+from .backups import BackupStore
 from .helpers import _merge
+from .intent import intent_index
+from .templates import TemplateHost, render_pool, render_templates
+
+logger = logging.getLogger(__name__)
+
+# state that changes with every commit on the device, read to detect config changes
+# made on the device since the last push
+COMMIT_MARKER_PATH = "/system/configuration/commit"
 
 
 def configure_device(
@@ -22,6 +28,9 @@ def configure_device(
     state_path: str,
     backup_path: str,
     dry_run: Optional[bool] = None,
+    render_processes: Optional[int] = None,
+    template_cache_dir: Optional[str] = None,
+    incremental: Optional[bool] = True,
     **kwargs: Any,
 ) -> Result:
     """
@@ -35,12 +44,14 @@ def configure_device(
     state_path: path to the directory to store state (i.e. to prune resourcesvthat are no longer part of the intent)
     backup_path: path to directory to hold config backups
     dry_run: boolean to indicate if this is a dry-run (dry-run == True) (no config changes applied to device)
+    render_processes: render templates in a shared pool of this many processes, see render_template
+    template_cache_dir: directory to cache compiled templates in between runs
+    incremental: skip the push if neither the rendered intent nor the device config changed since the last
+        push, see check_fingerprint
     kwargs: optional key, value pairs to pass intent vars directly to the task
 
     Returns a Nornir Result object that holds the result of the outcome)
     """
-    config_changed = False
-
     r = task.run(
         name=f"Load vars from {intent_path}",
         severity_level=logging.DEBUG,
@@ -54,6 +65,8 @@ def configure_device(
         severity_level=logging.DEBUG,
         task=render_template,
         base_path=intent_path,
+        render_processes=render_processes,
+        template_cache_dir=template_cache_dir,
         **vars,
     )
 
@@ -65,30 +78,46 @@ def configure_device(
     )
     device_intent = r.result
 
+    update: List[Dict[str, Any]] = []
+    replace: List[Dict[str, Any]] = []
     for data in device_intent:
         for set_mode, resources in data.items():
             if set_mode not in ("update", "replace"):
                 raise ValueError(f"Unexpected set_mode: {set_mode}")
             if isinstance(resources, list):
-                r = task.run(
-                    name=f"DRY-RUN:{dry_run} {set_mode}:{[list(rsc.keys())[0] for rsc in resources]} to device",
-                    severity_level=logging.INFO,
-                    task=set_config,
-                    device_config=resources,
-                    op=set_mode,
-                    dry_run=dry_run or task.is_dry_run(override=False),
-                )
-                config_changed |= r.changed
+                (update if set_mode == "update" else replace).extend(resources)
+    new_rsc, purged = intent_resources(task, device_intent, state_path)
+    dry_run = dry_run or task.is_dry_run(override=False)
+    fingerprint = intent_fingerprint(update, replace)
+
+    if incremental and not purged:
+        r = task.run(
+            name="Check intent fingerprint",
+            severity_level=logging.DEBUG,
+            task=check_fingerprint,
+            state_base_path=state_path,
+            fingerprint=fingerprint,
+        )
+        if r.result:
+            return Result(host=task.host, result={}, changed=False)
 
     r = task.run(
-        name="Check for purged resources",
-        severity_level=logging.WARN,
-        task=purge_resources,
-        device_intent=device_intent,
-        state_base_path=state_path,
+        name=f"DRY-RUN:{dry_run} update:{[list(rsc.keys())[0] for rsc in update]} "
+        f"replace:{[list(rsc.keys())[0] for rsc in replace]} "
+        f"delete:{list(purged)} to device",
+        severity_level=logging.INFO,
+        task=commit_config,
+        update=update,
+        replace=replace,
+        delete=list(purged),
         dry_run=dry_run,
     )
-    config_changed |= r.changed
+    config_changed = r.changed
+    if not dry_run:
+        state_file = Path(state_path) / f"{task.host.hostname}.json"
+        state_file.write_text(json.dumps(new_rsc, indent=4))
+        if incremental:
+            save_fingerprint(task, state_path, fingerprint)
 
     if config_changed:
         r = task.run(
@@ -104,23 +133,29 @@ def backup_config(
     task: Task,
     backup_base_path: str,
     history_len: int = 10,
+    compression: Optional[str] = None,
+    deltas: bool = False,
 ) -> None:
-    p = Path(backup_base_path)
-    suffix = datetime.now().strftime("%Y%m%d%H%M%S")
-    if task.host.hostname:
-        p = p / task.host.hostname / f"{task.host.hostname}.{suffix}.json"
-    else:
-        raise ValueError(f"Hostname not set in task {task.name}")
-    p.parent.mkdir(parents=True, exist_ok=True)
+    """
+    Back up the running config of the device to ``<backup_base_path>/<hostname>``
 
+    Backups are kept compressed and deduplicated in a :class:`BackupStore`, the
+    newest *history_len* versions are kept.
+
+    Args:
+        compression: ``zstd`` or ``gzip``, zstd if available by default
+        deltas: store a config as delta against the previous version
+    """
+    if not task.host.hostname:
+        raise ValueError(f"Hostname not set in task {task.name}")
+    store = BackupStore(
+        Path(backup_base_path) / task.host.hostname,
+        compression=compression,
+        deltas=deltas,
+    )
     device = task.host.get_connection(CONNECTION_NAME, task.nornir.config)
     cfg = device.get(paths=["/"], datatype="config", strip_mod=True)
-    p.write_text(json.dumps(cfg, indent=4))
-
-    backup_files = sorted(p.parent.glob("*.json"))
-    if len(backup_files) > history_len:
-        for f in backup_files[history_len:]:
-            f.unlink()
+    store.save(cfg, history_len=history_len)
 
 
 def restore_config(
@@ -128,51 +163,90 @@ def restore_config(
     backup_base_path: str,
     version: int,
     dry_run: Optional[bool] = True,
+    paths: Optional[List[str]] = None,
 ) -> Result:
+    """
+    Restore the config of backup *version*, 1 being the newest, see backup_config
+
+    The backup is diffed structurally against the running config and only the
+    differing subtrees are sent to the device, in a single Set. List entries are
+    addressed by all their YANG keys; a list whose keys are not known is restored
+    by replacing the container or list entry that holds it.
+
+    Args:
+        dry_run: only return the diff between running config and backup
+        paths: only restore these top-level paths, e.g. ``["/interface",
+            "/network-instance"]``. Only these are read from the device.
+    """
     p = Path(backup_base_path)
     if task.host.hostname:
         p = p / task.host.hostname
     else:
         raise ValueError(f"Hostname not set in task {task.name}")
-    backup_files = sorted(p.glob("*.json"), reverse=True)
-    if len(backup_files) < version:
-        raise ValueError(
-            f"Version {version} asked but only {len(backup_files)} versions available"
-        )
-    p = backup_files[version - 1]
+    store = BackupStore(p)
+    if store.versions():
+        backup = store.load(version)
+    else:  # backups taken before the backup store
+        backup_files = sorted(p.glob(f"{task.host.hostname}.*.json"), reverse=True)
+        if len(backup_files) < version:
+            raise ValueError(
+                f"Version {version} asked but only {len(backup_files)} versions available"
+            )
+        backup = json.loads(backup_files[version - 1].read_text())
 
     device = task.host.get_connection(CONNECTION_NAME, task.nornir.config)
-    if dry_run:
-        diff = ""
-        before_json = json.dumps(
-            device.get(paths=["/"], datatype="config", strip_mod=True), indent=4
-        )
-        after_json = p.read_text()
-        for line in difflib.unified_diff(
-            before_json.splitlines(keepends=True),
-            after_json.splitlines(keepends=True),
-            fromfile="before",
-            tofile="after",
-        ):
-            diff += line
-        return Result(host=task.host, result=diff, changed=False)
+    if paths:
+        names = [path.strip("/") for path in paths]
+        for name in names:
+            if not name or "/" in name or "[" in name:
+                raise ValueError(f"Not a top-level path: {name!r}")
+        backup_tree = {k: v for k, v in _config_tree(backup).items() if k in names}
+        running_tree = {
+            k: v
+            for k, v in _config_tree(
+                device.get(paths=[f"/{n}" for n in names], datatype="config")
+            ).items()
+            if k in names
+        }
     else:
-        r = device.set_config(
-            input=json.loads(p.read_text()), op="replace", dry_run=False
+        backup_tree = _config_tree(backup)
+        running_tree = _config_tree(
+            device.get(paths=["/"], datatype="config", strip_mod=True)
         )
-        return Result(host=task.host, result=r, changed=len(r) > 0)
-
+    changes = diff_config(running_tree, backup_tree)
+    if dry_run:
+        return Result(host=task.host, result=render_changes(changes), changed=False)
+    r = device.commit_config(**change_sets(changes, backup_tree), dry_run=False)
+    return Result(host=task.host, result=r, changed=len(r) > 0)
+
+
+def _config_tree(resp: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """top-level node -> config of a Get response or backup, e.g. of path ``/``"""
+    tree: Dict[str, Any] = {}
+    for d in resp:
+        for k, v in d.items():
+            k = k.strip("/")
+            if not k and isinstance(v, dict):
+                tree.update(v)
+            elif k:
+                tree[k] = v
+    return tree
+
+
+def intent_resources(
+    task: Task, device_intent: List[Dict[str, Any]], state_base_path: str
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    resources of *device_intent* and resources of the previously pushed intent,
+    as kept in the state file of the host, that are no longer part of it
 
-def purge_resources(
-    task: Task,
-    device_intent: List[Dict[str, Any]],
-    state_base_path: str,
-    dry_run: Optional[bool] = None,
-) -> Result:
+    Returns:
+        tuple: (path -> config of the intent, path -> config of purged resources)
+    """
     new_rsc = dict()
     for l1 in device_intent:
         if l1.get("update", []):
-            l2 = l1["update"]
+            l2 = list(l1["update"])
         else:
             l2 = []
         if l1.get("replace", []):  # might be a dict entry with value None
@@ -187,6 +261,83 @@ def purge_resources(
         purged = {k: v for k, v in state.items() if k not in new_rsc}
     else:
         purged = {}
+    return new_rsc, purged
+
+
+def intent_fingerprint(
+    update: List[Dict[str, Any]], replace: List[Dict[str, Any]]
+) -> str:
+    """SHA-256 digest of the rendered intent of a host"""
+    data = json.dumps(
+        {"update": update, "replace": replace},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def commit_marker(device: Any) -> str:
+    """digest of the commit history of *device*, it changes with every commit"""
+    data = json.dumps(
+        device.get(paths=[COMMIT_MARKER_PATH], datatype="state"),
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _fingerprint_file(task: Task, state_base_path: str) -> Path:
+    return Path(state_base_path) / f"{task.host.hostname}.fingerprint.json"
+
+
+def check_fingerprint(task: Task, state_base_path: str, fingerprint: str) -> Result:
+    """
+    Compare the intent *fingerprint* and the commit marker of the device with the
+    ones saved at the last push, see save_fingerprint
+
+    Only the small commit history is read from the device, no config. The result
+    is True if both are unchanged, i.e. a push would not change the device.
+    """
+    fp_file = _fingerprint_file(task, state_base_path)
+    if not fp_file.exists():
+        return Result(host=task.host, result=False)
+    saved = json.loads(fp_file.read_text())
+    if saved.get("intent") != fingerprint:
+        return Result(host=task.host, result=False)
+    device = task.host.get_connection(CONNECTION_NAME, task.nornir.config)
+    try:
+        marker = commit_marker(device)
+    except Exception as e:
+        logger.info("%s: cannot read commit marker: %s", task.host, e)
+        return Result(host=task.host, result=False)
+    return Result(host=task.host, result=saved.get("device") == marker)
+
+
+def save_fingerprint(task: Task, state_base_path: str, fingerprint: str) -> None:
+    """
+    Save the intent *fingerprint* of a successful push with the commit marker of
+    the device after it, next to the state file of the host
+    """
+    fp_file = _fingerprint_file(task, state_base_path)
+    device = task.host.get_connection(CONNECTION_NAME, task.nornir.config)
+    try:
+        marker = commit_marker(device)
+    except Exception as e:  # the next push is not skipped
+        logger.info("%s: cannot read commit marker: %s", task.host, e)
+        fp_file.unlink(missing_ok=True)
+        return
+    fp_file.write_text(json.dumps({"intent": fingerprint, "device": marker}))
+
+
+def purge_resources(
+    task: Task,
+    device_intent: List[Dict[str, Any]],
+    state_base_path: str,
+    dry_run: Optional[bool] = None,
+) -> Result:
+    new_rsc, purged = intent_resources(task, device_intent, state_base_path)
+    state_file = Path(state_base_path) / f"{task.host.hostname}.json"
     if dry_run:
         changed = False
     else:
@@ -203,20 +354,39 @@ def purge_resources(
     return Result(host=task.host, result=purged, changed=changed)
 
 
-def render_template(task: Task, base_path: str, **kwargs: Any) -> Result:
-    p = Path(base_path) / "templates"
-    env = Environment(
-        loader=FileSystemLoader(str(p)),
-        undefined=StrictUndefined,
-        trim_blocks=True,
-        lstrip_blocks=True,
-    )
-    rendered = ""
-    for file in natsorted(t for t in p.glob("*.j2")):
-        tpl = env.get_template(str(file.parts[-1]))
-        txt = tpl.render(host=task.host, **kwargs)
-        if len(txt) > 0:
-            rendered += f"---\n{txt}"
+def render_template(
+    task: Task,
+    base_path: str,
+    render_processes: Optional[int] = None,
+    template_cache_dir: Optional[str] = None,
+    **kwargs: Any,
+) -> Result:
+    """
+    Render the templates in ``<base_path>/templates`` with the intent vars *kwargs*
+
+    Compiled templates are shared by all hosts, see :mod:`.templates`.
+
+    Args:
+        render_processes: render in a shared pool of this many worker processes,
+            for CPU-heavy templates. Templates get a :class:`TemplateHost` as
+            ``host`` then.
+        template_cache_dir: directory to cache compiled templates in between runs
+    """
+    p = str(Path(base_path) / "templates")
+    if render_processes:
+        rendered = (
+            render_pool(render_processes)
+            .submit(
+                render_templates,
+                p,
+                TemplateHost.from_host(task.host),
+                kwargs,
+                template_cache_dir,
+            )
+            .result()
+        )
+    else:
+        rendered = render_templates(p, task.host, kwargs, template_cache_dir)
 
     return Result(host=task.host, result=rendered)
 
@@ -228,40 +398,15 @@ def load_yaml(task: Task, doc: str) -> Any:
 
 
 def load_vars(task: Task, path: str, **kwargs: Any) -> Result:
+    """
+    Merge the intent documents in *path* that apply to the host into *kwargs*
+
+    Files are parsed and indexed once for all hosts, see :mod:`.intent`.
+    """
     intent = dict()
     intent.update(kwargs)
-
-    def _render(matchobj):
-        var = matchobj.group(2)
-
-        return str(task.host.get(matchobj.group(2)))
-
-    p = Path(path)
-    for file in natsorted([f for f in p.glob("**/*.y?ml")]):
-        with open(file, "r") as f:
-            y_str = f.read()
-        y_str = re.sub(r"(__(\S+))", _render, y_str)
-        for data in yaml.safe_load_all(y_str):
-            if not "metadata" in data:
-                continue
-            metadata = data.pop("metadata", {})
-            if "hostname" in metadata and task.host.hostname != metadata["hostname"]:
-                continue
-            if (
-                "groups" in metadata
-                and len([g for g in task.host.groups if str(g) in metadata["groups"]])
-                == 0
-            ):
-                continue
-            if "labels" in metadata and len(
-                {
-                    k: v
-                    for k, v in task.host.extended_data().items()
-                    if metadata["labels"].get(k) == v
-                }
-            ) < len(metadata["labels"]):
-                continue
-            _merge(intent, data)
+    for data in intent_index(path).documents(task.host):
+        _merge(intent, data)
 
     return Result(host=task.host, result=intent)
 
@@ -271,9 +416,17 @@ def set_config(
     device_config: List[Dict[str, Any]],
     dry_run: Optional[bool] = True,
     op: Optional[str] = None,
+    structured: Optional[bool] = False,
+    verify: Optional[bool] = False,
 ) -> Result:
     device = task.host.get_connection(CONNECTION_NAME, task.nornir.config)
-    r = device.set_config(input=device_config, op=op, dry_run=dry_run)
+    r = device.set_config(
+        input=device_config,
+        op=op,
+        dry_run=dry_run,
+        structured=structured,
+        verify=verify,
+    )
     if dry_run:
         changed = False
     else:
@@ -282,3 +435,29 @@ def set_config(
         else:
             changed = False
     return Result(host=task.host, result=r, changed=changed)
+
+
+def commit_config(
+    task: Task,
+    update: Optional[List[Dict[str, Any]]] = None,
+    replace: Optional[List[Dict[str, Any]]] = None,
+    delete: Optional[List[str]] = None,
+    dry_run: Optional[bool] = True,
+    structured: Optional[bool] = False,
+    verify: Optional[bool] = False,
+) -> Result:
+    """
+    Apply deletes, replaces and updates to the device in a single gNMI Set
+
+    See :meth:`SrLinux.commit_config`.
+    """
+    device = task.host.get_connection(CONNECTION_NAME, task.nornir.config)
+    r = device.commit_config(
+        update=update,
+        replace=replace,
+        delete=delete,
+        dry_run=dry_run,
+        structured=structured,
+        verify=verify,
+    )
+    return Result(host=task.host, result=r, changed=not dry_run and len(r) > 0)
@@ -0,0 +1,156 @@
+"""Jinja2 template rendering with compiled templates shared across hosts.
+
+One :class:`~jinja2.Environment` is kept per template directory for the lifetime of
+the process. Jinja2 caches compiled templates in the environment and recompiles a
+template when its file changes (``auto_reload``), so each template is compiled once
+per push instead of once per host. Compiled templates can also be cached on disk
+between runs with a bytecode cache directory.
+
+CPU-heavy templates can be rendered in a shared pool of worker processes, see
+:func:`render_pool`. Templates then get a :class:`TemplateHost` instead of the
+Nornir host, which only carries the host's name, hostname, platform, groups and
+(inherited) data.
+"""
+
+from __future__ import annotations
+
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    StrictUndefined,
+)
+from natsort import natsorted
+from nornir.core.inventory import Host
+
+_lock = threading.Lock()
+_environments: Dict[Tuple[str, Optional[str]], Environment] = {}
+_names: Dict[str, Tuple[int, List[str]]] = {}
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_size = 0
+
+
+def template_environment(
+    path: str, bytecode_cache_dir: Optional[str] = None
+) -> Environment:
+    """shared environment for the templates in directory *path*"""
+    key = (str(Path(path).resolve()), bytecode_cache_dir)
+    with _lock:
+        env = _environments.get(key)
+        if env is None:
+            env = _environments[key] = Environment(
+                loader=FileSystemLoader(key[0]),
+                undefined=StrictUndefined,
+                trim_blocks=True,
+                lstrip_blocks=True,
+                bytecode_cache=(
+                    FileSystemBytecodeCache(bytecode_cache_dir)
+                    if bytecode_cache_dir
+                    else None
+                ),
+            )
+        return env
+
+
+def template_names(path: str) -> List[str]:
+    """names of the ``*.j2`` templates in directory *path*, in natural sort order"""
+    p = Path(path)
+    mtime = p.stat().st_mtime_ns
+    with _lock:
+        cached = _names.get(str(p))
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+    names = natsorted(t.name for t in p.glob("*.j2"))
+    with _lock:
+        _names[str(p)] = (mtime, names)
+    return names
+
+
+def render_templates(
+    path: str,
+    host: Any,
+    variables: Dict[str, Any],
+    bytecode_cache_dir: Optional[str] = None,
+) -> str:
+    """
+    render all templates in directory *path* into one multi-document YAML string
+
+    Templates rendering to an empty string are left out.
+    """
+    env = template_environment(path, bytecode_cache_dir)
+    rendered = ""
+    for name in template_names(path):
+        txt = env.get_template(name).render(host=host, **variables)
+        if len(txt) > 0:
+            rendered += f"---\n{txt}"
+    return rendered
+
+
+class TemplateHost:
+    """Picklable view of a Nornir host for templates rendered in a worker process"""
+
+    def __init__(
+        self,
+        name: str,
+        hostname: Optional[str] = None,
+        platform: Optional[str] = None,
+        groups: Optional[List[str]] = None,
+        data: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.hostname = hostname
+        self.platform = platform
+        self.groups = groups or []
+        self.data = data or {}
+
+    @classmethod
+    def from_host(cls, host: Host) -> "TemplateHost":
+        return cls(
+            host.name,
+            host.hostname,
+            host.platform,
+            [g.name for g in host.groups],
+            host.extended_data(),
+        )
+
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data.get(key, default)
+
+    def __str__(self) -> str:
+        return self.name
+
+
+def render_pool(processes: int) -> ProcessPoolExecutor:
+    """
+    shared pool of *processes* worker processes to render templates in
+
+    Workers are spawned rather than forked, forking a process with open gRPC
+    channels is not supported by gRPC. The pool is replaced when another size is
+    asked for and shut down at exit.
+    """
+    global _pool, _pool_size
+    with _lock:
+        if _pool is None or _pool_size != processes:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(
+                max_workers=processes, mp_context=multiprocessing.get_context("spawn")
+            )
+            _pool_size = processes
+        return _pool
+
+
+@atexit.register
+def _shutdown_pool() -> None:
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
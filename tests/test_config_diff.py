@@ -0,0 +1,266 @@
+"""Unit tests for the structural config diff and the config push of the connection.
+
+These tests use small in-memory configs and a fake gNMI client so they run without
+a live device.
+"""
+
+from typing import Any, Dict, List
+
+import pytest
+
+from nornir_srl.connections.config_diff import (
+    Change,
+    OverlappingPaths,
+    UnknownListKey,
+    apply_set,
+    apply_transaction,
+    merge_config,
+    diff_config,
+    list_keys,
+    list_name,
+)
+from nornir_srl.connections.helpers import diff_cfg_list, diff_obj
+from nornir_srl.connections.srlinux import SrLinux
+
+
+class _Client:
+    """fake gNMI client recording the Set requests"""
+
+    def __init__(self) -> None:
+        self.sets: List[Dict[str, Any]] = []
+
+    def set(self, **kw: Any) -> None:
+        self.sets.append(kw)
+
+
+# --------------------------------------------------------------------------- #
+# diff_config
+# --------------------------------------------------------------------------- #
+
+
+def test_config_diff_matches_list_entries_by_key() -> None:
+    before = {
+        "interface": [
+            {"name": "ethernet-1/1", "admin-state": "enable", "mtu": 9000},
+            {"name": "ethernet-1/2", "admin-state": "enable"},
+        ],
+        "system": {"name": {"host-name": "leaf1"}},
+        "acl": {"entries": [1, 2]},
+    }
+    after = {
+        "interface": [  # reordered, entry changed, removed and added
+            {"name": "ethernet-1/3", "admin-state": "enable"},
+            {"name": "ethernet-1/1", "admin-state": "disable", "mtu": 9000},
+        ],
+        "system": {"name": {"host-name": "leaf1"}, "banner": {"motd": "hi"}},
+        "acl": {"entries": [2, 1]},
+    }
+    assert diff_config(before, after) == [
+        Change(
+            "modify", "/interface[name=ethernet-1/1]/admin-state", "enable", "disable"
+        ),
+        Change(
+            "delete",
+            "/interface[name=ethernet-1/2]",
+            {"name": "ethernet-1/2", "admin-state": "enable"},
+            None,
+        ),
+        Change(
+            "add",
+            "/interface[name=ethernet-1/3]",
+            None,
+            {"name": "ethernet-1/3", "admin-state": "enable"},
+        ),
+        Change("add", "/system/banner", None, {"motd": "hi"}),
+        Change("modify", "/acl/entries", [1, 2], [2, 1]),
+    ]
+    assert diff_obj(before, "a", before, "b") == (False, "")
+
+    # a Get returns paths without the leading "/" given in the Set input
+    running = [{"interface[name=ethernet-1/1]": {"admin-state": "enable"}}]
+    intent = [{"/interface[name=ethernet-1/1]": {"admin-state": "disable"}}]
+    assert diff_cfg_list(running, running) == ""
+    assert diff_cfg_list(running, intent) == (
+        "--- before\n+++ after\n"
+        "@@ /interface[name=ethernet-1/1]/admin-state @@\n"
+        '-"enable"\n+"disable"\n'
+    )
+
+    dev = SrLinux()
+    dev.get = lambda paths, datatype="config", strip_mod=True: running  # type: ignore
+    assert dev.set_config(intent, dry_run=True, structured=True) == [
+        {
+            "op": "modify",
+            "path": "/interface[name=ethernet-1/1]/admin-state",
+            "before": "enable",
+            "after": "disable",
+        }
+    ]
+
+
+def test_config_diff_addresses_entries_by_all_their_yang_keys() -> None:
+    p8 = {"ip-prefix": "10.0.0.0/8", "mask-length-range": "8..24"}
+    exact = {"ip-prefix": "10.0.0.0/8", "mask-length-range": "exact"}
+    assert diff_config(
+        {"prefix-set": [{"name": "p", "prefix": [p8, exact]}]},
+        {"prefix-set": [{"name": "p", "prefix": [p8]}]},
+    ) == [
+        Change(
+            "delete",
+            "/prefix-set[name=p]/prefix[ip-prefix=10.0.0.0/8][mask-length-range=exact]",
+            exact,
+            None,
+        )
+    ]
+
+    v4 = {"name": "f", "type": "ipv4", "description": "a"}
+    v6 = {"name": "f", "type": "ipv6", "description": "a"}
+    assert diff_config(
+        {"acl": {"acl-filter": [v4, v6]}},
+        {"acl": {"acl-filter": [v4, dict(v6, description="b")]}},
+    ) == [Change("modify", "/acl/acl-filter[name=f][type=ipv6]/description", "a", "b")]
+
+    # a single entry: every field is unique, the key still comes from the table
+    af = {"afi-safi-name": "evpn", "admin-state": "enable"}
+    assert diff_config(
+        {"afi-safi": [af]}, {"afi-safi": [dict(af, **{"admin-state": "disable"})]}
+    ) == [
+        Change(
+            "modify", "/afi-safi[afi-safi-name=evpn]/admin-state", "enable", "disable"
+        )
+    ]
+
+    # lists without known keys are compared as a whole, keys are never guessed
+    assert list_keys("/system/foo/bar", [{"id": 1, "x": 1}]) is None
+    assert diff_config(
+        {"foo": {"bar": [{"id": 1, "x": 1}]}}, {"foo": {"bar": [{"id": 1, "x": 2}]}}
+    ) == [Change("modify", "/foo/bar", [{"id": 1, "x": 1}], [{"id": 1, "x": 2}])]
+    assert list_name("/interface[name=ethernet-1/1]/subinterface") == "subinterface"
+    assert list_name("srl_nokia-interfaces:interface") == "interface"
+
+
+# --------------------------------------------------------------------------- #
+# set_config / commit_config
+# --------------------------------------------------------------------------- #
+
+
+def test_set_config_computes_after_state_without_read_back() -> None:
+    running = [
+        {
+            "interface[name=ethernet-1/1]": {
+                "admin-state": "enable",
+                "subinterface": [{"index": 0, "description": "a"}],
+            }
+        },
+        {},
+    ]
+    intent = [
+        {
+            "/interface[name=ethernet-1/1]": {
+                "subinterface": [{"index": 0, "description": "b"}, {"index": 1}]
+            },
+            "/system/banner": {"motd": "hi"},
+        }
+    ]
+    assert apply_set(running, intent, "update") == [
+        {
+            "/interface[name=ethernet-1/1]": {
+                "admin-state": "enable",
+                "subinterface": [{"index": 0, "description": "b"}, {"index": 1}],
+            }
+        },
+        {"/system/banner": {"motd": "hi"}},
+    ]
+    assert apply_set(running, intent, "delete") == [{}, {}]
+    assert running[0]["interface[name=ethernet-1/1]"]["subinterface"] == [
+        {"index": 0, "description": "a"}
+    ]
+
+    gets: List[List[str]] = []
+
+    def get(paths, datatype="config", strip_mod=True):
+        gets.append(paths)
+        return running
+
+    dev = SrLinux()
+    dev._connection = _Client()
+    dev.get = get  # type: ignore[method-assign]
+    changes = dev.set_config(intent, op="update", structured=True)
+    assert len(dev._connection.sets) == 1
+    assert gets == [["/interface[name=ethernet-1/1]", "/system/banner"]]  # no read-back
+    assert [(c["op"], c["path"]) for c in changes] == [
+        ("modify", "/interface[name=ethernet-1/1]/subinterface[index=0]/description"),
+        ("add", "/interface[name=ethernet-1/1]/subinterface[index=1]"),
+        ("add", "/system/banner"),
+    ]
+    dev.set_config(intent, op="update", verify=True)
+    assert len(gets) == 3
+
+
+def test_commit_config_reads_back_lists_with_unknown_keys() -> None:
+    filters = [{"name": "a", "type": "ipv4"}, {"name": "a", "type": "ipv6"}]
+    new = [{"name": "b", "type": "ipv4"}]
+    assert merge_config(filters, new, "/acl/acl-filter") == filters + new
+    with pytest.raises(UnknownListKey):
+        merge_config(filters, new, "/system/foo", strict=True)
+    before = [{"system/foo": {"bar": filters}}]
+    update = [{"/system/foo": {"bar": new}}]
+    assert apply_transaction(before, ["/system/foo"], update=update) == [
+        {"/system/foo": {"bar": filters + new}}
+    ]
+
+    gets: List[List[str]] = []
+    read_back = [{"system/foo": {"bar": [new[0], filters[1]]}}]
+
+    def get(paths, datatype="config", strip_mod=True):
+        gets.append(paths)
+        return before if len(gets) == 1 else read_back
+
+    dev = SrLinux()
+    dev._connection = _Client()
+    dev.get = get  # type: ignore[method-assign]
+    changes = dev.commit_config(update=update, structured=True)
+    assert len(gets) == 2  # the after-state is read back, not guessed
+    assert changes == [
+        {
+            "op": "modify",
+            "path": "/system/foo/bar",
+            "before": filters,
+            "after": [new[0], filters[1]],
+        }
+    ]
+
+
+def test_commit_config_reads_back_nested_paths() -> None:
+    itf = "/interface[name=ethernet-1/1]"
+    sub = f"{itf}/subinterface[index=0]"
+    before = [
+        {itf[1:]: {"admin-state": "enable", "subinterface": [{"index": 0}]}},
+        {sub[1:]: {"index": 0}},
+    ]
+    update = [{itf: {"description": "uplink"}}]
+    with pytest.raises(OverlappingPaths):
+        apply_transaction(before, [itf, sub], [sub], update=update, strict=True)
+    with pytest.raises(OverlappingPaths):  # a list without keys covers its entries
+        apply_transaction(before, ["/interface", sub], [sub], strict=True)
+    assert apply_transaction(before, [itf, "/system/name"], strict=True)
+
+    gets: List[List[str]] = []
+    read_back = [
+        {itf[1:]: {"admin-state": "enable", "description": "uplink"}},
+        {},
+    ]
+
+    def get(paths, datatype="config", strip_mod=True):
+        gets.append(paths)
+        return before if len(gets) == 1 else read_back
+
+    dev = SrLinux()
+    dev._connection = _Client()
+    dev.get = get  # type: ignore[method-assign]
+    changes = dev.commit_config(update=update, delete=[sub], structured=True)
+    assert gets == [[sub, itf]] * 2
+    assert {(c["op"], c["path"]) for c in changes} == {
+        ("add", f"{itf}/description"),
+        ("delete", sub),
+    }
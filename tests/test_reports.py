@@ -4,10 +4,14 @@ These tests use small in-memory fixtures and a fake gNMI ``get`` so they run
 without a live device.
 """
 
+import json
+import time
 from typing import Any, Dict, List, Optional
 
-from nornir_srl.connections.helpers import clean_structured_key
+from nornir_srl.connections.helpers import GetSpec, clean_structured_key
 from nornir_srl.connections.routing import RoutingMixin
+from nornir_srl.connections.profile import DeviceProfile
+from nornir_srl.connections.srlinux import SrLinux
 
 # --------------------------------------------------------------------------- #
 # clean_structured_key
@@ -63,6 +67,20 @@ class _FakeRouting(RoutingMixin):
                 return resp
         raise KeyError(f"no scripted response for path {path}")
 
+    def get_batch(
+        self,
+        specs: List[GetSpec],
+        strip_mod: Optional[bool] = True,
+    ) -> Dict[GetSpec, List[Dict[str, Any]]]:
+        return {
+            (path, datatype): self.get([path], datatype, strip_mod)
+            for path, datatype in specs
+        }
+
+    @property
+    def profile(self) -> DeviceProfile:
+        return DeviceProfile.from_capabilities(self.capabilities)
+
 
 # --------------------------------------------------------------------------- #
 # get_bgp_rib path attributes (detail=True)
@@ -285,6 +303,67 @@ def test_get_bgp_rib_l3vpn_ipv4_alias_and_columns():
     assert route["0_st"] == "u*>"
 
 
+def test_get_bgp_rib_pushes_prefix_and_neighbor_into_path_keys():
+    """Filtered RIB Gets carry list keys and fetch only the referenced attr-sets."""
+
+    def _rib(routes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        afi = {
+            "afi-safi-name": "ipv4-unicast",
+            "ipv4-unicast": {"local-rib": {"route": routes}},
+        }
+        return [
+            {"network-instance": [{"name": "default", "bgp-rib": {"afi-safi": [afi]}}]}
+        ]
+
+    route = {
+        "attr-id": 7,
+        "used-route": True,
+        "valid-route": True,
+        "best-route": True,
+        "prefix": "10.0.0.0/24",
+        "neighbor": "192.0.2.1",
+    }
+    attr_set = [
+        {
+            "network-instance": [
+                {
+                    "name": "default",
+                    "bgp-rib": {
+                        "attr-sets": {
+                            "attr-set": [{"index": 7, "local-pref": 200, "med": 5}]
+                        }
+                    },
+                }
+            ]
+        }
+    ]
+    dev = _FakeRouting(
+        {"attr-set[index=7]": attr_set, "local-rib/route": _rib([route])}
+    )
+    requested: List[str] = []
+    get = dev.get
+
+    def _recording_get(paths: List[str], *args: Any, **kwargs: Any) -> Any:
+        requested.extend(paths)
+        return get(paths, *args, **kwargs)
+
+    dev.get = _recording_get  # type: ignore[method-assign]
+    out = dev.get_bgp_rib(route_fam="ipv4", prefix="10.0.0.0/24", neighbor="192.0.2.1")
+    assert requested == [
+        "/network-instance[name=*]/bgp-rib/afi-safi[afi-safi-name=ipv4-unicast]/"
+        "ipv4-unicast/local-rib/route[neighbor=192.0.2.1][prefix=10.0.0.0/24]",
+        "/network-instance[name=default]/bgp-rib/attr-sets/attr-set[index=7]",
+    ]
+    row = out["bgp_rib"][0]["Rib"][0]
+    assert row["Prefix"] == "10.0.0.0/24" and row["lpref"] == 200
+
+    # no matching route: no attr-set Get at all
+    dev = _FakeRouting({"local-rib/route": _rib([])})
+    assert dev.get_bgp_rib(route_fam="ipv4", neighbor="192.0.2.9") == {
+        "bgp_rib": [{"NI": "default", "Rib": []}]
+    }
+
+
 def test_get_bgp_rib_l3vpn_returns_empty_when_rib_path_absent():
     """Nodes without an L3VPN RIB path (e.g. EVPN-only leaves) return an empty RIB."""
 
@@ -478,3 +557,931 @@ def test_get_tunnel_table_resolves_egress_and_label():
     assert row["next-hop"] == ["10.255.0.1"]
     assert row["egress-itf"] == ["ethernet-1/5.0"]
     assert row["label"] == ["20000"]
+
+    # the next-hop index is reused by later reports until it expires
+    fetched: List[str] = []
+    get_batch = dev.get_batch
+
+    def _recording_get_batch(specs, strip_mod=True):
+        fetched.extend(path for path, _ in specs)
+        return get_batch(specs, strip_mod)
+
+    dev.get_batch = _recording_get_batch  # type: ignore[method-assign]
+    assert dev.get_tunnel_table()["tunnel_table"] == rows
+    assert fetched == ["/network-instance[name=*]/tunnel-table"]
+    dev.nh_index_ttl = 0
+    dev.__dict__.pop("_nh_index_cache")
+    dev.get_tunnel_table()
+    assert len(fetched) == 4
+
+
+def test_cached_nexthop_index_is_rebuilt_for_unknown_groups():
+    def ni(table: str, key: str, entries: Any) -> List[Any]:
+        return [{"network-instance": [{"name": "default", table: {key: entries}}]}]
+
+    next_hops = ni("route-table", "next-hop", [{"index": "10", "ip-address": "a"}])
+    groups = ni(
+        "route-table",
+        "next-hop-group",
+        [{"index": "77", "next-hop": [{"next-hop": "10"}]}],
+    )
+    tunnels = [{"ipv4-prefix": "192.0.2.1/32", "next-hop-group": "77"}]
+    dev = _FakeRouting(
+        {
+            "next-hop-group[index=*]": groups,
+            "next-hop[index=*]": next_hops,
+            "tunnel-table": ni("tunnel-table", "ipv4", {"tunnel": tunnels}),
+        }
+    )
+    assert dev.get_tunnel_table()["tunnel_table"][0]["next-hop"] == ["a"]
+
+    # a tunnel moves to a group created after the index was cached
+    next_hops[0]["network-instance"][0]["route-table"]["next-hop"].append(
+        {"index": "11", "ip-address": "b"}
+    )
+    groups[0]["network-instance"][0]["route-table"]["next-hop-group"].append(
+        {"index": "78", "next-hop": [{"next-hop": "11"}]}
+    )
+    tunnels[0]["next-hop-group"] = "78"
+    assert dev.get_tunnel_table()["tunnel_table"][0]["next-hop"] == ["b"]
+    assert dev.get_tunnel_table()["tunnel_table"][0]["next-hop"] == ["b"]
+
+
+# --------------------------------------------------------------------------- #
+# SrLinux.get_batch grouping and demultiplexing
+# --------------------------------------------------------------------------- #
+
+
+class _FakeGnmiClient:
+    """Records Get requests and answers with one notification per path."""
+
+    def __init__(self) -> None:
+        self.requests: List[Dict[str, Any]] = []
+
+    def get(self, path: List[str], datatype: str, encoding: str) -> Dict[str, Any]:
+        self.requests.append({"path": list(path), "datatype": datatype})
+        return {
+            "notification": [
+                {"update": [{"path": p.strip("/"), "val": {"datatype": datatype}}]}
+                for p in path
+            ]
+        }
+
+
+def test_get_batch_groups_specs_per_datatype():
+    dev = SrLinux()
+    dev._connection = _FakeGnmiClient()
+    specs: List[GetSpec] = [
+        ("/a", "state"),
+        ("/b", "config"),
+        ("/c", "state"),
+        ("/a", "state"),
+    ]
+    out = dev.get_batch(specs)
+    assert dev._connection.requests == [
+        {"path": ["/a", "/c"], "datatype": "state"},
+        {"path": ["/b"], "datatype": "config"},
+    ]
+    assert out[("/a", "state")] == [{"a": {"datatype": "state"}}]
+    assert out[("/b", "config")] == [{"b": {"datatype": "config"}}]
+    assert out[("/c", "state")] == [{"c": {"datatype": "state"}}]
+
+
+def test_device_profile_from_responses() -> None:
+    caps = {
+        "supported_models": [
+            {"name": "urn:nokia.com:srlinux:bgp:rib-bgp", "version": "2023-03-31"},
+            {
+                "name": "urn:nokia.com:srlinux:bgp:bgp:srl_nokia-bgp",
+                "version": "2024-07-31",
+            },
+        ]
+    }
+    profile = DeviceProfile.from_responses(
+        caps,
+        {"system/features": ["bridged", "evpn"]},
+        {"system/information/version": "v24.10.1-492-gf8858c5836"},
+    )
+    assert profile.has_feature("evpn")
+    assert not profile.has_feature("mpls")
+    assert profile.software_version == "24.10.1"
+    assert profile.evpn_path_version == 1
+    assert profile.ip_path_version == 2
+    assert profile.bgp_path_version == 2
+
+
+def test_srlinux_profile_is_cached_until_invalidated() -> None:
+    conn = SrLinux()
+    conn.capabilities = {"supported_models": []}
+    calls: List[List[GetSpec]] = []
+
+    def get_batch(specs, strip_mod=True):
+        calls.append(specs)
+        return {
+            ("/system/features", "state"): [{"system/features": ["evpn"]}],
+            ("/system/information/version", "state"): [
+                {"system/information/version": "v25.3.1-1"}
+            ],
+        }
+
+    conn.get_batch = get_batch  # type: ignore[method-assign]
+    assert conn.profile.has_feature("evpn")
+    assert conn.profile.software_version == "25.3.1"
+    assert len(calls) == 1
+    conn.invalidate_profile()
+    assert conn.profile.has_feature("evpn")
+    assert len(calls) == 2
+
+
+def test_ifstats_stream_rates_from_samples() -> None:
+    from nornir_srl.connections.ifstats import IfStatsStream
+
+    class _Sub:
+        def get_update(self, timeout):
+            time.sleep(timeout)
+            raise TimeoutError
+
+        def close(self):
+            pass
+
+    ifstream = IfStatsStream(_Sub(), interval=1)
+    itf = "interface[name=ethernet-1/1]/statistics"
+    ifstream.process(
+        {
+            "update": {
+                "timestamp": 1_000_000_000,
+                "update": [
+                    {"path": f"srl_nokia-interfaces:{itf}/in-octets", "val": "1000"},
+                    {"path": f"{itf}/out-octets", "val": "0"},
+                ],
+            },
+            "sync_response": True,
+        }
+    )
+    assert ifstream.rows() == []
+    ifstream.process(
+        {
+            "update": {
+                "timestamp": 3_000_000_000,
+                "prefix": itf,
+                "update": [{"path": "in-octets", "val": "251000"}],
+            }
+        }
+    )
+    assert ifstream.wait_ready(timeout=0)
+    [row] = ifstream.rows()
+    assert row["interface"] == "ethernet-1/1"
+    assert row["in-Kbps"] == 1000.0
+    assert row["out-Kbps"] == 0.0
+    assert row["in-octets"] == 251000
+    ifstream.close()
+
+
+def test_asyncio_runner_replays_getters_over_async_gets(monkeypatch) -> None:
+    from nornir.core import Nornir
+    from nornir.core.inventory import Host, Hosts, Inventory
+    from nornir.core.task import Result, Task
+
+    from nornir_srl.connections import aio
+
+    fetched: List[List[GetSpec]] = []
+    opened: List[str] = []
+
+    class _FakeAsyncSrLinux:
+        hostname = "leaf1"
+        capabilities: Dict[str, Any] = {"supported_models": []}
+        profile = DeviceProfile()
+
+        async def open(self, **kwargs):
+            opened.append(kwargs["hostname"])
+
+        async def get_batch(self, specs, strip_mod=True):
+            fetched.append(specs)
+            if ("/bad", "state") in specs:
+                raise RuntimeError("path not valid")
+            return {spec: [{spec[0].strip("/"): spec[1]}] for spec in specs}
+
+        async def close(self):
+            pass
+
+    monkeypatch.setattr(aio, "AsyncSrLinux", _FakeAsyncSrLinux)
+
+    def _task(task: Task, path: str) -> Result:
+        device = task.host.get_connection("srlinux", task.nornir.config)
+        first = device.get(paths=["/a"], datatype="state")
+        batch = device.get_batch([(path, "state"), ("/c", "config")])
+        # depends on the response to the first Get
+        second = device.get(paths=[f"/{k}2" for k in first[0]], datatype="state")
+        return Result(
+            host=task.host,
+            result=first + [r for v in batch.values() for r in v] + second,
+        )
+
+    host = Host("leaf1", hostname="leaf1")
+    runner = aio.AsyncioRunner()
+    nr = Nornir(inventory=Inventory(hosts=Hosts({"leaf1": host})), runner=runner)
+    result = nr.run(task=_task, path="/b")
+    assert result["leaf1"][0].result == [
+        {"a": "state"},
+        {"b": "state"},
+        {"c": "config"},
+        {"a2": "state"},
+    ]
+    # independent Gets are collected in one run of the task
+    assert fetched == [
+        [("/a", "state"), ("/b", "state"), ("/c", "config")],
+        [("/a2", "state")],
+    ]
+    assert "srlinux" not in host.connections
+
+    fetched.clear()
+    result = nr.run(task=_task, path="/bad")
+    assert result["leaf1"].failed
+    assert "path not valid" in str(result["leaf1"][0].exception)
+    assert opened == ["leaf1"]  # the connection is reused by later runs
+    runner.close()
+
+
+def test_prefix_index_longest_match_v4_v6() -> None:
+    from nornir_srl.connections.helpers import lpm
+    from nornir_srl.connections.prefix_index import PrefixIndex
+
+    index = PrefixIndex.from_prefixes(
+        ["0.0.0.0/0", "10.0.0.0/8", "10.1.0.0/16", "10.1.1.0/24", "2001:db8::/32"]
+    )
+    assert len(index) == 5
+    assert index.lookup_many(["10.1.1.7", "10.1.2.7", "10.2.0.1", "192.0.2.1"]) == {
+        "10.1.1.7": "10.1.1.0/24",
+        "10.1.2.7": "10.1.0.0/16",
+        "10.2.0.1": "10.0.0.0/8",
+        "192.0.2.1": "0.0.0.0/0",
+    }
+    assert index.lookup("2001:db8::1") == "2001:db8::/32"
+    assert index.lookup("2001:db9::1") is None
+    assert lpm("10.1.1.1", ["10.0.0.0/8", "10.1.0.0/16"]) == "10.1.0.0/16"
+    assert lpm("11.0.0.1", ["10.0.0.0/8"]) == ""
+    assert lpm("2001:db8::1", ["2001:DB8::/32"]) == "2001:db8::/32"
+    assert lpm("10.1.1.1", ["10.1.1.1"]) == "10.1.1.1/32"
+    try:
+        lpm("10.1.1.1", ["10.1.1.0/24", "10.1.1.5/24"])
+        assert False, "host bits set"
+    except ValueError:
+        pass
+    first = PrefixIndex.from_prefixes([("10.1.1.0/24", "a"), ("10.1.1.5/24", "b")])
+    assert first.lookup("10.1.1.1") == "a" and len(first) == 1
+
+
+def test_get_rib_lpm_multiple_addresses() -> None:
+    def _route(prefix: str, nhg: int) -> Dict[str, Any]:
+        return {
+            "ipv4-prefix": prefix,
+            "route-type": "bgp",
+            "active": True,
+            "next-hop-group": nhg,
+            "metric": 0,
+            "preference": 170,
+        }
+
+    dev = _FakeRouting(
+        {
+            "next-hop-group": [
+                {
+                    "network-instance": [
+                        {
+                            "name": "default",
+                            "route-table": {
+                                "next-hop-group": [
+                                    {"index": 1, "next-hop": [{"next-hop": 11}]}
+                                ]
+                            },
+                        }
+                    ]
+                }
+            ],
+            "next-hop[": [
+                {
+                    "network-instance": [
+                        {
+                            "name": "default",
+                            "route-table": {
+                                "next-hop": [
+                                    {
+                                        "index": 11,
+                                        "ip-address": "192.168.0.1",
+                                        "type": "direct",
+                                        "subinterface": "ethernet-1/1.0",
+                                    }
+                                ]
+                            },
+                        }
+                    ]
+                }
+            ],
+            "route-table/ipv4-unicast": [
+                {
+                    "network-instance": [
+                        {
+                            "name": "default",
+                            "route-table": {
+                                "ipv4-unicast": {
+                                    "route": [
+                                        _route("10.0.0.0/8", 1),
+                                        _route("10.1.0.0/16", 1),
+                                        _route("10.2.0.0/16", 1),
+                                    ]
+                                }
+                            },
+                        }
+                    ]
+                }
+            ],
+        }
+    )
+    res = dev.get_rib("ipv4-unicast", lpm_address="10.1.2.3, 10.3.0.1")
+    [ni] = res["ip_rib"]
+    assert [r["Prefix"] for r in ni["Rib"]] == ["10.1.0.0/16", "10.0.0.0/8"]
+    assert ni["Rib"][0]["next-hop"] == ["192.168.0.1"]
+    assert ni["Rib"][0]["itf"] == ["ethernet-1/1.0"]
+
+
+def test_expression_registry_compiles_once_per_key() -> None:
+    from nornir_srl.connections.expressions import ExpressionRegistry
+
+    registry = ExpressionRegistry()
+    first = registry.get(("report", "2", 1, False), "a[].b")
+    assert registry.get(("report", "2", 1, False), "a[].b") is first
+    # keyed by the key, not by the text: the text is not even parsed again
+    assert registry.get(("report", "2", 1, False), "not ( valid") is first
+    assert registry.search(("report", "2", 1, False), "a[].b", {"a": [{"b": 1}]}) == [1]
+    assert len(registry) == 1
+
+
+# --------------------------------------------------------------------------- #
+# strip_modules
+# --------------------------------------------------------------------------- #
+
+
+def test_strip_modules_in_place_and_untouched_without_prefixes() -> None:
+    from nornir_srl.connections.helpers import has_modules, strip_modules
+
+    resp = {
+        "srl_nokia-interfaces:interface": [
+            {
+                "name": "ethernet-1/1",
+                "srl_nokia-if-ip:ipv4": {"admin-state": "enable"},
+                "type": "srl_nokia-interfaces:ethernet",
+                "tags": ["srl_nokia-a:x", "srl_nokia-b:y/srl_nokia-c:z", "plain"],
+            }
+        ],
+        "description": "see srl_nokia-interfaces:interface",
+    }
+    itf = resp["srl_nokia-interfaces:interface"][0]
+    assert has_modules(resp)
+    assert strip_modules(resp) is resp
+    assert resp == {
+        "interface": [
+            {
+                "name": "ethernet-1/1",
+                "ipv4": {"admin-state": "enable"},
+                "type": "ethernet",
+                "tags": ["x", "y/z", "plain"],
+            }
+        ],
+        "description": "see srl_nokia-interfaces:interface",
+    }
+    assert resp["interface"][0] is itf
+    assert list(itf) == ["name", "ipv4", "type", "tags"]
+    assert not has_modules(resp)
+
+    clean = {"interface": [{"name": "ethernet-1/1", "mtu": 9232}]}
+    snapshot = json.loads(json.dumps(clean))
+    assert strip_modules(clean) is clean and clean == snapshot
+    assert strip_modules("srl_nokia-common:up") == "up"
+    assert strip_modules(5) == 5
+
+
+# --------------------------------------------------------------------------- #
+# streaming MAC table
+# --------------------------------------------------------------------------- #
+
+
+def _mac_stream() -> List[Any]:
+    from pygnmi.spec.v080.gnmi_pb2 import (
+        Notification,
+        Path,
+        PathElem,
+        SubscribeResponse,
+        TypedValue,
+        Update,
+    )
+
+    def _path(address: str, *leafs: str) -> Path:
+        return Path(
+            elem=[
+                PathElem(name="bridge-table"),
+                PathElem(name="mac-table"),
+                PathElem(name="mac", key={"address": address}),
+            ]
+            + [PathElem(name=leaf) for leaf in leafs]
+        )
+
+    prefix = Path(
+        elem=[
+            PathElem(
+                name="srl_nokia-network-instance:network-instance",
+                key={"name": "mac-vrf1"},
+            )
+        ]
+    )
+    entry = {"destination": "ethernet-1/1.0", "type": "srl_nokia-bridge:learnt"}
+    return [
+        SubscribeResponse(
+            update=Notification(
+                prefix=prefix,
+                update=[
+                    Update(
+                        path=_path("1A:00:00:00:00:01"),
+                        val=TypedValue(json_ietf_val=json.dumps(entry).encode()),
+                    )
+                ],
+            )
+        ),
+        SubscribeResponse(
+            update=Notification(
+                prefix=prefix,
+                update=[
+                    Update(
+                        path=_path("1A:00:00:00:00:02", "destination"),
+                        val=TypedValue(json_ietf_val=b'"vxlan-interface:vxlan1.1"'),
+                    ),
+                    Update(
+                        path=_path("1A:00:00:00:00:02", "type"),
+                        val=TypedValue(json_ietf_val=b'"evpn"'),
+                    ),
+                ],
+            )
+        ),
+        SubscribeResponse(sync_response=True),
+        SubscribeResponse(
+            update=Notification(
+                update=[Update(path=_path("never"), val=TypedValue(string_val="x"))]
+            )
+        ),
+    ]
+
+
+def test_iter_gnmi_updates_stops_at_sync_and_strips_modules() -> None:
+    from nornir_srl.connections.streaming import iter_gnmi_updates
+
+    updates = list(iter_gnmi_updates(iter(_mac_stream())))
+    assert len(updates) == 3
+    elems, val = updates[0]
+    assert elems[0] == ("network-instance", {"name": "mac-vrf1"})
+    assert elems[-1] == ("mac", {"address": "1A:00:00:00:00:01"})
+    assert val == {"destination": "ethernet-1/1.0", "type": "learnt"}
+    assert updates[2][0][-1] == ("type", {})
+
+
+def test_iter_mac_table_rows_from_entry_and_leaf_updates() -> None:
+    from nornir_srl.connections.layer2 import Layer2Mixin
+    from nornir_srl.connections.streaming import iter_gnmi_updates
+
+    class _Dev(Layer2Mixin):
+        def iter_get(self, paths, strip_mod=True):
+            return iter_gnmi_updates(iter(_mac_stream()))
+
+        @property
+        def profile(self) -> DeviceProfile:
+            return DeviceProfile(features=["bridged"])
+
+    assert list(_Dev().iter_mac_table()) == [
+        {
+            "NI": "mac-vrf1",
+            "Address": "1A:00:00:00:00:01",
+            "Dest": "ethernet-1/1.0",
+            "Type": "learnt",
+        },
+        {
+            "NI": "mac-vrf1",
+            "Address": "1A:00:00:00:00:02",
+            "Dest": "vxlan-interface:vxlan1.1",
+            "Type": "evpn",
+        },
+    ]
+
+
+def test_write_rows_matches_print_structured(capsys) -> None:
+    from nornir_srl.cli import OutputFormat, print_structured, write_rows
+
+    rows = [
+        {"Node": "leaf1", "NI": "mac-vrf1", "Address": "1A:00:00:00:00:01"},
+        {"Node": "leaf2", "NI": "mac-vrf1", "Address": "1A:00:00:00:00:02"},
+    ]
+    for fmt in (OutputFormat.JSON, OutputFormat.YAML):
+        print_structured(["NI", "Address"], rows, fmt)
+        expected = capsys.readouterr().out
+        assert write_rows(["NI", "Address"], iter(rows), fmt) == 2
+        assert capsys.readouterr().out == expected
+
+
+def test_watch_report_emits_only_changed_rows(monkeypatch, capsys) -> None:
+    from types import SimpleNamespace
+
+    from nornir.core.inventory import Host
+    from nornir.core.task import AggregatedResult, MultiResult, Result
+
+    from nornir_srl import cli
+
+    assert cli.row_deltas(
+        [{"Node": "l1", "peer": "a", "state": "up"}, {"Node": "l1", "peer": "b"}],
+        [{"Node": "l1", "peer": "a", "state": "down"}, {"Node": "l1", "peer": "b"}],
+    ) == ([True, False], [{"Node": "l1", "peer": "a", "state": "up"}])
+
+    snapshots = [
+        [{"peer": "a", "state": "up"}, {"peer": "b", "state": "up"}],
+        [{"peer": "a", "state": "up"}, {"peer": "b", "state": "up"}],
+        [{"peer": "a", "state": "up"}, {"peer": "b", "state": "idle"}],
+    ]
+    host = Host(name="leaf1", hostname="leaf1")
+
+    class _Target:
+        closed = False
+
+        def run(self, task, name, raise_on_error):
+            agg = AggregatedResult(name)
+            agg["leaf1"] = MultiResult(name)
+            agg["leaf1"].append(Result(host=host, result={name: snapshots.pop(0)}))
+            return agg
+
+        def close_connections(self):
+            self.closed = True
+
+    def _sleep(seconds: float) -> None:
+        if not snapshots:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(cli.time, "sleep", _sleep)
+    ctx: Any = SimpleNamespace(
+        obj={"watch": 1.0, "output": cli.OutputFormat.JSON, "box_type": None}
+    )
+    target = _Target()
+    cli.watch_report(ctx, target, "bgp_peers", lambda t: None, {}, "BGP Peers")  # type: ignore[arg-type]
+    out = capsys.readouterr().out
+    decoder = json.JSONDecoder()
+    first, end = decoder.raw_decode(out)
+    delta, _ = decoder.raw_decode(out, end + 1)
+    assert len(first) == 2 and "_change" not in first[0]
+    assert delta == [
+        {"Node": "leaf1", "peer": "b", "state": "idle", "_change": "+"},
+        {"Node": "leaf1", "peer": "b", "state": "up", "_change": "-"},
+    ]
+    assert target.closed
+
+
+# --------------------------------------------------------------------------- #
+# session pool
+# --------------------------------------------------------------------------- #
+
+
+def test_session_pool_replaces_dead_and_evicts_idle_sessions(monkeypatch) -> None:
+    from types import SimpleNamespace
+
+    from nornir.core.inventory import Host
+
+    from nornir_srl.connections import pool as pool_mod
+
+    class _Conn:
+        def __init__(self, alive: bool = True):
+            self.alive = alive
+            self.closed = False
+
+        def open(self, **kwargs: Any) -> None:
+            pass
+
+        def is_alive(self, timeout: float) -> bool:
+            return self.alive
+
+        def close(self) -> None:
+            self.closed = True
+
+    monkeypatch.setattr(pool_mod, "SrLinux", _Conn)
+    hosts = {n: Host(name=n, hostname=n) for n in ("leaf1", "leaf2")}
+    fabric: Any = SimpleNamespace(inventory=SimpleNamespace(hosts=hosts), config=None)
+    dead = _Conn(alive=False)
+    hosts["leaf1"].connections["srlinux"] = dead  # type: ignore
+    hosts["leaf2"].connections["srlinux"] = _Conn()  # type: ignore
+
+    pool = pool_mod.SessionPool(probe_interval=0, idle_timeout=60)
+    with pool.session(fabric):
+        pool.maintain()  # in use: left alone
+        assert hosts["leaf1"].connections["srlinux"] is dead
+    pool.maintain()
+    new = hosts["leaf1"].connections["srlinux"]
+    assert new is not dead and dead.closed and not new.closed  # type: ignore
+    assert all(s["alive"] for s in pool.status())
+
+    # evicted sessions are closed in the background, after a new run may have
+    # started: the run must keep the connection it opens
+    closes: List[Any] = []
+    monkeypatch.setattr(pool._executor, "submit", lambda *a: closes.append(a))
+    pool.idle_timeout = 0
+    time.sleep(0.01)
+    pool.maintain()
+    assert pool.status() == [] and "srlinux" not in hosts["leaf1"].connections
+    with pool.session(fabric):
+        opened = hosts["leaf1"].connections["srlinux"] = _Conn()  # type: ignore
+        for fn, *args in closes:
+            fn(*args)
+        assert new.closed and not opened.closed  # type: ignore
+        assert hosts["leaf1"].connections["srlinux"] is opened
+    pool._executor.shutdown(wait=True)
+
+
+# --------------------------------------------------------------------------- #
+# MCP result cache
+# --------------------------------------------------------------------------- #
+
+
+def test_result_cache_ttl_lru_and_coalescing() -> None:
+    import threading
+
+    from nornir.core import Nornir
+    from nornir.core.inventory import Host, Hosts, Inventory
+    from nornir.core.task import AggregatedResult, MultiResult, Result
+
+    from nornir_srl.mcp_server import ResultCache
+
+    hosts = Hosts({n: Host(name=n) for n in ("leaf1", "leaf2", "spine1")})
+    fabric = Nornir(inventory=Inventory(hosts=hosts))
+    queried: List[List[str]] = []
+    release = threading.Event()
+
+    def execute(target: Nornir) -> AggregatedResult:
+        names = sorted(target.inventory.hosts)
+        queried.append(names)
+        release.wait(timeout=5)
+        agg = AggregatedResult("bgp_peers")
+        for n in names:
+            agg[n] = MultiResult("bgp_peers")
+            agg[n].append(
+                Result(host=hosts[n], result={"n": len(queried)}, failed=n == "spine1")
+            )
+        return agg
+
+    cache = ResultCache(default_ttl=60, ttls={}, max_entries=2)
+    results: List[AggregatedResult] = []
+    callers = [
+        threading.Thread(
+            target=lambda: results.append(cache.run("bgp_peers", (), fabric, execute))
+        )
+        for _ in range(2)
+    ]
+    for t in callers:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in callers:
+        t.join()
+    # the second call waited for the first one instead of querying again
+    assert queried == [["leaf1", "leaf2", "spine1"]]
+    assert results[0]["leaf1"] is results[1]["leaf1"]
+    assert cache.status()["in_flight"] == 0
+
+    # spine1 failed and is not cached, max_entries keeps the two leaves
+    again = cache.run("bgp_peers", (), fabric, execute)
+    assert queried[-1] == ["spine1"] and again["leaf2"] is results[0]["leaf2"]
+    assert cache.status()["entries"] == 2
+
+    cache.run("bgp_peers", ("other-args",), fabric.filter(name="leaf1"), execute)
+    assert queried[-1] == ["leaf1"]
+    assert cache.invalidate("bgp_peers", ["leaf1"]) == 1
+    cache.ttls["bgp_peers"] = 0.0
+    assert cache.ttl("bgp_peers") == 0.0 and cache.ttl("mac_table") == 60
+
+
+def test_mcp_tables_are_paged_projected_and_compact(monkeypatch) -> None:
+    import pytest
+
+    from nornir_srl import mcp_server
+
+    rows = [
+        {"Node": "leaf1", "NI": "mac-vrf1", "Address": f"00:00:00:00:00:{i:02x}"}
+        for i in range(5)
+    ]
+    monkeypatch.setattr(mcp_server, "_run_report", lambda *a, **kw: rows)
+
+    raw = mcp_server.mac_table(columns="address", limit=2)
+    assert ", " not in raw and ": " not in raw  # compact separators
+    first = json.loads(raw)
+    assert first["total"] == 5 and first["offset"] == 0
+    assert first["rows"] == [
+        {"Node": "leaf1", "Address": "00:00:00:00:00:00"},
+        {"Node": "leaf1", "Address": "00:00:00:00:00:01"},
+    ]
+    second = json.loads(mcp_server.mac_table(cursor=first["next_cursor"]))
+    assert second["offset"] == 2 and len(second["rows"]) == 2
+    last = json.loads(mcp_server.mac_table(cursor=second["next_cursor"]))
+    assert [r["Address"][-2:] for r in last["rows"]] == ["04"]
+    assert last["next_cursor"] is None
+    assert json.loads(mcp_server.mac_table())["next_cursor"] is None
+
+    mcp_server._pages.clear()
+    with pytest.raises(ValueError, match="expired"):
+        mcp_server.mac_table(cursor=first["next_cursor"])
+
+
+# --------------------------------------------------------------------------- #
+# counter rate engine
+# --------------------------------------------------------------------------- #
+
+
+def test_rate_engine_wrap_reset_and_windows() -> None:
+    import random
+
+    import pytest
+
+    from nornir_srl.connections.rates import COUNTER_MAX, RateEngine, counter_delta
+
+    assert counter_delta(COUNTER_MAX - 10, 5) == 15  # wrap
+    assert counter_delta(1000, 40) == 40  # reset, e.g. clear statistics
+
+    engine = RateEngine(["octets"], capacity=4, use_numpy=False)
+    for t, v in ((0, 0), (1, 100), (2, 200), (3, 50), (4, 150)):  # reset at t=3
+        engine.add("e1", t * 1_000_000_000, {"octets": v})
+    engine.add("e2", 0, {"octets": COUNTER_MAX - 100})
+    engine.add("e2", 2_000_000_000, {"octets": 100})
+    rates = engine.rates([None, 2, 60])
+    # capacity 4 keeps t=1..4: 100 + 50 + 100 over 3s
+    assert rates["e1"][None] == {"octets": 100.0, "seconds": 1.0}
+    assert rates["e1"][2]["octets"] == 75.0
+    assert rates["e1"][60] == {"octets": 250 / 3, "seconds": 3.0}
+    assert rates["e2"][None]["octets"] == 100.0
+    assert engine.percentiles(None, q=[50])["octets"][50] == 100.0
+
+    np = pytest.importorskip("numpy")
+    rng = random.Random(7)
+    engines = [RateEngine(["a", "b"], capacity=6, use_numpy=b) for b in (True, False)]
+    for key in range(20):
+        t, v = 0, {"a": COUNTER_MAX - rng.randint(0, 500), "b": 0}
+        for _ in range(rng.randint(0, 10)):
+            t += rng.choice([0, 1, 2]) * 1_000_000_000
+            v = {
+                "a": (v["a"] + rng.randint(0, 100)) % COUNTER_MAX,
+                "b": v["b"] + rng.randint(0, 9) if rng.random() > 0.2 else 1,
+            }
+            for e in engines:
+                e.add(key, t, dict(v))
+    vectorized, python = (e.rates([None, 3, 300]) for e in engines)
+    assert vectorized.keys() == python.keys()
+    for key in python:
+        for w in python[key]:
+            assert python[key][w] == pytest.approx(vectorized[key][w])
+    assert np.isfinite(engines[0].percentiles(3)["a"][99])
+
+
+def test_ifstats_stream_window_rows() -> None:
+    from nornir_srl.connections.ifstats import IfStatsStream
+
+    class _Sub:
+        def get_update(self, timeout):
+            time.sleep(timeout)
+            raise TimeoutError
+
+        def close(self):
+            pass
+
+    ifstream = IfStatsStream(_Sub(), interval=1)
+    itf = "interface[name=ethernet-1/1]/statistics"
+    for t, octets, pkts in ((1, 0, 0), (2, 1000, 10), (6, 6000, 50)):
+        ifstream.process(
+            {
+                "update": {
+                    "timestamp": t * 1_000_000_000,
+                    "prefix": itf,
+                    "update": [
+                        {"path": "in-octets", "val": str(octets)},
+                        {"path": "in-packets", "val": str(pkts)},
+                    ],
+                }
+            }
+        )
+    last, minute = ifstream.window_rows([None, 60])
+    assert last["window"] == "last" and last["in-Kbps"] == 10.0
+    assert last["in-pps"] == 10.0
+    assert minute["window"] == "60s" and minute["in-Kbps"] == 9.6
+    assert ifstream.rows(window=60)[0]["in-Kbps"] == 9.6
+    ifstream.close()
+
+
+def test_snapshot_records_and_replays_getters(tmp_path) -> None:
+    import pytest
+    from nornir.core.inventory import Host
+    from nornir.core.task import Result, Task
+
+    from nornir_srl.connections.aio import MissingResponse
+    from nornir_srl.connections.snapshot import SnapshotError, SnapshotStore, record
+
+    fetched: List[List[GetSpec]] = []
+
+    def get_batch(specs, strip_mod=True):
+        fetched.append(specs)
+        if ("/bad", "state") in specs:
+            raise RuntimeError("path not valid")
+        return {spec: [{spec[0].strip("/"): spec[1]}] for spec in specs}
+
+    def _getter(device: Any) -> Any:
+        first = device.get(paths=["/a"], datatype="state")
+        return (
+            first
+            + device.get_batch([("/b", "state"), ("/c", "config")])[("/b", "state")]
+        )
+
+    nodes = {}
+    for name in ("leaf1", "leaf2"):
+        dev = SrLinux()
+        dev.hostname = name
+        dev.capabilities = {"supported_models": []}
+        dev.get_batch = get_batch  # type: ignore[method-assign]
+        nodes[name] = record(
+            dev, {"ok": _getter, "bad": lambda d: d.get(["/bad"], "state")}
+        )
+    # one Get per dependent step, failed specs are recorded and not retried
+    assert fetched[:3] == [
+        [("/a", "state")],
+        [("/b", "state"), ("/c", "config")],
+        [("/bad", "state")],
+    ]
+    assert len(fetched) == 6
+
+    store = SnapshotStore(tmp_path)
+    inventory = {"leaf1": Host("leaf1", hostname="10.0.0.1", data={"role": "leaf"})}
+    store.save("s1", nodes, inventory=inventory)
+    # both nodes returned the same state: 3 responses + capabilities, stored once
+    assert len(list((tmp_path / "objects").glob("*/*.json.gz"))) == 4
+    assert [s["name"] for s in store.list()] == ["s1"]
+
+    def _task(task: Task) -> Result:
+        device = task.host.get_connection("srlinux", task.nornir.config)
+        return Result(host=task.host, result=_getter(device))
+
+    nr = store.nornir()  # latest
+    assert nr.inventory.hosts["leaf1"].hostname == "10.0.0.1"
+    assert list(nr.filter(role="leaf").inventory.hosts) == ["leaf1"]
+    result = nr.run(task=_task)
+    assert not result.failed
+    assert result["leaf2"][0].result == [{"a": "state"}, {"b": "state"}]
+    assert len(fetched) == 6  # no device I/O
+
+    device = nr.inventory.hosts["leaf1"].connections["srlinux"]
+    with pytest.raises(SnapshotError, match="path not valid"):
+        device.get(["/bad"], "state")
+    with pytest.raises(MissingResponse) as exc:
+        device.get(["/not-recorded"], "state")
+    assert exc.value.specs == [("/not-recorded", "state")]
+
+
+def test_snapshot_replays_getters_that_modify_responses(tmp_path) -> None:
+    from nornir_srl.connections.snapshot import SnapshotStore, record
+
+    responses = {
+        ("/interface[name=*]/subinterface", "all"): [
+            {
+                "interface": [
+                    {
+                        "name": "ethernet-1/1",
+                        "subinterface": [{"index": 0, "oper-state": "up"}],
+                    }
+                ]
+            }
+        ],
+        ("/network-instance[name=*]", "all"): [
+            {
+                "network-instance": [
+                    {
+                        "name": "default",
+                        "type": "default",
+                        "interface": [{"name": "ethernet-1/1.0"}],
+                    }
+                ]
+            }
+        ],
+    }
+
+    def get_batch(specs, strip_mod=True):
+        return {spec: json.loads(json.dumps(responses[spec])) for spec in specs}
+
+    dev = SrLinux()
+    dev.hostname = "leaf1"
+    dev.capabilities = {"supported_models": []}
+    dev.get_batch = get_batch  # type: ignore[method-assign]
+    expected = dev.get_nwi_itf()
+    node = record(dev, {"nwi_itfs": lambda d: d.get_nwi_itf()})
+
+    store = SnapshotStore(tmp_path)
+    store.save("s1", {"leaf1": node})
+    # get_nwi_itf pops the subinterface index: the snapshot holds the response
+    # as the device sent it, and every replay gets its own copy
+    replay = store.devices("s1")["leaf1"]
+    assert replay.get_nwi_itf() == expected
+    assert replay.get_nwi_itf() == expected
+    assert node.get_nwi_itf() == expected
@@ -0,0 +1,254 @@
+"""Equivalence of the row builders with the JMESPath expressions of the reports.
+
+Every expression generated by the getters that default to row builders is
+evaluated by both engines on documents derived from the expression itself, with
+fields randomly missing, null, empty or of the wrong type.
+"""
+
+import copy
+import random
+from typing import Any, Callable, Dict, List, Optional
+
+import jmespath
+import pytest
+
+from nornir_srl.connections.expressions import (
+    EXPRESSIONS,
+    ROW_BUILDER_REPORTS,
+    ExpressionRegistry,
+)
+from nornir_srl.connections.helpers import GetSpec
+from nornir_srl.connections.layer2 import Layer2Mixin
+from nornir_srl.connections.profile import DeviceProfile
+from nornir_srl.connections.routing import RoutingMixin
+from nornir_srl.connections.row_builders import RowBuilder, compile_row_builder
+
+BGP_RIB_MODEL_VERSIONS = ("2022-11-30", "2023-03-31", "2024-10-31")
+BGP_RIB_QUERIES = [
+    ("evpn", "1"),
+    ("evpn", "2"),
+    ("evpn", "3"),
+    ("evpn", "4"),
+    ("evpn", "5"),
+    ("ipv4", "2"),
+    ("ipv6", "2"),
+    ("l3vpn-ipv4-unicast", "2"),
+    ("l3vpn-ipv6-unicast", "2"),
+]
+
+
+class _EmptyDevice(RoutingMixin, Layer2Mixin):
+    """Device answering every Get with an empty notification."""
+
+    def __init__(self, bgp_rib_version: str):
+        self._profile = DeviceProfile(
+            features=["bridged"], bgp_rib_version=bgp_rib_version
+        )
+
+    def get(
+        self,
+        paths: List[str],
+        datatype: Optional[str] = "config",
+        strip_mod: Optional[bool] = True,
+    ) -> List[Dict[str, Any]]:
+        return [{}]
+
+    def get_batch(
+        self,
+        specs: List[GetSpec],
+        strip_mod: Optional[bool] = True,
+    ) -> Dict[GetSpec, List[Dict[str, Any]]]:
+        return {spec: [{}] for spec in specs}
+
+    @property
+    def profile(self) -> DeviceProfile:
+        return self._profile
+
+
+def _report_expressions() -> List[str]:
+    for version in BGP_RIB_MODEL_VERSIONS:
+        dev = _EmptyDevice(version)
+        for route_fam, route_type in BGP_RIB_QUERIES:
+            for detail in (False, True):
+                dev.get_bgp_rib(route_fam, route_type=route_type, detail=detail)
+        dev.get_mac_table()
+        dev.get_rib(afi="ipv4-unicast")
+        dev.get_rib(afi="ipv6-unicast")
+    return sorted(
+        {
+            compiled.expression
+            for key, compiled in EXPRESSIONS.items().items()
+            if key[0] in ROW_BUILDER_REPORTS
+        }
+    )
+
+
+def _leaf(rng: random.Random) -> Any:
+    return rng.choice(
+        ["x", "", "65000:1", 0, 1, 42, True, False, None, [], {}, ["a", "b"], [1]]
+    )
+
+
+def _merge(a: Any, b: Any) -> Any:
+    if isinstance(a, dict) and isinstance(b, dict):
+        return {**a, **b}
+    return a if a is not None else b
+
+
+def _document(
+    node: Dict[str, Any], inner: Callable[[], Any], rng: random.Random
+) -> Any:
+    """
+    document on which *node* evaluates to a value produced by *inner*
+
+    One time out of twenty the document is replaced by something that does not
+    match the node, so that both engines also see missing and mistyped data.
+    """
+    if rng.random() < 0.05:
+        return _leaf(rng)
+    kind = node["type"]
+    children = node["children"]
+    if kind == "field":
+        return {node["value"]: inner(), "other": _leaf(rng)}
+    if kind in ("subexpression", "index_expression", "pipe"):
+        build = inner
+        for child in reversed(children):
+            build = lambda child=child, build=build: _document(child, build, rng)
+        return build()
+    if kind == "index":
+        return [inner() for _ in range(node["value"] + rng.randint(0, 2))]
+    if kind == "flatten":
+        return _document(
+            children[0],
+            lambda: [rng.choice([inner, lambda: [inner(), inner()]])() for _ in "xx"],
+            rng,
+        )
+    if kind == "projection":
+        return _document(
+            children[0],
+            lambda: [
+                _document(children[1], inner, rng) for _ in range(rng.randint(0, 2))
+            ],
+            rng,
+        )
+    if kind == "filter_projection":
+        return _document(
+            children[0],
+            lambda: [
+                _merge(
+                    _document(children[1], inner, rng),
+                    _document(children[2], lambda: _leaf(rng), rng),
+                )
+                for _ in range(rng.randint(0, 2))
+            ],
+            rng,
+        )
+    if kind in ("multi_select_dict", "multi_select_list", "or_expression"):
+        doc: Any = None
+        for child in children:
+            doc = _merge(doc, _document(child, inner, rng))
+        return doc
+    if kind == "key_val_pair":
+        return _document(children[0], inner, rng)
+    if kind == "function_expression":
+        # join() takes an array of strings, mostly give it one
+        return _document(children[-1], lambda: rng.choice(["a", "b", "c", None]), rng)
+    return inner()
+
+
+def _evaluate(search: Callable[[Any], Any], data: Any) -> Any:
+    try:
+        return search(copy.deepcopy(data))
+    except Exception as e:
+        return type(e)
+
+
+REPORT_EXPRESSIONS = _report_expressions()
+
+
+def test_report_expressions_are_collected() -> None:
+    # 3 model versions x 9 families x detail, deduplicated, + mac + 2 RIBs x 1
+    assert len(REPORT_EXPRESSIONS) > 30
+    assert all(compile_row_builder(e) is not None for e in REPORT_EXPRESSIONS)
+
+
+@pytest.mark.parametrize(
+    "expression", REPORT_EXPRESSIONS, ids=range(len(REPORT_EXPRESSIONS))
+)
+def test_row_builder_matches_jmespath(expression: str) -> None:
+    rng = random.Random(expression)
+    parsed = jmespath.compile(expression)
+    builder = RowBuilder(expression)
+    for _ in range(50):
+        doc = _document(parsed.parsed, lambda: _leaf(rng), rng)
+        assert _evaluate(builder.search, doc) == _evaluate(parsed.search, doc)
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "a.b.c",
+        "a[0].b",
+        "a[-1]",
+        "a[1:3]",
+        "a[]",
+        "a[][]",
+        "a[*].b",
+        "a.*.b",
+        "[a, b][]",
+        "{x: a, y: b.c}",
+        "a[?b].c",
+        "a || b",
+        "a && b",
+        "!a",
+        "a | b",
+        "length(a)",
+        "join(',', a[])",
+        "`[1, 2]`",
+        "@",
+    ],
+)
+def test_row_builder_language_subset(expression: str) -> None:
+    docs = [
+        None,
+        0,
+        "s",
+        [],
+        {},
+        {"a": None},
+        {"a": 0, "b": ""},
+        {"a": [], "b": {}},
+        {"a": ["x", "y", "z"], "b": {"c": 1}},
+        {"a": [[1, 2], 3, None, {"b": 1}], "b": True},
+        {"a": [{"b": 1, "c": 2}, {"b": 0, "c": 3}, {"b": None}, {"c": 4}]},
+        {"a": {"k1": {"b": 1}, "k2": {"b": None}, "k3": 3}},
+        {"a": {"b": {"c": [1]}}, "b": {"c": None}},
+    ]
+    builder = RowBuilder(expression)
+    parsed = jmespath.compile(expression)
+    for doc in docs:
+        assert _evaluate(builder.search, doc) == _evaluate(parsed.search, doc)
+
+
+def test_row_builder_falls_back_on_unsupported_syntax() -> None:
+    assert compile_row_builder("a[?b == `1`]") is None
+    registry = ExpressionRegistry(python_reports=["report"])
+    compiled = registry.get(("report",), "a[?b == `1`].c")
+    assert not isinstance(compiled, RowBuilder)
+    assert registry.search(
+        ("report",), "a[?b == `1`].c", {"a": [{"b": 1, "c": 2}]}
+    ) == [2]
+
+
+def test_registry_engine_is_selectable_per_report() -> None:
+    registry = ExpressionRegistry(python_reports=["mac_table"])
+    assert registry.engine("mac_table") == "python"
+    assert registry.engine("lldp_nbrs") == "jmespath"
+    assert isinstance(registry.get(("mac_table",), "a[].b"), RowBuilder)
+    assert not isinstance(registry.get(("lldp_nbrs",), "a[].b"), RowBuilder)
+
+    registry.set_engine("mac_table", "jmespath")
+    assert ("mac_table",) not in registry
+    assert not isinstance(registry.get(("mac_table",), "a[].b"), RowBuilder)
+    with pytest.raises(ValueError):
+        registry.set_engine("mac_table", "numpy")
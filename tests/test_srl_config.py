@@ -0,0 +1,441 @@
+"""Unit tests for the intent push, backup and restore tasks and their helpers.
+
+These tests use intent and state directories in ``tmp_path`` and a fake gNMI
+client, so they run without a live device.
+"""
+
+import copy
+import json
+import os
+import re
+from typing import Any, Callable, Dict, List, Tuple
+
+import yaml  # type: ignore
+from nornir.core import Nornir
+from nornir.core.inventory import Group, Host, Hosts, Inventory, ParentGroups
+from nornir.plugins.runners import SerialRunner
+
+from nornir_srl.connections.config_diff import apply_delta, config_delta
+from nornir_srl.connections.srlinux import SrLinux
+from nornir_srl.tasks import intent as intent_mod
+from nornir_srl.tasks.backups import BackupStore
+from nornir_srl.tasks.srl_config import (
+    COMMIT_MARKER_PATH,
+    configure_device,
+    restore_config,
+)
+from nornir_srl.tasks.templates import (
+    TemplateHost,
+    render_pool,
+    render_templates,
+    template_environment,
+)
+
+
+class _Client:
+    """fake gNMI client recording the Set requests"""
+
+    def __init__(self) -> None:
+        self.sets: List[Dict[str, Any]] = []
+
+    def set(self, **kw: Any) -> None:
+        self.sets.append(kw)
+
+
+def _leaf1(get: Callable[..., List[Dict[str, Any]]]) -> Tuple[SrLinux, Nornir]:
+    """device leaf1 with a fake client and *get*, and a Nornir object with it"""
+    dev = SrLinux()
+    dev.connection = dev
+    dev._connection = _Client()
+    dev.get = get  # type: ignore[method-assign]
+    host = Host("leaf1", hostname="leaf1")
+    host.connections["srlinux"] = dev  # type: ignore[assignment]
+    nr = Nornir(
+        inventory=Inventory(hosts=Hosts({"leaf1": host})), runner=SerialRunner()
+    )
+    return dev, nr
+
+
+# --------------------------------------------------------------------------- #
+# configure_device
+# --------------------------------------------------------------------------- #
+
+
+def test_configure_device_commits_intent_and_purges_in_one_set(tmp_path) -> None:
+    intent = tmp_path / "intent"
+    (intent / "templates").mkdir(parents=True)
+    (intent / "vars.yaml").write_text("metadata: {}\nmtu: 9000\n")
+    (intent / "templates" / "itf.j2").write_text(
+        "update:\n"
+        "  - /interface[name=ethernet-1/1]:\n"
+        "      mtu: {{ mtu }}\n"
+        "replace:\n"
+        "  - /system/banner:\n"
+        "      motd: hi\n"
+    )
+    state = tmp_path / "state"
+    state.mkdir()
+    (state / "leaf1.json").write_text(json.dumps({"/interface[name=lo0]": {}}))
+
+    gets: List[List[str]] = []
+
+    def get(paths, datatype="config", strip_mod=True):
+        gets.append(paths)
+        return [{p.strip("/"): {"mtu": 1500}} for p in paths]
+
+    dev, nr = _leaf1(get)
+
+    result = nr.run(
+        task=configure_device,
+        intent_path=str(intent),
+        state_path=str(state),
+        backup_path=str(tmp_path / "backup"),
+        dry_run=True,
+    )
+    assert not result.failed and not result["leaf1"].changed
+    assert dev._connection.sets == []
+    assert "/interface[name=lo0]" in result["leaf1"][4].result  # purge in the diff
+
+    dev.get = lambda paths, datatype="config", strip_mod=True: (  # type: ignore
+        get(paths) if datatype == "config" and paths != ["/"] else [{"/": {}}]
+    )
+    result = nr.run(
+        task=configure_device,
+        intent_path=str(intent),
+        state_path=str(state),
+        backup_path=str(tmp_path / "backup"),
+    )
+    assert not result.failed and result["leaf1"].changed
+    assert dev._connection.sets == [
+        {
+            "delete": ["/interface[name=lo0]"],
+            "replace": [("/system/banner", {"motd": "hi"})],
+            "update": [("/interface[name=ethernet-1/1]", {"mtu": 9000})],
+            "encoding": "json_ietf",
+        }
+    ]
+    assert gets[-1] == [
+        "/interface[name=lo0]",
+        "/system/banner",
+        "/interface[name=ethernet-1/1]",
+    ]
+    assert json.loads((state / "leaf1.json").read_text()) == {
+        "/interface[name=ethernet-1/1]": {"mtu": 9000},
+        "/system/banner": {"motd": "hi"},
+    }
+
+
+def test_configure_device_skips_push_with_unchanged_fingerprint(tmp_path) -> None:
+    intent = tmp_path / "intent"
+    (intent / "templates").mkdir(parents=True)
+    (intent / "vars.yaml").write_text("metadata: {}\nmtu: 9000\n")
+    (intent / "templates" / "itf.j2").write_text(
+        "update:\n  - /interface[name=ethernet-1/1]:\n      mtu: {{ mtu }}\n"
+    )
+    state = tmp_path / "state"
+    state.mkdir()
+
+    commits = [{"id": 1}]
+    gets: List[Tuple[List[str], str]] = []
+
+    def get(paths, datatype="config", strip_mod=True):
+        gets.append((paths, datatype))
+        if datatype == "state":
+            assert paths == [COMMIT_MARKER_PATH]
+            return [{"system/configuration": {"commit": list(commits)}}]
+        return [{p.strip("/"): {"mtu": 1500}} for p in paths]
+
+    dev, nr = _leaf1(get)
+
+    def push() -> Any:
+        return nr.run(
+            task=configure_device,
+            intent_path=str(intent),
+            state_path=str(state),
+            backup_path=str(tmp_path / "backup"),
+        )["leaf1"]
+
+    assert push().changed and len(dev._connection.sets) == 1
+    assert (state / "leaf1.fingerprint.json").exists()
+
+    gets.clear()
+    r = push()
+    assert not r.failed and not r.changed and len(dev._connection.sets) == 1
+    assert gets == [([COMMIT_MARKER_PATH], "state")]  # no config read, no Set
+
+    commits.append({"id": 2})  # drift: config committed on the device
+    assert push().changed and len(dev._connection.sets) == 2
+    assert not push().changed and len(dev._connection.sets) == 2
+
+    (intent / "vars.yaml").write_text("metadata: {}\nmtu: 9100\n")
+    assert push().changed and len(dev._connection.sets) == 3
+    assert dev._connection.sets[-1]["update"] == [
+        ("/interface[name=ethernet-1/1]", {"mtu": 9100})
+    ]
+
+
+# --------------------------------------------------------------------------- #
+# templates
+# --------------------------------------------------------------------------- #
+
+
+def test_render_templates_compiles_once_and_renders_in_processes(tmp_path) -> None:
+    (tmp_path / "10_b.j2").write_text("b: {{ host.hostname }}-{{ x }}\n\n")
+    (tmp_path / "2_a.j2").write_text("a: {{ host['role'] }}\n\n")
+    (tmp_path / "empty.j2").write_text("{% if false %}x{% endif %}")
+    env = template_environment(str(tmp_path))
+    compiled: List[str] = []
+    compile_orig = env.compile
+
+    def _compile(source, name=None, *args, **kwargs):
+        compiled.append(name)
+        return compile_orig(source, name, *args, **kwargs)
+
+    env.compile = _compile  # type: ignore[method-assign]
+    hosts = [
+        Host(f"leaf{i}", hostname=f"leaf{i}", data={"role": "leaf"}) for i in (1, 2)
+    ]
+    out = [render_templates(str(tmp_path), h, {"x": 1}) for h in hosts]
+    assert out[0] == "---\na: leaf\n---\nb: leaf1-1\n"
+    assert out[1] == "---\na: leaf\n---\nb: leaf2-1\n"
+    assert sorted(compiled) == ["10_b.j2", "2_a.j2", "empty.j2"]
+    assert template_environment(str(tmp_path)) is env
+
+    (tmp_path / "2_a.j2").write_text("a: changed\n\n")
+    st = os.stat(tmp_path / "2_a.j2")
+    os.utime(tmp_path / "2_a.j2", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert render_templates(str(tmp_path), hosts[0], {"x": 1}).startswith(
+        "---\na: changed\n"
+    )
+    assert compiled.count("2_a.j2") == 2
+
+    rendered = (
+        render_pool(1)
+        .submit(
+            render_templates, str(tmp_path), TemplateHost.from_host(hosts[1]), {"x": 2}
+        )
+        .result()
+    )
+    assert rendered == "---\na: changed\n---\nb: leaf2-2\n"
+
+
+# --------------------------------------------------------------------------- #
+# intent index
+# --------------------------------------------------------------------------- #
+
+
+def test_intent_index_matches_per_host_parsing(tmp_path, monkeypatch) -> None:
+    def load_vars_per_host(host: Host) -> List[Dict[str, Any]]:
+        """the documents load_vars merged before the index, for reference"""
+        docs = []
+        for file in sorted(tmp_path.glob("**/*.y?ml")):
+            y_str = re.sub(
+                r"(__(\S+))", lambda m: str(host.get(m.group(2))), file.read_text()
+            )
+            for data in yaml.safe_load_all(y_str):
+                metadata = data.pop("metadata", {})
+                if intent_mod.host_matches(metadata, host):
+                    docs.append(data)
+        return docs
+
+    (tmp_path / "a_fabric.yaml").write_text(
+        "metadata: {}\n"
+        "system: {ntp: 10.0.0.1}\n"
+        "---\n"
+        "metadata: {groups: [spine]}\n"
+        "bgp: {role: spine}\n"
+        "---\n"
+        "metadata:\n"
+        "  labels: {role: leaf, pod: 1}\n"
+        "bgp:\n"
+        "  asn: __asn\n"
+        "  desc: leaf __name\n"
+    )
+    (tmp_path / "b_hosts.yaml").write_text(
+        "metadata: {hostname: leaf1}\n"
+        "interfaces: [ethernet-1/1]\n"
+        "---\n"
+        "  metadata: {hostname: leaf2}\n"
+        "  interfaces: [ethernet-1/2]\n"
+    )
+    spine = Group("spine")
+    hosts = [
+        Host("leaf1", hostname="leaf1", data={"role": "leaf", "pod": 1, "asn": 65001}),
+        Host("leaf2", hostname="leaf2", data={"role": "leaf", "pod": 2, "asn": 65002}),
+        Host("spine1", hostname="spine1", groups=ParentGroups([spine])),
+    ]
+    parsed: List[str] = []
+    parse = intent_mod.parse_intent
+    monkeypatch.setattr(
+        intent_mod, "parse_intent", lambda text: parsed.append(text) or parse(text)
+    )
+    index = intent_mod.IntentIndex(str(tmp_path))
+    for host in hosts:
+        assert list(index.documents(host)) == load_vars_per_host(host)
+    assert len(parsed) == 2  # once per file, not per host
+    assert list(index.documents(hosts[0]))[-2:] == [
+        {"bgp": {"asn": 65001, "desc": "leaf leaf1"}},
+        {"interfaces": ["ethernet-1/1"]},
+    ]
+    # documents are copies, merging into them does not change the index
+    list(index.documents(hosts[0]))[0]["system"]["ntp"] = "changed"
+    assert list(index.documents(hosts[0]))[0] == {"system": {"ntp": "10.0.0.1"}}
+
+    (tmp_path / "b_hosts.yaml").write_text(
+        "metadata: {hostname: leaf1}\ninterfaces: [ethernet-1/3, ethernet-1/4]\n"
+    )
+    for host in hosts:
+        assert list(index.documents(host)) == load_vars_per_host(host)
+    assert len(parsed) == 3  # the changed file only
+
+
+# --------------------------------------------------------------------------- #
+# backup_config / restore_config
+# --------------------------------------------------------------------------- #
+
+
+def test_backup_store_dedups_deltas_and_prunes_versions(tmp_path) -> None:
+    def config(n: int) -> List[Dict[str, Any]]:
+        return [
+            {
+                "/": {
+                    "interface": [
+                        {
+                            "name": f"ethernet-1/{i}",
+                            "mtu": 9232,
+                            "description": "x" * 40,
+                        }
+                        for i in range(n)
+                    ],
+                    "system": {"banner": {"motd": "hi"}},
+                }
+            }
+        ]
+
+    v1 = config(50)
+    v2 = copy.deepcopy(v1)
+    v2[0]["/"]["interface"][3]["mtu"] = 1500
+    v2[0]["/"]["interface"].insert(0, {"name": "lo0"})
+    del v2[0]["/"]["system"]["banner"]
+    assert apply_delta(v1, config_delta(v1, v2)) == v2
+    assert json.dumps(apply_delta(v1, config_delta(v1, v2))) == json.dumps(v2)
+
+    store = BackupStore(tmp_path / "leaf1", compression="gzip", deltas=True)
+    d1 = store.save(v1, history_len=3)
+    assert store.save(copy.deepcopy(v1), history_len=3) == d1  # unchanged
+    d2 = store.save(v2, history_len=3)
+    store.save(v1, history_len=3)  # back to v1: a version, no new object
+    assert [v["config"] for v in store.versions()] == [d1, d2, d1]
+    assert len(store.index["objects"]) == 2
+    assert store.index["objects"][d2]["base"] == d1
+    files = list((tmp_path / "leaf1" / "objects").glob("*/*"))
+    assert sorted(f.name.split(".", 1)[1] for f in files) == [
+        "delta.json.gz",
+        "json.gz",
+    ]
+
+    reopened = BackupStore(tmp_path / "leaf1", compression="gzip")
+    assert reopened.load(1) == v1 and reopened.load(2) == v2
+    try:
+        reopened.load(4)
+        assert False, "version 4 does not exist"
+    except ValueError as e:
+        assert "only 3 versions" in str(e)
+
+    v3 = config(2)
+    store.save(v3, history_len=1)
+    assert len(store.versions()) == 1 and store.load(1) == v3
+    assert len(list((tmp_path / "leaf1" / "objects").glob("*/*"))) == 1
+
+
+def test_restore_config_pushes_only_changed_subtrees(tmp_path) -> None:
+    itfs = [{"name": f"ethernet-1/{i}", "mtu": 9232} for i in range(1, 4)]
+    backup = {"interface": itfs, "system": {"banner": {"motd": "hi"}}}
+    BackupStore(tmp_path / "leaf1", compression="gzip").save([{"/": backup}])
+    running = {
+        "interface": [dict(itfs[0], mtu=1500), itfs[1]],
+        "system": {"banner": {"motd": "changed"}},
+        "qos": {"classifiers": {}},
+    }
+
+    gets: List[List[str]] = []
+
+    def get(paths, datatype="config", strip_mod=True):
+        gets.append(paths)
+        if paths == ["/"]:
+            return [{"/": running}]
+        if paths == ["/interface"]:
+            return [{"interface": running["interface"]}]
+        return [{} for p in paths]
+
+    dev, nr = _leaf1(get)
+
+    r = nr.run(task=restore_config, backup_base_path=str(tmp_path), version=1)
+    diff = r["leaf1"].result
+    assert not r.failed and not r["leaf1"].changed and dev._connection.sets == []
+    assert "@@ /interface[name=ethernet-1/1]/mtu @@" in diff and "@@ /qos @@" in diff
+
+    r = nr.run(
+        task=restore_config, backup_base_path=str(tmp_path), version=1, dry_run=False
+    )
+    assert not r.failed and r["leaf1"].changed
+    assert dev._connection.sets == [
+        {
+            "delete": ["/qos"],
+            "replace": [
+                ("/interface[name=ethernet-1/1]/mtu", 9232),
+                ("/system/banner/motd", "hi"),
+            ],
+            "update": [("/interface[name=ethernet-1/3]", itfs[2])],
+            "encoding": "json_ietf",
+        }
+    ]
+
+    gets.clear()
+    r = nr.run(
+        task=restore_config,
+        backup_base_path=str(tmp_path),
+        version=1,
+        dry_run=False,
+        paths=["/interface"],
+    )
+    assert not r.failed and gets[0] == ["/interface"]
+    assert dev._connection.sets[-1] == {
+        "replace": [("/interface[name=ethernet-1/1]/mtu", 9232)],
+        "update": [("/interface[name=ethernet-1/3]", itfs[2])],
+        "encoding": "json_ietf",
+    }
+
+
+def test_restore_config_uses_full_keys_and_replaces_unkeyed_lists(tmp_path) -> None:
+    p8 = {"ip-prefix": "10.0.0.0/8", "mask-length-range": "8..24"}
+    exact = {"ip-prefix": "10.0.0.0/8", "mask-length-range": "exact"}
+    foo = {"enabled": True, "bar": [{"id": 1, "x": 1}]}  # bar: keys not known
+    backup = {
+        "routing-policy": {"prefix-set": [{"name": "p", "prefix": [p8]}]},
+        "system": {"foo": foo},
+    }
+    BackupStore(tmp_path / "leaf1", compression="gzip").save([{"/": backup}])
+    running = {
+        "routing-policy": {"prefix-set": [{"name": "p", "prefix": [p8, exact]}]},
+        "system": {"foo": {"enabled": True, "bar": [{"id": 1, "x": 2}]}},
+    }
+
+    def get(paths, datatype="config", strip_mod=True):
+        return [{"/": running}] if paths == ["/"] else [{} for p in paths]
+
+    dev, nr = _leaf1(get)
+    r = nr.run(
+        task=restore_config, backup_base_path=str(tmp_path), version=1, dry_run=False
+    )
+    assert not r.failed
+    assert dev._connection.sets == [
+        {
+            "delete": [
+                "/routing-policy/prefix-set[name=p]"
+                "/prefix[ip-prefix=10.0.0.0/8][mask-length-range=exact]"
+            ],
+            "replace": [("/system/foo", foo)],
+            "encoding": "json_ietf",
+        }
+    ]